@@ -1,25 +1,52 @@
 """
 Facial Animation Dashboard endpoint
 """
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 import os
+import time
 
 router = APIRouter(prefix="/facial-animation", tags=["facial-animation"])
 
+_DASHBOARD_PATH = os.path.normpath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "static", "facial_animation_dashboard.html"
+))
+_DASHBOARD_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0"
+}
+_MTIME_CHECK_INTERVAL = 2.0  # Seconds between checks for an edited file
+
+# Cached dashboard HTML: body, file mtime, and when the mtime was last checked
+_dashboard_cache = {"body": None, "mtime": None, "checked_at": 0.0}
+
+
+def _load_dashboard() -> bytes:
+    """Return the dashboard HTML, re-reading it only when the file changes"""
+    now = time.monotonic()
+    if _dashboard_cache["body"] is not None and now - _dashboard_cache["checked_at"] < _MTIME_CHECK_INTERVAL:
+        return _dashboard_cache["body"]
+
+    try:
+        mtime = os.stat(_DASHBOARD_PATH).st_mtime
+        if mtime != _dashboard_cache["mtime"]:
+            with open(_DASHBOARD_PATH, "rb") as f:
+                _dashboard_cache["body"] = f.read()
+            _dashboard_cache["mtime"] = mtime
+    except OSError:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+
+    _dashboard_cache["checked_at"] = now
+    return _dashboard_cache["body"]
+
+
 @router.get("/dashboard")
 async def get_facial_animation_dashboard():
     """Serve the facial animation dashboard HTML"""
-    dashboard_path = os.path.join(
-        os.path.dirname(__file__), 
-        "..", "..", "static", "facial_animation_dashboard.html"
-    )
-    return FileResponse(
-        dashboard_path, 
+    return Response(
+        content=_load_dashboard(),
         media_type="text/html",
-        headers={
-            "Cache-Control": "no-cache, no-store, must-revalidate",
-            "Pragma": "no-cache",
-            "Expires": "0"
-        }
-    )
\ No newline at end of file
+        headers=_DASHBOARD_HEADERS
+    )
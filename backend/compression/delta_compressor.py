@@ -6,14 +6,98 @@ Optimizes network bandwidth by sending only changed morphs
 
 import msgpack
 import numpy as np
-from typing import Dict, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
 from dataclasses import dataclass
-from collections import deque
+from collections import deque, namedtuple
+from types import MappingProxyType
 import time
 import logging
 
+from ._delta_kernels import delta_select, interp_fused
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import blosc2
+    BLOSC2_AVAILABLE = True
+except ImportError:
+    BLOSC2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Morph payloads are sent as little-endian index/value buffers
+INDEX_DTYPE = np.dtype('<u2')
+VALUE_DTYPE = np.dtype('<f4')
+
+# Change threshold for priority morphs, which are sent on much smaller changes
+PRIORITY_THRESHOLD = 0.0001
+
+# msgpack ext code for Blosc-compressed (shuffle + LZ4) value buffers
+BLOSC_EXT_CODE = 1
+
+
+# Wire schema: frames and batches are packed as msgpack arrays in field order.
+# A frame with empty indices but non-empty values is dense: values holds every
+# morph in name-table order, with unsent morphs zeroed.
+if MSGSPEC_AVAILABLE:
+    class FrameStruct(msgspec.Struct, array_like=True):
+        """Single compressed frame"""
+        type: str
+        frame: int
+        timestamp: float
+        indices: bytes                      # INDEX_DTYPE morph indices
+        values: Union[bytes, msgspec.msgpack.Ext]  # VALUE_DTYPE morph values, raw or Blosc ext
+        names: Optional[List[str]] = None   # Morph name table, sent when it changes
+        predictions: Optional[Tuple[bytes, bytes, bytes]] = None  # (indices, velocities, accelerations)
+
+    class BatchStruct(msgspec.Struct, array_like=True):
+        """Batch of compressed frames"""
+        batch_size: int
+        frames: List[FrameStruct]
+else:
+    # Tuples pack to the same msgpack arrays as array_like Structs
+    FrameStruct = namedtuple('FrameStruct',
+                             ['type', 'frame', 'timestamp', 'indices', 'values', 'names', 'predictions'],
+                             defaults=(None, None))
+    BatchStruct = namedtuple('BatchStruct', ['batch_size', 'frames'])
+
+_Ext = msgspec.msgpack.Ext if MSGSPEC_AVAILABLE else msgpack.ExtType
+
+
+def _pack_values(values: np.ndarray, compress: bool):
+    """
+    Encode morph values for the wire.
+    
+    Args:
+        values: Morph values to send
+        compress: Try Blosc shuffle + LZ4, keeping it only if smaller
+        
+    Returns:
+        Raw VALUE_DTYPE bytes or a Blosc ext payload
+    """
+    raw = values.astype(VALUE_DTYPE).tobytes()
+    if compress and BLOSC2_AVAILABLE:
+        packed = blosc2.compress(raw, typesize=VALUE_DTYPE.itemsize, clevel=3,
+                                 filter=blosc2.Filter.SHUFFLE, codec=blosc2.Codec.LZ4)
+        if len(packed) < len(raw):
+            return _Ext(BLOSC_EXT_CODE, packed)
+    return raw
+
+
+def _unpack_values(payload) -> np.ndarray:
+    """Decode a value buffer produced by _pack_values"""
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return np.frombuffer(payload, dtype=VALUE_DTYPE)
+    if payload.code != BLOSC_EXT_CODE:
+        raise ValueError(f"Unknown value encoding: ext code {payload.code}")
+    if not BLOSC2_AVAILABLE:
+        raise ValueError("Received Blosc-compressed values but blosc2 is not installed")
+    return np.frombuffer(blosc2.decompress(payload.data), dtype=VALUE_DTYPE)
+
 
 @dataclass
 class CompressionStats:
@@ -37,7 +121,8 @@ class DeltaCompressor:
                  change_threshold: float = 0.001,
                  force_keyframe_interval: int = 30,
                  batch_size: int = 3,
-                 enable_prediction: bool = True):
+                 enable_prediction: bool = True,
+                 compress_keyframes: bool = True):
         """
         Initialize delta compressor.
         
@@ -46,23 +131,40 @@ class DeltaCompressor:
             force_keyframe_interval: Send full frame every N frames
             batch_size: Number of frames to batch together
             enable_prediction: Use motion prediction for interpolation hints
+            compress_keyframes: Blosc-compress keyframe values when blosc2 is installed
         """
         self.change_threshold = change_threshold
         self.force_keyframe_interval = force_keyframe_interval
         self.batch_size = batch_size
         self.enable_prediction = enable_prediction
-        
-        # State tracking
-        self.previous_frame: Dict[str, float] = {}
+        self.compress_keyframes = compress_keyframes
+        
+        # State tracking (struct-of-arrays: each morph name gets a stable
+        # index into contiguous float32 arrays on first sight)
+        self._name_to_idx: Dict[str, int] = {}
+        self._idx_to_name: List[str] = []
+        self._prev = np.zeros(0, dtype=np.float32)
+        self._scratch = np.zeros(0, dtype=np.float32)
+        self._present = np.zeros(0, dtype=bool)
+        self._eff_thr = np.zeros(0, dtype=np.float32)   # Per-index change threshold
+        self._idle_thr = np.zeros(0, dtype=np.float32)  # Per-index idle-frame bound
+        self._names_sent = 0  # Length of the name table the decoder has seen
+        self._keyframe_pending = False  # Next frame is a keyframe regardless of the interval
         self.frame_count = 0
         self.stats = CompressionStats()
         
         # Batching
         self.frame_batch = deque(maxlen=batch_size)
+        self._encoder = msgspec.msgpack.Encoder() if MSGSPEC_AVAILABLE else None
+        
+        # Motion prediction (per-index, alongside the SoA state)
+        self._vel = np.zeros(0, dtype=np.float32)
+        self._accel = np.zeros(0, dtype=np.float32)
+        self._has_vel = np.zeros(0, dtype=bool)
         
-        # Motion prediction
-        self.morph_velocities: Dict[str, float] = {}
-        self.morph_accelerations: Dict[str, float] = {}
+        # Kernel output buffer and all-present mask for array input
+        self._out_idx = np.zeros(0, dtype=np.intp)
+        self._all_present = np.zeros(0, dtype=bool)
         
         # Priority morphs (always send if changed)
         self.priority_morphs = {
@@ -70,6 +172,44 @@ class DeltaCompressor:
             'Eye_L_Wide', 'Eye_R_Wide', 'Brow_Inner_Up', 'Brow_Down_L', 'Brow_Down_R'
         }
     
+    def register_morphs(self, names: Iterable[str]) -> np.ndarray:
+        """
+        Assign stable array indices to morph names.
+        
+        Args:
+            names: Morph names, in any order; already known names keep their index
+            
+        Returns:
+            Index of each name in the compressor's morph arrays
+        """
+        names = list(names)
+        new_names = [name for name in names if name not in self._name_to_idx]
+        if new_names:
+            for name in new_names:
+                self._name_to_idx[name] = len(self._idx_to_name)
+                self._idx_to_name.append(name)
+            
+            # Grow state arrays; unseen morphs start from 0.0
+            grow = len(new_names)
+            size = len(self._idx_to_name)
+            self._prev = np.concatenate((self._prev, np.zeros(grow, dtype=np.float32)))
+            self._vel = np.concatenate((self._vel, np.zeros(grow, dtype=np.float32)))
+            self._accel = np.concatenate((self._accel, np.zeros(grow, dtype=np.float32)))
+            self._has_vel = np.concatenate((self._has_vel, np.zeros(grow, dtype=bool)))
+            self._scratch = np.zeros(size, dtype=np.float32)
+            self._present = np.zeros(size, dtype=bool)
+            self._out_idx = np.zeros(size, dtype=np.intp)
+            self._all_present = np.ones(size, dtype=bool)
+            is_priority = np.fromiter((name in self.priority_morphs for name in new_names),
+                                      dtype=bool, count=grow)
+            self._eff_thr = np.concatenate((
+                self._eff_thr,
+                np.where(is_priority, PRIORITY_THRESHOLD, self.change_threshold).astype(np.float32)
+            ))
+            self._idle_thr = np.minimum(self._eff_thr, np.float32(self.change_threshold * 0.5))
+        
+        return np.fromiter((self._name_to_idx[name] for name in names), dtype=np.intp)
+    
     def compress_frame(self, morphs: Dict[str, float], timestamp: Optional[float] = None) -> Optional[bytes]:
         """
         Compress a single frame of morph data.
@@ -81,58 +221,115 @@ class DeltaCompressor:
         Returns:
             Compressed binary data or None if batching
         """
+        for morph in morphs:
+            if morph not in self._name_to_idx:
+                self.register_morphs(morphs)
+                break
+        
+        # Scatter into the preallocated scratch array
+        values = self._scratch
+        present = self._present
+        values.fill(0.0)
+        present.fill(False)
+        name_to_idx = self._name_to_idx
+        for morph, value in morphs.items():
+            idx = name_to_idx[morph]
+            values[idx] = value
+            present[idx] = True
+        
+        return self._compress_values(values, present, len(morphs), timestamp)
+    
+    def compress_frame_array(self, values: np.ndarray, timestamp: Optional[float] = None) -> Optional[bytes]:
+        """
+        Compress a frame already laid out in the compressor's morph order.
+        
+        Args:
+            values: Array indexed as returned by register_morphs; other float
+                dtypes are converted to float32
+            timestamp: Optional timestamp for the frame
+            
+        Returns:
+            Compressed binary data or None if batching
+        """
+        # Keep the kernel and state arithmetic in float32 (no copy if already float32)
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != self._prev.shape:
+            raise ValueError(
+                f"Expected {self._prev.shape[0]} morph values, got {values.shape[0]}"
+            )
+        return self._compress_values(values, None, values.shape[0], timestamp)
+    
+    def _is_idle(self, values: np.ndarray) -> bool:
+        """Check in one vectorized pass whether a frame is unchanged from the last"""
+        return not np.any(np.abs(values - self._prev) > self._idle_thr)
+    
+    def _compress_values(self, values: np.ndarray, present: Optional[np.ndarray],
+                         total_morphs: int, timestamp: Optional[float]) -> Optional[bytes]:
+        """Select changed morphs from a SoA frame and queue it for batching"""
         if timestamp is None:
             timestamp = time.time()
         
         self.frame_count += 1
-        is_keyframe = (self.frame_count % self.force_keyframe_interval) == 0
+        is_keyframe = self._keyframe_pending or (self.frame_count % self.force_keyframe_interval) == 0
+        self._keyframe_pending = False
         
-        # Calculate deltas
-        delta_frame = {}
-        changed_morphs = set()
+        if present is None:
+            present = self._all_present
         
+        # Calculate deltas
+        predictions = None
         if is_keyframe:
             # Send all non-zero morphs
-            delta_frame = {k: v for k, v in morphs.items() if abs(v) > 0.001}
-            changed_morphs = set(delta_frame.keys())
+            idxs = np.flatnonzero(present & (np.abs(values) > 0.001))
+        elif self._is_idle(values):
+            # Nothing moved enough to send; skip selection and prediction
+            idxs = self._out_idx[:0]
+        else:
+            # Select changed morphs and update motion prediction in one pass
+            n = delta_select(
+                values, self._prev, present, self._eff_thr,
+                self._vel, self._accel, self._has_vel,
+                self.enable_prediction, self._out_idx
+            )
+            idxs = self._out_idx[:n]
+            
+            if self.enable_prediction:
+                predictions = self._get_prediction_hints(idxs, timestamp)
+        
+        # Dense keyframes drop the index buffer once it outweighs the zeros
+        # a full-length value array would add
+        dense = is_keyframe and 0 < values.shape[0] * VALUE_DTYPE.itemsize < (
+            len(idxs) * (INDEX_DTYPE.itemsize + VALUE_DTYPE.itemsize))
+        if dense:
+            changed_values = np.zeros_like(values)
+            changed_values[idxs] = values[idxs]
+            index_bytes = b''
         else:
-            # Calculate changes
-            for morph, value in morphs.items():
-                prev_value = self.previous_frame.get(morph, 0.0)
-                change = abs(value - prev_value)
-                
-                # Check if morph should be included
-                if (change > self.change_threshold or 
-                    (morph in self.priority_morphs and change > 0.0001)):
-                    delta_frame[morph] = value
-                    changed_morphs.add(morph)
-                    
-                    # Update motion prediction
-                    if self.enable_prediction:
-                        self._update_motion_prediction(morph, value, prev_value, timestamp)
+            changed_values = values[idxs]
+            index_bytes = idxs.astype(INDEX_DTYPE).tobytes()
         
         # Update stats
-        self._update_stats(len(morphs), len(delta_frame))
+        self._update_stats(total_morphs, len(idxs))
         
         # Store current frame
-        self.previous_frame = morphs.copy()
-        
-        # Create frame data
-        frame_data = {
-            'type': 'keyframe' if is_keyframe else 'delta',
-            'frame': self.frame_count,
-            'timestamp': timestamp,
-            'morphs': delta_frame
-        }
+        np.copyto(self._prev, values)
         
-        # Add prediction hints if enabled
-        if self.enable_prediction and not is_keyframe:
-            predictions = self._get_prediction_hints(changed_morphs, timestamp)
-            if predictions:
-                frame_data['predictions'] = predictions
+        # Keyframes always carry the name table so late joiners can resync
+        names = None
+        if is_keyframe or self._names_sent != len(self._idx_to_name):
+            names = list(self._idx_to_name)
+            self._names_sent = len(names)
         
         # Add to batch
-        self.frame_batch.append(frame_data)
+        self.frame_batch.append(FrameStruct(
+            'keyframe' if is_keyframe else 'delta',
+            self.frame_count,
+            timestamp,
+            index_bytes,
+            _pack_values(changed_values, is_keyframe and self.compress_keyframes),
+            names,
+            predictions
+        ))
         
         # Return compressed batch if full
         if len(self.frame_batch) >= self.batch_size:
@@ -140,50 +337,36 @@ class DeltaCompressor:
         
         return None
     
-    def _update_motion_prediction(self, morph: str, value: float, prev_value: float, timestamp: float):
-        """Update motion prediction for a morph"""
-        velocity = value - prev_value  # Simple velocity
-        
-        if morph in self.morph_velocities:
-            prev_velocity = self.morph_velocities[morph]
-            acceleration = velocity - prev_velocity
-            self.morph_accelerations[morph] = acceleration
-        
-        self.morph_velocities[morph] = velocity
-    
-    def _get_prediction_hints(self, changed_morphs: Set[str], timestamp: float) -> Dict[str, Dict]:
-        """Get motion prediction hints for interpolation"""
-        predictions = {}
-        
-        for morph in changed_morphs:
-            if morph in self.morph_velocities:
-                velocity = self.morph_velocities[morph]
-                acceleration = self.morph_accelerations.get(morph, 0.0)
-                
-                # Only send prediction if motion is significant
-                if abs(velocity) > 0.01 or abs(acceleration) > 0.02:
-                    predictions[morph] = {
-                        'v': round(velocity, 4),  # velocity
-                        'a': round(acceleration, 4)  # acceleration
-                    }
-        
-        return predictions
+    def _get_prediction_hints(self, changed: np.ndarray, timestamp: float) -> Optional[Tuple[bytes, bytes, bytes]]:
+        """Get motion prediction hints for interpolation as packed index/velocity/acceleration buffers"""
+        velocities = self._vel[changed]
+        accelerations = self._accel[changed]
+        
+        # Only send prediction if motion is significant
+        significant = (np.abs(velocities) > 0.01) | (np.abs(accelerations) > 0.02)
+        if not significant.any():
+            return None
+        
+        return (
+            changed[significant].astype(INDEX_DTYPE).tobytes(),
+            velocities[significant].astype(VALUE_DTYPE).tobytes(),
+            accelerations[significant].astype(VALUE_DTYPE).tobytes()
+        )
     
     def _compress_batch(self) -> bytes:
         """Compress the current batch of frames"""
         if not self.frame_batch:
             return b''
         
-        batch_data = {
-            'batch_size': len(self.frame_batch),
-            'frames': list(self.frame_batch)
-        }
+        batch = BatchStruct(len(self.frame_batch), list(self.frame_batch))
         
         # Clear batch
         self.frame_batch.clear()
         
-        # Compress with msgpack
-        return msgpack.packb(batch_data, use_bin_type=True)
+        # Compress with msgspec's reusable encoder when available
+        if self._encoder is not None:
+            return self._encoder.encode(batch)
+        return msgpack.packb(batch, use_bin_type=True)
     
     def flush(self) -> Optional[bytes]:
         """Flush any remaining frames in the batch"""
@@ -203,19 +386,27 @@ class DeltaCompressor:
         
         if self.stats.total_frames > 0:
             self.stats.avg_morphs_per_frame = self.stats.total_morphs_sent / self.stats.total_frames
-            self.stats.avg_frame_size = self.stats.total_morphs_sent * 8 / self.stats.total_frames  # Approximate bytes
+            bytes_per_morph = INDEX_DTYPE.itemsize + VALUE_DTYPE.itemsize
+            self.stats.avg_frame_size = self.stats.total_morphs_sent * bytes_per_morph / self.stats.total_frames  # Approximate bytes
     
     def get_stats(self) -> CompressionStats:
         """Get current compression statistics"""
         return self.stats
     
+    def force_keyframe(self):
+        """Send the next frame as a keyframe, e.g. after the client lost a delta"""
+        self._keyframe_pending = True
+    
     def reset(self):
         """Reset compressor state"""
-        self.previous_frame.clear()
+        self._prev.fill(0.0)
+        self._names_sent = 0
+        self._keyframe_pending = False
         self.frame_count = 0
         self.frame_batch.clear()
-        self.morph_velocities.clear()
-        self.morph_accelerations.clear()
+        self._vel.fill(0.0)
+        self._accel.fill(0.0)
+        self._has_vel.fill(False)
         self.stats = CompressionStats()
 
 
@@ -233,11 +424,58 @@ class DeltaDecompressor:
             interpolation_enabled: Enable frame interpolation
         """
         self.interpolation_enabled = interpolation_enabled
-        self.current_frame: Dict[str, float] = {}
-        self.target_frame: Dict[str, float] = {}
-        self.morph_predictions: Dict[str, Dict] = {}
+        self.morph_names: List[str] = []
         self.last_timestamp = 0.0
         self.interpolation_alpha = 0.0
+        self._decoder = msgspec.msgpack.Decoder(BatchStruct) if MSGSPEC_AVAILABLE else None
+        
+        # Frame state, indexed by the compressor's morph name table.
+        # The latest decoded frame is also the interpolation target.
+        self._curr = np.zeros(0, dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._vel = np.zeros(0, dtype=np.float32)
+        self._accel = np.zeros(0, dtype=np.float32)
+        self._pred_mask = np.zeros(0, dtype=bool)
+        self._interp_out = np.zeros(0, dtype=np.float32)
+        
+        # Name-keyed mirrors, updated in place rather than copied per frame
+        self._frame_dict: Dict[str, float] = {}
+        self._frame_view = MappingProxyType(self._frame_dict)
+        self.morph_predictions: Dict[str, Dict] = {}
+    
+    @property
+    def current_frame(self) -> Mapping[str, float]:
+        """Current morph values by name (read-only view)"""
+        return self._frame_view
+    
+    def get_current_frame_view(self) -> Mapping[str, float]:
+        """
+        Get a live read-only view of the current frame.
+        
+        The view tracks later frames; copy it to keep a snapshot.
+        """
+        return self._frame_view
+    
+    def _to_dict(self, values: np.ndarray) -> Dict[str, float]:
+        """Convert active entries of a state array to a name-keyed dict"""
+        names = self.morph_names
+        idxs = np.flatnonzero(self._active)
+        return dict(zip([names[i] for i in idxs], values[idxs].tolist()))
+    
+    def _resize(self, size: int):
+        """Match state arrays to the morph name table, keeping existing values"""
+        def fit(arr: np.ndarray) -> np.ndarray:
+            out = np.zeros(size, dtype=arr.dtype)
+            keep = min(size, arr.shape[0])
+            out[:keep] = arr[:keep]
+            return out
+        
+        self._curr = fit(self._curr)
+        self._active = fit(self._active)
+        self._vel = fit(self._vel)
+        self._accel = fit(self._accel)
+        self._pred_mask = fit(self._pred_mask)
+        self._interp_out = np.zeros(size, dtype=np.float32)
     
     def decompress_batch(self, data: bytes) -> List[Dict]:
         """
@@ -249,14 +487,13 @@ class DeltaDecompressor:
         Returns:
             List of decompressed frame dictionaries
         """
-        batch_data = msgpack.unpackb(data, raw=False)
-        frames = []
-        
-        for frame_data in batch_data['frames']:
-            frame = self.decompress_frame(frame_data)
-            frames.append(frame)
+        if self._decoder is not None:
+            batch = self._decoder.decode(data)
+        else:
+            batch_size, frames = msgpack.unpackb(data, raw=False)
+            batch = BatchStruct(batch_size, [FrameStruct(*frame) for frame in frames])
         
-        return frames
+        return [self._apply_frame(frame) for frame in batch.frames]
     
     def decompress_frame(self, frame_data: Dict) -> Dict:
         """
@@ -268,41 +505,97 @@ class DeltaDecompressor:
         Returns:
             Full frame with all morph values
         """
-        is_keyframe = frame_data['type'] == 'keyframe'
-        timestamp = frame_data['timestamp']
-        morphs = frame_data['morphs']
+        return self._apply_frame(FrameStruct(
+            frame_data['type'],
+            frame_data['frame'],
+            frame_data['timestamp'],
+            frame_data['indices'],
+            frame_data['values'],
+            frame_data.get('names'),
+            frame_data.get('predictions')
+        ))
+    
+    def _apply_frame(self, frame_data: FrameStruct) -> Dict:
+        """Apply a decoded frame to the decompressor state"""
+        is_keyframe = frame_data.type == 'keyframe'
+        timestamp = frame_data.timestamp
+        
+        if frame_data.names is not None:
+            self.morph_names = frame_data.names
+            if len(self.morph_names) != self._curr.shape[0]:
+                self._resize(len(self.morph_names))
+        
+        names = self.morph_names
+        if not names:
+            # Joined mid-stream: deltas index a name table we haven't seen yet
+            logger.debug("Dropping frame %d received before the morph name table", frame_data.frame)
+            return {
+                'timestamp': timestamp,
+                'frame': frame_data.frame,
+                'morphs': {},
+                'predictions': None
+            }
+        
+        values = _unpack_values(frame_data.values)
+        if frame_data.indices or not values.size:
+            indices = np.frombuffer(frame_data.indices, dtype=INDEX_DTYPE)
+        else:
+            # Dense frame: every morph in name order, unsent ones zeroed
+            indices = np.flatnonzero(values[:len(names)])
+            values = values[indices]
+        if indices.size and indices.max() >= len(names):
+            # Indices past the name table we hold would overrun the state arrays
+            keep = indices < len(names)
+            indices = indices[keep]
+            values = values[keep]
         
         if is_keyframe:
-            # Replace entire frame
-            self.current_frame = morphs.copy()
-            # Set missing morphs to 0
-            for morph in list(self.current_frame.keys()):
-                if morph not in morphs:
-                    self.current_frame[morph] = 0.0
-        else:
-            # Apply deltas
-            for morph, value in morphs.items():
-                self.current_frame[morph] = value
+            # Replace entire frame; morphs missing from the keyframe are dropped
+            self._curr.fill(0.0)
+            self._active.fill(False)
+            self._frame_dict.clear()
+        
+        # Apply values
+        self._curr[indices] = values
+        self._active[indices] = True
+        self._frame_dict.update(zip([names[i] for i in indices.tolist()], values.tolist()))
         
         # Update predictions if available
-        if 'predictions' in frame_data:
-            self.morph_predictions = frame_data['predictions']
+        if frame_data.predictions is not None:
+            pred_indices, pred_velocities, pred_accelerations = frame_data.predictions
+            pred_indices = np.frombuffer(pred_indices, dtype=INDEX_DTYPE)
+            pred_velocities = np.frombuffer(pred_velocities, dtype=VALUE_DTYPE)
+            pred_accelerations = np.frombuffer(pred_accelerations, dtype=VALUE_DTYPE)
+            if pred_indices.size and pred_indices.max() >= len(names):
+                keep = pred_indices < len(names)
+                pred_indices = pred_indices[keep]
+                pred_velocities = pred_velocities[keep]
+                pred_accelerations = pred_accelerations[keep]
+            self._pred_mask.fill(False)
+            self._pred_mask[pred_indices] = True
+            self._vel[pred_indices] = pred_velocities
+            self._accel[pred_indices] = pred_accelerations
+            
+            # Rebuilt only when hints change; shared by the frames that follow
+            self.morph_predictions = {
+                names[i]: {'v': v, 'a': a}
+                for i, v, a in zip(pred_indices.tolist(), pred_velocities.tolist(),
+                                   pred_accelerations.tolist())
+            }
         
-        # Set target for interpolation
         if self.interpolation_enabled:
-            self.target_frame = self.current_frame.copy()
             self.interpolation_alpha = 0.0
         
         self.last_timestamp = timestamp
         
         return {
             'timestamp': timestamp,
-            'frame': frame_data['frame'],
-            'morphs': self.current_frame.copy(),
-            'predictions': self.morph_predictions.copy() if self.morph_predictions else None
+            'frame': frame_data.frame,
+            'morphs': dict(self._frame_dict),  # Snapshot; batches return several frames
+            'predictions': self.morph_predictions or None
         }
     
-    def interpolate_frame(self, current_time: float, target_fps: float = 30.0) -> Dict[str, float]:
+    def interpolate_frame(self, current_time: float, target_fps: float = 30.0) -> Mapping[str, float]:
         """
         Get interpolated frame for smooth animation.
         
@@ -314,54 +607,19 @@ class DeltaDecompressor:
             Interpolated morph values
         """
         if not self.interpolation_enabled:
-            return self.current_frame.copy()
+            return self.current_frame
         
         # Calculate interpolation progress
         frame_duration = 1.0 / target_fps
         time_since_update = current_time - self.last_timestamp
         self.interpolation_alpha = min(time_since_update / frame_duration, 1.0)
+        t = self.interpolation_alpha
         
-        # Interpolate morphs
-        interpolated = {}
+        # The latest frame is the interpolation target, so only morphs with
+        # motion hints move: blend toward the physics prediction, weighting
+        # it less as we approach the target
+        if t >= 1.0 or not self._pred_mask.any():
+            return self._to_dict(self._curr)
         
-        for morph, target_value in self.target_frame.items():
-            current_value = self.current_frame.get(morph, 0.0)
-            
-            # Check for prediction data
-            if morph in self.morph_predictions and self.interpolation_alpha < 1.0:
-                # Use prediction for smoother motion
-                prediction = self.morph_predictions[morph]
-                velocity = prediction.get('v', 0.0)
-                acceleration = prediction.get('a', 0.0)
-                
-                # Simple physics-based prediction
-                predicted_value = current_value + velocity * self.interpolation_alpha
-                predicted_value += 0.5 * acceleration * self.interpolation_alpha ** 2
-                
-                # Blend between linear and predicted
-                interpolated[morph] = self._smooth_interpolate(
-                    current_value, target_value, predicted_value, self.interpolation_alpha
-                )
-            else:
-                # Linear interpolation
-                interpolated[morph] = self._lerp(current_value, target_value, self.interpolation_alpha)
-        
-        return interpolated
-    
-    def _lerp(self, a: float, b: float, t: float) -> float:
-        """Linear interpolation"""
-        return a + (b - a) * t
-    
-    def _smooth_interpolate(self, current: float, target: float, predicted: float, t: float) -> float:
-        """Smooth interpolation with prediction blending"""
-        # Cubic ease-in-out
-        t2 = t * t
-        t3 = t2 * t
-        smooth_t = 3 * t2 - 2 * t3
-        
-        # Blend linear and predicted based on confidence
-        linear = self._lerp(current, target, smooth_t)
-        
-        # Weight prediction less as we approach target
-        prediction_weight = (1.0 - t) * 0.5
-        return linear * (1.0 - prediction_weight) + predicted * prediction_weight
\ No newline at end of file
+        interp_fused(self._curr, self._vel, self._accel, self._pred_mask, t, self._interp_out)
+        return self._to_dict(self._interp_out)
\ No newline at end of file
@@ -10,11 +10,34 @@ from collections import deque
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Deque
 import numpy as np
+import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Column order of the latency ring buffer
+LATENCY_COLUMNS = (
+    'udp_receive', 'decompression', 'processing', 'compression',
+    'websocket_send', 'client_render', 'total'
+)
+_RENDER_COL = LATENCY_COLUMNS.index('client_render')
+_TOTAL_COL = LATENCY_COLUMNS.index('total')
+_TREND_WINDOW = 10  # Frames per window when comparing recent vs older latency
+
+
+def _encode_json(obj: Dict) -> bytes:
+    """Encode a metrics dict as UTF-8 JSON, with msgspec when available"""
+    if MSGSPEC_AVAILABLE:
+        return msgspec.json.encode(obj)
+    return json.dumps(obj).encode()
+
 
 @dataclass
 class LatencyMetrics:
@@ -46,7 +69,7 @@ class Alert:
     level: str  # 'warning', 'critical'
     metric: str
     message: str
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: float = field(default_factory=time.monotonic)  # Monotonic seconds
     value: float = 0.0
     threshold: float = 0.0
 
@@ -73,10 +96,21 @@ class PerformanceMonitor:
         self.target_fps = target_fps
         self.history_size = history_size
         
-        # Latency tracking
-        self.latency_history: Deque[LatencyMetrics] = deque(maxlen=history_size)
+        # Latency tracking: ring buffer with one row per frame (see LATENCY_COLUMNS)
+        self._ring = np.zeros((history_size, len(LATENCY_COLUMNS)), dtype=np.float64)
+        self._cursor = 0
+        self._filled = 0
+        self._frames_recorded = 0
         self.latency_percentiles = {}
         
+        # Running sums over the ring, kept in step with each write
+        self._sum = np.zeros(len(LATENCY_COLUMNS), dtype=np.float64)
+        self._render_sum = 0.0      # Sum of reported (non-zero) client render times
+        self._render_count = 0
+        self._recent_sum = 0.0      # Totals of the newest _TREND_WINDOW frames
+        self._older_sum = 0.0       # Totals of the _TREND_WINDOW frames before those
+        self._percentile_handle: Optional[asyncio.TimerHandle] = None
+        
         # Frame tracking
         self.frame_timestamps: Deque[float] = deque(maxlen=100)
         self.dropped_frame_count = 0
@@ -102,21 +136,40 @@ class PerformanceMonitor:
             'memory_warning': 500.0                           # 500 MB
         }
         
-        # Timing helpers
-        self.timers: Dict[str, float] = {}
+        # Timing helpers (integer nanoseconds from perf_counter_ns)
+        self.timers: Dict[str, int] = {}
+        # Start time of each pipeline stage, indexed like LATENCY_COLUMNS (0 = idle)
+        self._stage_start: List[int] = [0] * _TOTAL_COL
     
     def start_timer(self, name: str):
         """Start a named timer"""
-        self.timers[name] = time.perf_counter()
+        self.timers[name] = time.perf_counter_ns()
     
     def end_timer(self, name: str) -> float:
         """End a named timer and return duration in milliseconds"""
-        if name not in self.timers:
+        start = self.timers.pop(name, None)
+        if start is None:
+            return 0.0
+        
+        return (time.perf_counter_ns() - start) * 1e-6
+    
+    def start_stage(self, stage: int):
+        """
+        Start timing a pipeline stage without a name lookup.
+        
+        Args:
+            stage: Stage index in LATENCY_COLUMNS (e.g. LATENCY_COLUMNS.index('processing'))
+        """
+        self._stage_start[stage] = time.perf_counter_ns()
+    
+    def end_stage(self, stage: int) -> float:
+        """End a pipeline stage timer and return duration in milliseconds"""
+        start = self._stage_start[stage]
+        if not start:
             return 0.0
         
-        duration = (time.perf_counter() - self.timers[name]) * 1000
-        del self.timers[name]
-        return duration
+        self._stage_start[stage] = 0
+        return (time.perf_counter_ns() - start) * 1e-6
     
     def record_frame(self, latency: LatencyMetrics, metrics: Optional[PerformanceMetrics] = None):
         """
@@ -131,8 +184,29 @@ class PerformanceMonitor:
                         latency.processing + latency.compression + 
                         latency.websocket_send + latency.client_render)
         
-        # Add to history
-        self.latency_history.append(latency)
+        # Add to history, retiring the evicted row from the running sums
+        slot = self._cursor
+        row = self._ring[slot]
+        if self._filled == self.history_size:
+            self._sum -= row
+            if row[_RENDER_COL] > 0:
+                self._render_sum -= row[_RENDER_COL]
+                self._render_count -= 1
+        
+        row[:] = (
+            latency.udp_receive, latency.decompression, latency.processing,
+            latency.compression, latency.websocket_send, latency.client_render,
+            latency.total
+        )
+        self._sum += row
+        if latency.client_render > 0:
+            self._render_sum += latency.client_render
+            self._render_count += 1
+        
+        self._cursor = (slot + 1) % self.history_size
+        self._filled = min(self._filled + 1, self.history_size)
+        self._frames_recorded += 1
+        self._update_trend_sums(slot, latency.total)
         
         # Update frame tracking
         current_time = time.time()
@@ -155,29 +229,128 @@ class PerformanceMonitor:
         self._check_alerts(latency)
         
         # Update percentiles periodically
-        if len(self.latency_history) % 10 == 0:
+        if self._frames_recorded % 10 == 0:
+            self._schedule_percentiles()
+    
+    def record_frames_batch(self, rows: np.ndarray):
+        """
+        Record several frames' latency breakdowns at once.
+        
+        Only the latency history is updated; frame rate tracking stays with
+        record_frame. Alerts are evaluated once, on the slowest frame.
+        
+        Args:
+            rows: Array of shape (B, 7) in LATENCY_COLUMNS order; the total
+                column is recomputed from the stages
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or rows.shape[1] != len(LATENCY_COLUMNS):
+            raise ValueError(f"Expected rows of shape (B, {len(LATENCY_COLUMNS)}), got {rows.shape}")
+        if rows.shape[0] == 0:
+            return
+        
+        # Only the newest history_size rows can survive in the ring
+        count = rows.shape[0]
+        tail = rows[-self.history_size:]
+        n = tail.shape[0]
+        
+        # Copy in at most two slices around the wrap point
+        start = self._cursor
+        first = min(n, self.history_size - start)
+        self._ring[start:start + first] = tail[:first]
+        self._ring[:n - first] = tail[first:]
+        written = np.arange(start, start + n) % self.history_size
+        self._ring[written, _TOTAL_COL] = self._ring[written, :_TOTAL_COL].sum(axis=1)
+        
+        self._cursor = (start + n) % self.history_size
+        self._filled = min(self._filled + n, self.history_size)
+        self._frames_recorded += count
+        self._resync_sums()
+        
+        # One alert evaluation per batch
+        worst = self._ring[written[np.argmax(self._ring[written, _TOTAL_COL])]]
+        self._check_alerts(LatencyMetrics(*worst.tolist()))
+        
+        self._schedule_percentiles()
+    
+    def _update_trend_sums(self, slot: int, total: float):
+        """Slide the recent/older trend windows forward by the row just written"""
+        if self.history_size <= 2 * _TREND_WINDOW:
+            # The evicted row would be the one just written; recompute instead
+            self._resync_sums()
+            return
+        
+        self._recent_sum += total
+        if self._filled > _TREND_WINDOW:
+            moved = self._ring[(slot - _TREND_WINDOW) % self.history_size, _TOTAL_COL]
+            self._recent_sum -= moved
+            self._older_sum += moved
+        if self._filled > 2 * _TREND_WINDOW:
+            self._older_sum -= self._ring[(slot - 2 * _TREND_WINDOW) % self.history_size, _TOTAL_COL]
+    
+    def _resync_sums(self):
+        """Recompute the running sums from the ring"""
+        rows = self._ring[:self._filled]
+        self._sum = rows.sum(axis=0)
+        render = rows[:, _RENDER_COL]
+        reported = render[render > 0]
+        self._render_sum = float(reported.sum())
+        self._render_count = int(reported.size)
+        
+        totals = self._recent_rows(2 * _TREND_WINDOW)[:, _TOTAL_COL]
+        self._recent_sum = float(totals[-_TREND_WINDOW:].sum())
+        self._older_sum = float(totals[:-_TREND_WINDOW].sum())
+    
+    def _schedule_percentiles(self):
+        """Recompute percentiles off the producer path when an event loop is running"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
             self._update_percentiles()
+            return
+        
+        if self._percentile_handle is None:
+            self._percentile_handle = loop.call_later(0.5, self._run_scheduled_percentiles)
+    
+    def _run_scheduled_percentiles(self):
+        """Event loop callback for a deferred percentile update"""
+        self._percentile_handle = None
+        self._update_percentiles()
+    
+    def _recent_rows(self, count: int) -> np.ndarray:
+        """Get the most recent latency rows in chronological order"""
+        count = min(count, self._filled)
+        idx = (self._cursor - count + np.arange(count)) % self.history_size
+        return self._ring[idx]
     
     def _update_percentiles(self):
         """Update latency percentiles"""
-        if not self.latency_history:
+        n = self._filled
+        if n == 0:
             return
         
-        latencies = [l.total for l in self.latency_history]
+        # Bound floating-point drift in the running sums
+        self._resync_sums()
+        
+        # A single O(n) partition places every requested rank
+        ranks = (n // 2, n * 90 // 100, n * 95 // 100, n * 99 // 100)
+        totals = np.partition(self._ring[:n, _TOTAL_COL], ranks)
+        p50, p90, p95, p99 = totals[list(ranks)].tolist()
         self.latency_percentiles = {
-            'p50': np.percentile(latencies, 50),
-            'p90': np.percentile(latencies, 90),
-            'p95': np.percentile(latencies, 95),
-            'p99': np.percentile(latencies, 99),
-            'mean': np.mean(latencies),
-            'std': np.std(latencies)
+            'p50': p50,
+            'p90': p90,
+            'p95': p95,
+            'p99': p99,
+            'mean': float(totals.mean()),
+            'std': float(totals.std())
         }
     
     def _check_alerts(self, latency: LatencyMetrics):
         """Check for performance alerts"""
-        # Clear old alerts
-        self.active_alerts = [a for a in self.active_alerts 
-                             if datetime.now() - a.timestamp < timedelta(minutes=5)]
+        # Clear alerts older than 5 minutes
+        if self.active_alerts:
+            now = time.monotonic()
+            self.active_alerts = [a for a in self.active_alerts if now - a.timestamp < 300.0]
         
         # Check latency
         if latency.total > self.thresholds['latency_critical']:
@@ -227,6 +400,12 @@ class PerformanceMonitor:
         
         logger.warning(f"Performance alert: {message}")
     
+    @staticmethod
+    def _alert_time(alert: Alert) -> str:
+        """Convert an alert's monotonic timestamp to wall-clock ISO format"""
+        age = time.monotonic() - alert.timestamp
+        return datetime.fromtimestamp(time.time() - age).isoformat()
+    
     def get_current_fps(self) -> float:
         """Calculate current frame rate"""
         if len(self.frame_timestamps) < 2:
@@ -240,7 +419,7 @@ class PerformanceMonitor:
     
     def get_latency_report(self) -> Dict:
         """Get detailed latency report"""
-        if not self.latency_history:
+        if not self._filled:
             return {
                 'current': None,
                 'percentiles': {},
@@ -249,25 +428,19 @@ class PerformanceMonitor:
             }
         
         # Current latency
-        current = self.latency_history[-1]
-        
-        # Average breakdown
-        breakdown = {
-            'udp_receive': np.mean([l.udp_receive for l in self.latency_history]),
-            'decompression': np.mean([l.decompression for l in self.latency_history]),
-            'processing': np.mean([l.processing for l in self.latency_history]),
-            'compression': np.mean([l.compression for l in self.latency_history]),
-            'websocket_send': np.mean([l.websocket_send for l in self.latency_history]),
-            'client_render': np.mean([l.client_render for l in self.latency_history if l.client_render > 0])
-        }
+        current = dict(zip(LATENCY_COLUMNS, self._ring[(self._cursor - 1) % self.history_size].tolist()))
+        
+        # Average breakdown from the running sums
+        means = self._sum / self._filled
+        breakdown = dict(zip(LATENCY_COLUMNS[:_RENDER_COL], means[:_RENDER_COL].tolist()))
+        breakdown['client_render'] = (self._render_sum / self._render_count
+                                      if self._render_count else 0.0)
         
         # Trend analysis
-        if len(self.latency_history) > 10:
-            recent = [l.total for l in list(self.latency_history)[-10:]]
-            older = [l.total for l in list(self.latency_history)[-20:-10]]
-            
-            recent_avg = np.mean(recent)
-            older_avg = np.mean(older) if older else recent_avg
+        if self._filled > _TREND_WINDOW:
+            recent_avg = self._recent_sum / _TREND_WINDOW
+            older_count = min(self._filled - _TREND_WINDOW, _TREND_WINDOW)
+            older_avg = self._older_sum / older_count
             
             if recent_avg > older_avg * 1.1:
                 trend = 'increasing'
@@ -280,15 +453,8 @@ class PerformanceMonitor:
         
         return {
             'current': {
-                'total': current.total,
-                'breakdown': {
-                    'udp_receive': current.udp_receive,
-                    'decompression': current.decompression,
-                    'processing': current.processing,
-                    'compression': current.compression,
-                    'websocket_send': current.websocket_send,
-                    'client_render': current.client_render
-                }
+                'total': current.pop('total'),
+                'breakdown': current
             },
             'percentiles': self.latency_percentiles,
             'average_breakdown': breakdown,
@@ -317,7 +483,7 @@ class PerformanceMonitor:
                     'level': a.level,
                     'metric': a.metric,
                     'message': a.message,
-                    'timestamp': a.timestamp.isoformat()
+                    'timestamp': self._alert_time(a)
                 }
                 for a in self.active_alerts
             ],
@@ -351,27 +517,29 @@ class PerformanceMonitor:
         return {
             'timestamp': datetime.now().isoformat(),
             'summary': self.get_performance_summary(),
-            'latency_history': [
-                {
-                    'total': l.total,
-                    'udp': l.udp_receive,
-                    'decompress': l.decompression,
-                    'process': l.processing,
-                    'compress': l.compression,
-                    'websocket': l.websocket_send,
-                    'render': l.client_render
-                }
-                for l in list(self.latency_history)[-100:]  # Last 100 frames
-            ],
+            'latency_history': {
+                'columns': list(LATENCY_COLUMNS),
+                'rows': self._recent_rows(100).tolist()  # Last 100 frames
+            },
             'alerts': [
                 {
                     'level': a.level,
                     'metric': a.metric,
                     'message': a.message,
-                    'timestamp': a.timestamp.isoformat(),
+                    'timestamp': self._alert_time(a),
                     'value': a.value,
                     'threshold': a.threshold
                 }
                 for a in list(self.alert_history)[-50:]  # Last 50 alerts
             ]
-        }
\ No newline at end of file
+        }
+    
+    def export_metrics_json(self) -> bytes:
+        """Export metrics as UTF-8 JSON"""
+        return _encode_json(self.export_metrics())
+    
+    async def export_metrics_json_async(self) -> bytes:
+        """Export metrics as JSON, encoding in a worker thread to keep the event loop free"""
+        # The snapshot is taken on the loop, so record_frame can't change the
+        # buffers mid-read; the thread only sees the finished dict
+        return await asyncio.to_thread(_encode_json, self.export_metrics())
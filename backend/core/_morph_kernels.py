@@ -0,0 +1,285 @@
+"""
+Numeric kernels for per-frame morph smoothing and blending
+Compiled with Numba when available, with equivalent NumPy fallbacks
+"""
+
+import sys
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# The core modules load this file both as a package member and as a top-level
+# sibling, and Numba's on-disk cache records the module name it was compiled
+# under. Aliasing every name lets a cache written through one path load
+# through the others
+for _name in ('_morph_kernels', 'core._morph_kernels', 'backend.core._morph_kernels'):
+    sys.modules.setdefault(_name, sys.modules[__name__])
+
+
+def smoothing_weights(window: int) -> np.ndarray:
+    """
+    Normalized recency weights for every history length up to window.
+
+    Row k - 1 holds the k weights, oldest first, used once a morph has
+    k values in its history; the rest of the row is zero.
+    """
+    weights = np.zeros((window, window), dtype=np.float32)
+    for k in range(1, window + 1):
+        w = np.exp(np.linspace(-1, 0, k))
+        weights[k - 1, :k] = w / w.sum()
+    return weights
+
+
+def _smooth_window_numpy(values, slots, window, pos, count, weights, out):
+    """Fallback for smooth_window"""
+    size = window.shape[1]
+    for j in range(slots.shape[0]):
+        s = slots[j]
+        p = pos[s]
+        window[s, p] = values[j]
+        pos[s] = (p + 1) % size
+        count[s] = min(count[s] + 1, size)
+        c = count[s]
+        order = (pos[s] - c + np.arange(c)) % size
+        out[s] = np.dot(weights[c - 1, :c], window[s, order])
+
+
+def _blend_numpy(current, target, speed):
+    """Vectorized fallback for blend"""
+    diff = target - current
+    current[:] = np.where(np.abs(diff) > 0.001, current + diff * speed, target)
+
+
+def _blend_clamp_numpy(current, target, speed, out):
+    """Vectorized fallback for blend_clamp"""
+    _blend_numpy(current, target, speed)
+    np.clip(current, 0.0, 1.0, out=out)
+    out[out <= 0.01] = 0.0
+
+
+def _transition_speed_numpy(seen, base, rule_to, rule_offsets, rule_from, rule_speed, out):
+    """Fallback for transition_speed"""
+    out.fill(base)
+    for r in range(rule_to.shape[0]):
+        if seen[rule_from[rule_offsets[r]:rule_offsets[r + 1]]].any():
+            out[rule_to[r]] *= rule_speed[r]
+
+
+def _add_saturate_numpy(frame, idx, values, scale):
+    """Vectorized fallback for add_saturate"""
+    frame[idx] = np.minimum(frame[idx] + values * scale, 1.0)
+
+
+def _add_saturate_rows_numpy(frames, idx, values, scale):
+    """Vectorized fallback for add_saturate_rows"""
+    frames[:, idx] = np.minimum(frames[:, idx] + values * scale, 1.0)
+
+
+def _blend_sequence_numpy(current, seen, targets, touched, base, rule_to, rule_offsets,
+                          rule_from, rule_speed, speed, out, out_seen):
+    """Fallback for blend_sequence"""
+    for t in range(targets.shape[0]):
+        _transition_speed_numpy(seen, base, rule_to, rule_offsets, rule_from, rule_speed, speed)
+        _blend_numpy(current, targets[t], speed)
+        seen |= touched[t]
+        out[t] = current
+        out_seen[t] = seen
+
+
+def _select_morphs_numpy(vec, allowed, min_value, out_idx):
+    """Vectorized fallback for select_morphs"""
+    idx = np.flatnonzero((np.abs(vec) > min_value) & allowed)
+    n = idx.shape[0]
+    out_idx[:n] = idx
+    return n
+
+
+def _delta_update_numpy(cur, prev, threshold, out_idx):
+    """Vectorized fallback for delta_update"""
+    mask = np.abs(cur - prev) > threshold
+    mask |= (cur == 0.0) & (prev != 0.0)
+    idx = np.flatnonzero(mask)
+    n = idx.shape[0]
+    out_idx[:n] = idx
+    prev[idx] = cur[idx]
+    return n
+
+
+if NUMBA_AVAILABLE:
+    # Explicit signatures compile the kernels at import (or load them from the
+    # on-disk cache), so the first animation frame doesn't pay for JIT compilation
+    # C-contiguous ([::1]) signatures let LLVM drop stride arithmetic and
+    # vectorize the per-morph loops. nogil lets mappers for different avatars
+    # run their kernels on separate threads in parallel
+    @njit("void(float32[::1], intp[::1], float32[:, ::1], intp[::1], intp[::1], float32[:, ::1], "
+          "float32[::1])", cache=True, fastmath=True, nogil=True)
+    def smooth_window(values, slots, window, pos, count, weights, out):
+        """
+        Push new values into per-morph rolling windows and smooth them.
+
+        For each j, appends values[j] to the ring buffer row of slots[j]
+        and writes the recency-weighted mean of that row's history into
+        out[slots[j]].
+        """
+        size = window.shape[1]
+        for j in range(slots.shape[0]):
+            s = slots[j]
+            p = pos[s]
+            window[s, p] = values[j]
+            p += 1
+            if p == size:
+                p = 0
+            pos[s] = p
+            c = count[s]
+            if c < size:
+                c += 1
+                count[s] = c
+            acc = np.float32(0.0)
+            for k in range(c):
+                acc += weights[c - 1, k] * window[s, (p - c + k) % size]
+            out[s] = acc
+
+    @njit("void(float32[::1], float32[::1], float32[::1])", cache=True, fastmath=True, nogil=True)
+    def blend(current, target, speed):
+        """
+        Move current toward target in place.
+
+        Each morph steps by speed times its distance to target, and snaps
+        to target once that distance is 0.001 or less.
+        """
+        for i in range(current.shape[0]):
+            d = target[i] - current[i]
+            ad = d if d >= 0 else -d
+            if ad > 0.001:
+                current[i] += d * speed[i]
+            else:
+                current[i] = target[i]
+
+    @njit("void(float32[::1], float32[::1], float32[::1], float32[::1])",
+          cache=True, fastmath=True, nogil=True)
+    def blend_clamp(current, target, speed, out):
+        """
+        blend, then write current clamped to [0, 1] into out in the same pass.
+
+        Values at or below 0.01 are written as zero to suppress noise.
+        """
+        for i in range(current.shape[0]):
+            c = current[i]
+            d = target[i] - c
+            ad = d if d >= 0 else -d
+            if ad > 0.001:
+                c += d * speed[i]
+            else:
+                c = target[i]
+            current[i] = c
+            if c > 1.0:
+                c = 1.0
+            out[i] = c if c > 0.01 else 0.0
+
+    @njit("void(boolean[::1], float32, intp[::1], intp[::1], intp[::1], float32[::1], float32[::1])",
+          cache=True, fastmath=True, nogil=True)
+    def transition_speed(seen, base, rule_to, rule_offsets, rule_from, rule_speed, out):
+        """
+        Fill out with the per-morph blend speed.
+
+        Every morph gets base, except rule r's target rule_to[r], which is
+        scaled by rule_speed[r] once any of its source slots
+        rule_from[rule_offsets[r]:rule_offsets[r + 1]] has been seen.
+        """
+        out[:] = base
+        for r in range(rule_to.shape[0]):
+            for k in range(rule_offsets[r], rule_offsets[r + 1]):
+                if seen[rule_from[k]]:
+                    out[rule_to[r]] *= rule_speed[r]
+                    break
+
+    @njit("void(float32[::1], intp[::1], float32[::1], float32)", cache=True, fastmath=True, nogil=True)
+    def add_saturate(frame, idx, values, scale):
+        """Add values * scale into frame at idx, saturating at 1"""
+        for k in range(idx.shape[0]):
+            v = frame[idx[k]] + values[k] * scale
+            frame[idx[k]] = v if v < 1.0 else 1.0
+
+    @njit("void(float32[:, ::1], intp[::1], float32[::1], float32)", cache=True, fastmath=True, nogil=True)
+    def add_saturate_rows(frames, idx, values, scale):
+        """add_saturate applied to every row of frames in one pass"""
+        for t in range(frames.shape[0]):
+            for k in range(idx.shape[0]):
+                v = frames[t, idx[k]] + values[k] * scale
+                frames[t, idx[k]] = v if v < 1.0 else 1.0
+
+    @njit("void(float32[::1], boolean[::1], float32[:, ::1], boolean[:, ::1], float32, intp[::1], "
+          "intp[::1], intp[::1], float32[::1], float32[::1], float32[:, ::1], boolean[:, ::1])",
+          cache=True, fastmath=True, nogil=True)
+    def blend_sequence(current, seen, targets, touched, base, rule_to, rule_offsets,
+                       rule_from, rule_speed, speed, out, out_seen):
+        """
+        Blend current through a sequence of target frames.
+
+        Each step applies transition_speed and blend toward targets[t],
+        marks touched[t] as seen, and records current and seen in row t of
+        out and out_seen.
+        """
+        for t in range(targets.shape[0]):
+            transition_speed(seen, base, rule_to, rule_offsets, rule_from, rule_speed, speed)
+            blend(current, targets[t], speed)
+            for i in range(seen.shape[0]):
+                if touched[t, i]:
+                    seen[i] = True
+            out[t] = current
+            out_seen[t] = seen
+
+    @njit("intp(float32[::1], boolean[::1], float32, intp[::1])", cache=True, fastmath=True, nogil=True)
+    def select_morphs(vec, allowed, min_value, out_idx):
+        """
+        Write the allowed slots whose |value| exceeds min_value into out_idx.
+
+        Returns:
+            Number of selected slots
+        """
+        n = 0
+        for i in range(vec.shape[0]):
+            v = vec[i]
+            av = v if v >= 0 else -v
+            if av > min_value and allowed[i]:
+                out_idx[n] = i
+                n += 1
+        return n
+
+    @njit("intp(float32[::1], float32[::1], float32, intp[::1])", cache=True, fastmath=True, nogil=True)
+    def delta_update(cur, prev, threshold, out_idx):
+        """
+        Select slots that changed by more than threshold or dropped to zero.
+
+        Writes the selected slots into out_idx and copies their cur values
+        into prev.
+
+        Returns:
+            Number of selected slots
+        """
+        n = 0
+        for i in range(cur.shape[0]):
+            c = cur[i]
+            p = prev[i]
+            d = c - p
+            ad = d if d >= 0 else -d
+            if ad > threshold or (c == 0.0 and p != 0.0):
+                out_idx[n] = i
+                n += 1
+                prev[i] = c
+        return n
+else:
+    smooth_window = _smooth_window_numpy
+    blend = _blend_numpy
+    blend_clamp = _blend_clamp_numpy
+    transition_speed = _transition_speed_numpy
+    add_saturate = _add_saturate_numpy
+    add_saturate_rows = _add_saturate_rows_numpy
+    blend_sequence = _blend_sequence_numpy
+    select_morphs = _select_morphs_numpy
+    delta_update = _delta_update_numpy
@@ -4,14 +4,131 @@ Integrates all components for production-ready facial animation
 """
 
 import asyncio
+import base64
 import json
-from typing import Dict, List, Optional, Tuple
+import logging
+import logging.handlers
+import queue
+import struct
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import time
 
-from facial_animation_mapper_enhanced import FacialAnimationMapperEnhanced
-from viseme_transition_engine import VisemeTransitionEngine
-from facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer
+import numpy as np
+
+try:
+    from .facial_animation_mapper_enhanced import FacialAnimationMapperEnhanced, ArkitIngressBuffer
+    from .viseme_transition_engine import VisemeTransitionEngine
+    from .facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer, MorphSlots
+    from .websocket_protocol import dumps_message
+except ImportError:
+    # Loaded as a top-level module with backend/core on sys.path
+    from facial_animation_mapper_enhanced import FacialAnimationMapperEnhanced, ArkitIngressBuffer
+    from viseme_transition_engine import VisemeTransitionEngine
+    from facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer, MorphSlots
+    from websocket_protocol import dumps_message
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between repeats of the same hot-path error in the log
+ERROR_LOG_INTERVAL = 1.0
+
+_error_log_state: Dict[str, list] = {}  # key -> [last logged at, suppressed count]
+
+
+def _log_error(key: str, message: str):
+    """Log an error at most once per ERROR_LOG_INTERVAL per key, counting the rest"""
+    now = time.monotonic()
+    state = _error_log_state.setdefault(key, [-ERROR_LOG_INTERVAL, 0])
+    if now - state[0] < ERROR_LOG_INTERVAL:
+        state[1] += 1
+        return
+    if state[1]:
+        message = f"{message} ({state[1]} similar errors suppressed)"
+    state[0], state[1] = now, 0
+    logger.error(message)
+
+
+def start_background_logging() -> logging.handlers.QueueListener:
+    """
+    Move the root logger's handlers onto a background thread.
+    
+    Log calls from the event loop then only enqueue records, and stream or
+    file I/O happens on the listener thread. Call stop() on the returned
+    listener at shutdown to flush it.
+    """
+    root = logging.getLogger()
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    listener.start()
+    return listener
+
+
+def _keep_frame(morphs: Dict[str, float]) -> Dict[str, float]:
+    """Frame post-processing used when performance optimization is disabled"""
+    return morphs
+
+
+def decode_udp_packet(udp_data: bytes) -> dict:
+    """Parse a UDP packet: JSON text when it starts with '{', msgpack otherwise"""
+    if udp_data[:1] == b'{' or not MSGPACK_AVAILABLE:
+        return json.loads(udp_data)
+    return msgpack.unpackb(udp_data, raw=False)
+
+
+def _arkit_input(packet: dict) -> Union[Dict[str, float], np.ndarray, None]:
+    """
+    ARKit values carried by a packet, if any.
+    
+    'bs' holds little-endian float32 bytes and 'blendShapeValues' a list,
+    both ordered like the mapper's ARKIT_ORDER; 'blendShapes' is a name dict.
+    """
+    if 'bs' in packet:
+        return np.frombuffer(packet['bs'], dtype='<f4')
+    if 'blendShapes' in packet:
+        return packet['blendShapes']
+    if 'blendShapeValues' in packet:
+        return np.asarray(packet['blendShapeValues'], dtype=np.float32)
+    return None
+
+
+# Clients sent to per gather() before yielding to the event loop
+BROADCAST_BATCH_SIZE = 50
+
+# Idle animation is held off this long after the last live frame
+LIVE_HOLD_SECONDS = 0.25
+
+# Morphs that moved less than this since they were last sent are left out of broadcasts
+BROADCAST_EPSILON = 1e-3
+
+# Raw ARKit frames waiting for the mapping stage; the oldest is dropped when full
+RAW_QUEUE_SIZE = 4
+
+# Micro-expression triggered when switching to an emotion
+EMOTION_MICRO_EXPRESSIONS = {
+    'happy': 'subtle_smile',
+    'surprised': 'eye_flash',
+    'angry': 'lip_tighten'
+}
+
+# Binary speech batch header: magic, frame count, morph count,
+# frame interval (microseconds), start timestamp (ms since epoch)
+SPEECH_BATCH_MAGIC = 0x48435053  # b'SPCH'
+SPEECH_BATCH_HEADER = struct.Struct('<IIIIQ')
 
 
 @dataclass
@@ -27,6 +144,19 @@ class AnimationConfig:
     emotion_intensity: float = 0.5
     websocket_host: str = "localhost"
     websocket_port: int = 8765
+    websocket_compression: bool = True  # permessage-deflate for JSON broadcasts
+    udp_host: str = "localhost"
+    udp_port: int = 5005
+    quantize_broadcasts: bool = False  # Send uint8 'blendshape_q8' updates instead of JSON floats
+    batch_speech_frames: bool = False  # Send phoneme sequences as one binary float16 message
+
+
+@dataclass
+class ArkitFrame:
+    """Raw ARKit frame on its way from UDP ingest to the mapping stage"""
+    blendshapes: Union[Dict[str, float], np.ndarray]
+    t: float  # time.monotonic() at ingest
+    seq: int
 
 
 class EnhancedFacialAnimationSystem:
@@ -49,43 +179,100 @@ class EnhancedFacialAnimationSystem:
         self.current_emotion = "neutral"
         self.emotion_intensity = self.config.emotion_intensity
         self.is_speaking = False
-        self.animation_queue = asyncio.Queue()
+        self.animation_queue: deque = deque()  # Speech frames, polled once per playback tick
         self.websocket_clients = set()
         
+        # Per-frame post-processing, chosen once here instead of per frame;
+        # returns None for frames the optimizer skips
+        self._frame_postproc = (self.optimizer.process_frame
+                                if self.config.enable_performance_optimization else _keep_frame)
+        
+        # Mapping runs in worker threads; the mapper and optimizer keep per-frame state
+        self._mapper_lock = threading.Lock()
+        
+        # Pipeline: UDP ingest -> raw queue -> mapping_loop -> live frame -> playback loop
+        self._raw_queue: deque = deque(maxlen=RAW_QUEUE_SIZE)
+        self._raw_ready = asyncio.Event()
+        self._raw_seq = 0
+        self._mapping_active = False
+        
+        # Packed ARKit frames pushed by a producer thread, read once per playback tick
+        self._ingress = ArkitIngressBuffer()
+        self._ingress_frame = np.zeros(self._ingress.size, dtype=np.float32)
+        self._ingress_seq = 0  # Sequence number of the last frame mapped
+        
+        # Latest real-time frame (newest wins), consumed once per playback tick
+        self._live_frame: Optional[Dict[str, float]] = None
+        self._last_live_time = 0.0
+        
+        # Broadcast-side morph slots, owned by the event loop so broadcasting never
+        # waits on _mapper_lock; starts in the mapper's layout and grows independently
+        self._slots = MorphSlots(self.mapper.morph_names)
+        
+        # Morph values as last sent to clients, indexed like _slots.names
+        self._last_sent = np.zeros(len(self._slots), dtype=np.float32)
+        self._schema_size = 0  # Length of the name table last sent to quantized clients
+        
+        # Scratch vectors for broadcast_morphs, reused across frames
+        self._vec_buf = np.zeros_like(self._last_sent)
+        self._diff_buf = np.zeros_like(self._last_sent)
+        
         # Performance tracking
         self.frame_count = 0
+        self.dropped_frames = 0  # Playback frames skipped after falling a period behind
         self.start_time = time.time()
     
-    async def process_arkit_data(self, arkit_data: Dict[str, float]) -> Dict[str, float]:
-        """Process ARKit data with all enhancements"""
-        # Apply enhanced mapping
-        morphs = self.mapper.map_arkit_to_cc4_enhanced(
-            arkit_data,
-            emotion=self.current_emotion,
-            emotion_intensity=self.emotion_intensity,
-            add_micro_expressions=self.config.enable_micro_expressions,
-            add_natural_movements=self.config.enable_natural_movements
+    async def process_arkit_data(self, arkit_data: Union[Dict[str, float], np.ndarray],
+                                 t: Optional[float] = None) -> Dict[str, float]:
+        """Process ARKit data with all enhancements, off the event loop; t is its time.monotonic() capture time"""
+        return await asyncio.to_thread(
+            self._cpu_process_arkit, arkit_data, self.current_emotion, self.emotion_intensity, t
         )
-        
-        # Apply performance optimization
-        if self.config.enable_performance_optimization:
-            morphs = self.optimizer.process_frame(morphs)
-            if morphs is None:  # Frame skipped
-                return {}
-        
-        return morphs
+    
+    def _cpu_process_arkit(self, arkit_data: Union[Dict[str, float], np.ndarray], emotion: str,
+                           emotion_intensity: float, t: Optional[float] = None) -> Dict[str, float]:
+        """Synchronous core of process_arkit_data, run in a worker thread"""
+        with self._mapper_lock:
+            # Apply enhanced mapping
+            morphs = self.mapper.map_arkit_to_cc4_enhanced(
+                arkit_data,
+                emotion=emotion,
+                emotion_intensity=emotion_intensity,
+                add_micro_expressions=self.config.enable_micro_expressions,
+                add_natural_movements=self.config.enable_natural_movements,
+                t=t
+            )
+            
+            # Apply performance optimization
+            morphs = self._frame_postproc(morphs)
+            return {} if morphs is None else morphs  # None: frame skipped
     
     async def process_phoneme_sequence(self, phoneme_data: List[Dict]) -> List[Dict[str, float]]:
-        """Process phoneme sequence for speech animation"""
+        """Process phoneme sequence for speech animation, off the event loop"""
         self.is_speaking = True
-        
+        try:
+            return await asyncio.to_thread(
+                self._cpu_process_phonemes, phoneme_data, self.current_emotion, self.emotion_intensity
+            )
+        finally:
+            self.is_speaking = False
+    
+    def _cpu_process_phonemes(self, phoneme_data: List[Dict], emotion: str,
+                              emotion_intensity: float) -> List[Dict[str, float]]:
+        """Synchronous core of process_phoneme_sequence, run in a worker thread"""
+        with self._mapper_lock:
+            return self._phonemes_to_frames(phoneme_data, emotion, emotion_intensity)
+    
+    def _phonemes_to_frames(self, phoneme_data: List[Dict], emotion: str,
+                            emotion_intensity: float) -> List[Dict[str, float]]:
+        """Map phonemes to visemes, smooth transitions, and apply emotion and optimization"""
         # Add viseme information to phoneme data
         enhanced_phonemes = []
         for i, phoneme_info in enumerate(phoneme_data):
             phoneme = phoneme_info['phoneme']
             
-            # Get viseme mapping
-            viseme_morphs = self.mapper.map_phoneme_to_viseme_enhanced(
+            # Get viseme mapping and its primary viseme
+            viseme_morphs, primary_viseme = self.mapper.map_phoneme_with_primary(
                 phoneme,
                 phoneme_info.get('intensity', 1.0),
                 context=(
@@ -94,9 +281,6 @@ class EnhancedFacialAnimationSystem:
                 )
             )
             
-            # Find primary viseme
-            primary_viseme = max(viseme_morphs.items(), key=lambda x: x[1])[0] if viseme_morphs else 'V_None'
-            
             enhanced_phonemes.append({
                 'phoneme': phoneme,
                 'viseme': primary_viseme,
@@ -113,33 +297,19 @@ class EnhancedFacialAnimationSystem:
         )
         
         # Add emotion overlay to speech
-        if self.config.enable_emotions and self.current_emotion != 'neutral':
-            emotion_frames = []
-            for frame in smooth_frames:
-                emotion_frame = self.mapper.apply_emotion_layer(
-                    frame,
-                    {self.current_emotion: self.emotion_intensity}
-                )
-                emotion_frames.append(emotion_frame)
-            smooth_frames = emotion_frames
-        
-        # Optimize each frame
-        if self.config.enable_performance_optimization:
-            optimized_frames = []
-            for frame in smooth_frames:
-                opt_frame = self.optimizer.process_frame(frame)
-                if opt_frame is not None:  # Skip None frames
-                    optimized_frames.append(opt_frame)
-            smooth_frames = optimized_frames
+        if self.config.enable_emotions and emotion != 'neutral':
+            smooth_frames = self.mapper.apply_emotion_to_frames(
+                smooth_frames, emotion, emotion_intensity
+            )
         
-        self.is_speaking = False
-        return smooth_frames
+        # Optimize each frame, dropping skipped (None) frames
+        return [frame for frame in map(self._frame_postproc, smooth_frames) if frame is not None]
     
     async def set_emotion(self, emotion: str, intensity: float = None, 
                          transition_time: float = 1.0):
         """Set current emotion with optional transition"""
         if emotion not in self.mapper.emotion_presets:
-            print(f"Warning: Unknown emotion '{emotion}', using 'neutral'")
+            logger.warning(f"Unknown emotion '{emotion}', using 'neutral'")
             emotion = 'neutral'
         
         self.current_emotion = emotion
@@ -148,16 +318,18 @@ class EnhancedFacialAnimationSystem:
         
         # Trigger appropriate micro-expressions
         if self.config.enable_micro_expressions:
-            if emotion == 'happy':
-                self.mapper.trigger_micro_expression('subtle_smile')
-            elif emotion == 'surprised':
-                self.mapper.trigger_micro_expression('eye_flash')
-            elif emotion == 'angry':
-                self.mapper.trigger_micro_expression('lip_tighten')
+            expression = EMOTION_MICRO_EXPRESSIONS.get(emotion)
+            if expression:
+                await asyncio.to_thread(self._cpu_trigger_micro_expression, expression)
     
     async def trigger_micro_expression(self, expression_type: str):
-        """Manually trigger a micro-expression"""
+        """Manually trigger a micro-expression, off the event loop"""
         if self.config.enable_micro_expressions:
+            await asyncio.to_thread(self._cpu_trigger_micro_expression, expression_type)
+    
+    def _cpu_trigger_micro_expression(self, expression_type: str):
+        """Synchronous core of trigger_micro_expression, run in a worker thread"""
+        with self._mapper_lock:
             self.mapper.trigger_micro_expression(expression_type)
     
     async def get_performance_metrics(self) -> Dict:
@@ -169,6 +341,7 @@ class EnhancedFacialAnimationSystem:
         metrics['uptime_seconds'] = uptime
         metrics['total_frames'] = self.frame_count
         metrics['average_fps'] = self.frame_count / uptime if uptime > 0 else 0
+        metrics['dropped_frames'] = self.dropped_frames
         metrics['is_speaking'] = self.is_speaking
         metrics['current_emotion'] = self.current_emotion
         metrics['websocket_clients'] = len(self.websocket_clients)
@@ -180,71 +353,264 @@ class EnhancedFacialAnimationSystem:
         if not self.websocket_clients or not morphs:
             return
         
-        message = json.dumps({
-            'type': 'blendshape_update',
-            'data': morphs,
-            'timestamp': time.time(),
-            'frame': self.frame_count,
-            'emotion': self.current_emotion,
-            'is_speaking': self.is_speaking
-        })
+        # Only morphs that changed since they were last sent; clients keep the rest
+        vec = self._vec_buf = self._slots.to_vector(morphs, out=self._vec_buf)
+        self._grow_last_sent(vec.shape[0])
+        if self._diff_buf.shape != vec.shape:
+            self._diff_buf = np.empty_like(vec)
+        diff = np.subtract(vec, self._last_sent, out=self._diff_buf)
+        changed = np.flatnonzero(np.abs(diff, out=diff) > BROADCAST_EPSILON)
+        if not changed.size:
+            self.frame_count += 1
+            return
+        self._last_sent[changed] = vec[changed]
+        
+        # Quantized updates address morphs by index, so resend the table when it grows
+        if self.config.quantize_broadcasts and self._schema_size != len(self._slots):
+            await self._send_to_all(self.schema_message())
+        
+        await self._send_to_all(self._update_message(changed, vec[changed], delta=True))
         
-        # Send to all clients
+        self.frame_count += 1
+    
+    async def broadcast_frame_batch(self, frames: List[Dict[str, float]]):
+        """
+        Broadcast a frame sequence as one binary message.
+        
+        The payload is SPEECH_BATCH_HEADER followed by a little-endian float16
+        [frames, morphs] matrix whose columns follow the morph_schema names.
+        Clients play row i at start + i * interval.
+        """
+        if not self.websocket_clients or not frames:
+            return
+        
+        rows = [self._slots.to_vector(frame) for frame in frames]
+        n = len(self._slots)
+        matrix = np.zeros((len(rows), n), dtype='<f2')
+        for i, row in enumerate(rows):
+            matrix[i, :row.shape[0]] = row
+        
+        if self._schema_size != n:
+            await self._send_to_all(self.schema_message())
+        
+        header = SPEECH_BATCH_HEADER.pack(
+            SPEECH_BATCH_MAGIC, len(rows), n,
+            round(1e6 / self.config.target_fps), int(time.time() * 1000)
+        )
+        await self._send_to_all(header + matrix.tobytes())
+        
+        # Clients finish on the last row, so later deltas are taken against it
+        self._grow_last_sent(n)
+        self._last_sent[:] = matrix[-1]
+        self.frame_count += len(rows)
+    
+    def _grow_last_sent(self, size: int):
+        """Extend _last_sent with zeros to cover newly registered morphs"""
+        if size > self._last_sent.shape[0]:
+            self._last_sent = np.concatenate((
+                self._last_sent,
+                np.zeros(size - self._last_sent.shape[0], dtype=np.float32)
+            ))
+    
+    async def _send_to_all(self, message: Union[str, bytes]):
+        """Send a message to every client, dropping clients whose send fails"""
+        # Send concurrently, yielding between large batches so the
+        # animation loop keeps its frame deadlines
+        clients = list(self.websocket_clients)
         disconnected = set()
-        for client in self.websocket_clients:
-            try:
-                await client.send(message)
-            except Exception:
-                disconnected.add(client)
+        for start in range(0, len(clients), BROADCAST_BATCH_SIZE):
+            if start:
+                await asyncio.sleep(0)
+            batch = clients[start:start + BROADCAST_BATCH_SIZE]
+            results = await asyncio.gather(*(client.send(message) for client in batch),
+                                           return_exceptions=True)
+            disconnected.update(client for client, result in zip(batch, results)
+                                if isinstance(result, Exception))
         
         # Remove disconnected clients
         self.websocket_clients -= disconnected
+    
+    def _update_message(self, idxs: np.ndarray, values: np.ndarray, delta: bool) -> str:
+        """
+        Encode a blendshape update for the given morph slots.
         
-        self.frame_count += 1
+        With quantize_broadcasts, 'idx' holds little-endian uint16 slots into the
+        morph_schema names and 'q' one uint8 per slot; clients decode q / 255.
+        """
+        if self.config.quantize_broadcasts:
+            quantized = np.rint(np.clip(values, 0.0, 1.0) * 255.0).astype(np.uint8)
+            body = {
+                'type': 'blendshape_q8',
+                'idx': _b64(idxs.astype('<u2').tobytes()),
+                'q': _b64(quantized.tobytes())
+            }
+        else:
+            names = self._slots.names
+            # float32 state rounded back to short decimal representations
+            rounded = np.round(values.astype(np.float64), 6).tolist()
+            body = {
+                'type': 'blendshape_update',
+                'data': dict(zip([names[i] for i in idxs.tolist()], rounded))
+            }
+        
+        body.update({
+            'delta': delta,
+            'timestamp': time.time(),
+            'frame': self.frame_count,
+            'emotion': self.current_emotion,
+            'is_speaking': self.is_speaking
+        })
+        return dumps_message(body)
+    
+    def schema_message(self) -> str:
+        """Morph name table that quantized updates and speech batches index into"""
+        self._schema_size = len(self._slots)
+        return dumps_message({'type': 'morph_schema', 'names': self._slots.names})
+    
+    def publish_live_frame(self, morphs: Dict[str, float]):
+        """
+        Offer a real-time frame to the playback loop.
+        
+        Frames arriving faster than target_fps are coalesced: only the newest
+        frame pending at each tick is broadcast.
+        """
+        if morphs:
+            self._live_frame = morphs
+    
+    def keyframe_message(self) -> str:
+        """Full-state update for a newly connected client; later broadcasts are deltas against it"""
+        idxs = np.flatnonzero(self._last_sent)
+        return self._update_message(idxs, self._last_sent[idxs], delta=False)
     
     async def process_udp_stream(self, udp_data: bytes) -> Dict[str, float]:
-        """Process incoming UDP data (ARKit or viseme)"""
+        """Process incoming UDP data (ARKit or viseme), JSON or msgpack encoded"""
+        try:
+            data = decode_udp_packet(udp_data)
+        except Exception as e:
+            _log_error('udp', f"Error processing UDP data: {e}")
+            return {}
+        return await self.process_packet(data)
+    
+    async def process_packet(self, data: dict) -> Dict[str, float]:
+        """Process a decoded UDP packet"""
         try:
-            data = json.loads(udp_data.decode('utf-8'))
-            
             # Determine data type
-            if 'blendShapes' in data:
+            blendshapes = _arkit_input(data)
+            if blendshapes is not None:
                 # ARKit data
-                return await self.process_arkit_data(data['blendShapes'])
+                if self._mapping_active:
+                    # mapping_loop maps and publishes it; don't wait on the mapper here
+                    self.submit_arkit_frame(blendshapes)
+                    return {}
+                morphs = await self.process_arkit_data(blendshapes)
+                self.publish_live_frame(morphs)
+                return morphs
             elif 'viseme' in data or 'phoneme' in data:
                 # Single viseme/phoneme
-                viseme_morphs = self.mapper.map_viseme_stream(data)
-                
-                # Apply emotion and optimization
-                if self.config.enable_emotions:
-                    viseme_morphs = self.mapper.apply_emotion_layer(
-                        viseme_morphs,
-                        {self.current_emotion: self.emotion_intensity}
-                    )
-                
-                if self.config.enable_performance_optimization:
-                    viseme_morphs = self.optimizer.process_frame(viseme_morphs)
-                
+                viseme_morphs = await asyncio.to_thread(
+                    self._cpu_process_viseme, data, self.current_emotion, self.emotion_intensity
+                )
+                self.publish_live_frame(viseme_morphs)
                 return viseme_morphs or {}
             elif 'phoneme_sequence' in data:
                 # Full phoneme sequence
                 frames = await self.process_phoneme_sequence(data['phoneme_sequence'])
-                # Queue frames for playback
-                for frame in frames:
-                    await self.animation_queue.put(frame)
+                if self.config.batch_speech_frames:
+                    # Clients schedule the frames themselves
+                    await self.broadcast_frame_batch(frames)
+                else:
+                    # Queue frames for playback
+                    self.animation_queue.extend(frames)
                 return frames[0] if frames else {}
             
         except Exception as e:
-            print(f"Error processing UDP data: {e}")
+            _log_error('udp', f"Error processing UDP data: {e}")
             return {}
     
+    def _cpu_process_viseme(self, data: dict, emotion: str,
+                            emotion_intensity: float) -> Optional[Dict[str, float]]:
+        """Map a single viseme/phoneme packet with emotion and optimization, run in a worker thread"""
+        with self._mapper_lock:
+            viseme_morphs = self.mapper.map_viseme_stream(data)
+            
+            # Apply emotion and optimization
+            if self.config.enable_emotions:
+                viseme_morphs = self.mapper.apply_emotion_layer(viseme_morphs, {emotion: emotion_intensity})
+            
+            return self._frame_postproc(viseme_morphs)
+    
+    async def start_udp_ingest(self) -> asyncio.DatagramTransport:
+        """Listen for UDP packets on config.udp_host:udp_port"""
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: UDPIngest(self),
+            local_addr=(self.config.udp_host, self.config.udp_port)
+        )
+        return transport
+    
+    def submit_arkit_frame(self, blendshapes: Union[Dict[str, float], np.ndarray]):
+        """Queue a raw ARKit frame for mapping_loop, dropping the oldest if it is behind"""
+        self._raw_seq += 1
+        self._raw_queue.append(ArkitFrame(blendshapes, time.monotonic(), self._raw_seq))
+        self._raw_ready.set()
+    
+    def push_arkit_frame(self, values: np.ndarray):
+        """
+        Publish a packed ARKit frame from a producer thread, e.g. an audio thread
+        
+        Only one thread may push. The playback loop maps the newest pushed
+        frame once per tick; frames pushed in between are superseded.
+        
+        Args:
+            values: float32 weights ordered like ARKIT_ORDER
+        """
+        self._ingress.push(values)
+    
+    async def _map_ingress(self):
+        """Map and publish the newest frame from push_arkit_frame, if there is a new one"""
+        seq = self._ingress.read(self._ingress_frame)
+        if seq != self._ingress_seq:
+            self._ingress_seq = seq
+            self.publish_live_frame(await self.process_arkit_data(self._ingress_frame))
+    
+    async def mapping_loop(self):
+        """Mapping stage: map queued ARKit frames and publish them for playback"""
+        self._mapping_active = True
+        try:
+            while True:
+                await self._raw_ready.wait()
+                frame = self._raw_queue.popleft()
+                if not self._raw_queue:
+                    self._raw_ready.clear()
+                try:
+                    self.publish_live_frame(await self.process_arkit_data(frame.blendshapes, frame.t))
+                except Exception as e:
+                    _log_error('mapping', f"Error in mapping loop: {e}")
+        finally:
+            self._mapping_active = False
+    
     async def animation_playback_loop(self):
         """Main animation playback loop"""
+        # Frames are scheduled against fixed monotonic deadlines so processing
+        # time doesn't accumulate as drift
+        dt = 1.0 / self.config.target_fps
+        self._frame_start = time.monotonic()
+        frame_idx = 0
+        
         while True:
             try:
-                # Get next frame from queue or generate idle animation
-                if not self.animation_queue.empty():
-                    morphs = await self.animation_queue.get()
+                deadline = self._frame_start + frame_idx * dt
+                await self._map_ingress()
+                
+                # Get next frame from queue, the live stream, or generate idle animation
+                if self.animation_queue:
+                    morphs = self.animation_queue.popleft()
+                elif self._live_frame is not None:
+                    morphs, self._live_frame = self._live_frame, None
+                    self._last_live_time = time.monotonic()
+                elif time.monotonic() - self._last_live_time < LIVE_HOLD_SECONDS:
+                    # Live stream between packets; don't blend toward idle
+                    morphs = {}
                 else:
                     # Generate idle animation when not speaking
                     if not self.is_speaking:
@@ -253,16 +619,25 @@ class EnhancedFacialAnimationSystem:
                     else:
                         morphs = {}
                 
-                # Broadcast to clients
-                if morphs:
+                if time.monotonic() - deadline > dt:
+                    # More than a period behind: drop this frame and restart the
+                    # schedule rather than bursting to catch up
+                    self.dropped_frames += 1
+                    self._frame_start = time.monotonic()
+                    frame_idx = 0
+                elif morphs:
+                    # Broadcast to clients
                     await self.broadcast_morphs(morphs)
                 
-                # Control frame rate
-                await asyncio.sleep(1.0 / self.config.target_fps)
+                # Sleep until the next frame's deadline
+                frame_idx += 1
+                await asyncio.sleep(max(0.0, self._frame_start + frame_idx * dt - time.monotonic()))
                 
             except Exception as e:
-                print(f"Error in animation loop: {e}")
+                _log_error('playback', f"Error in animation loop: {e}")
                 await asyncio.sleep(0.1)
+                self._frame_start = time.monotonic()
+                frame_idx = 0
     
     def generate_test_animation(self) -> List[Dict[str, float]]:
         """Generate a test animation sequence"""
@@ -281,11 +656,42 @@ class EnhancedFacialAnimationSystem:
         return frames
 
 
+class UDPIngest(asyncio.DatagramProtocol):
+    """Datagram endpoint feeding packets into an EnhancedFacialAnimationSystem"""
+    
+    def __init__(self, animation_system: EnhancedFacialAnimationSystem):
+        self.animation_system = animation_system
+        self._tasks = set()  # Strong references to in-flight packet tasks
+    
+    def datagram_received(self, data: bytes, addr):
+        try:
+            packet = decode_udp_packet(data)
+        except Exception as e:
+            _log_error('udp', f"Error decoding UDP packet from {addr}: {e}")
+            return
+        
+        blendshapes = _arkit_input(packet)
+        if blendshapes is not None and self.animation_system._mapping_active:
+            # Straight onto the bounded raw queue; under overload the oldest frame is dropped
+            self.animation_system.submit_arkit_frame(blendshapes)
+            return
+        
+        task = asyncio.ensure_future(self.animation_system.process_packet(packet))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
 # WebSocket handler
 async def websocket_handler(websocket, path, animation_system):
     """Handle WebSocket connections"""
+    # Join and build the first messages with no await in between, so no delta is missed
     animation_system.websocket_clients.add(websocket)
     try:
+        config = animation_system.config
+        if config.quantize_broadcasts or config.batch_speech_frames:
+            await websocket.send(animation_system.schema_message())
+        await websocket.send(animation_system.keyframe_message())
+        
         async for message in websocket:
             # Handle incoming messages (commands, etc.)
             try:
@@ -302,7 +708,7 @@ async def websocket_handler(websocket, path, animation_system):
                     )
                 elif data['type'] == 'get_metrics':
                     metrics = await animation_system.get_performance_metrics()
-                    await websocket.send(json.dumps({
+                    await websocket.send(dumps_message({
                         'type': 'metrics',
                         'data': metrics
                     }))
@@ -310,7 +716,7 @@ async def websocket_handler(websocket, path, animation_system):
             except json.JSONDecodeError:
                 pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.warning(f"WebSocket error: {e}")
     finally:
         animation_system.websocket_clients.remove(websocket)
 
@@ -319,6 +725,9 @@ async def websocket_handler(websocket, path, animation_system):
 if __name__ == "__main__":
     import websockets
     
+    logging.basicConfig(level=logging.INFO)
+    start_background_logging()
+    
     # Create animation system
     config = AnimationConfig(
         enable_emotions=True,
@@ -366,14 +775,19 @@ if __name__ == "__main__":
     
     # Start WebSocket server
     async def main():
-        # Start animation playback loop
+        # Start the mapping stage, animation playback loop and UDP ingest
+        asyncio.create_task(animation_system.mapping_loop())
         asyncio.create_task(animation_system.animation_playback_loop())
+        await animation_system.start_udp_ingest()
         
-        # Start WebSocket server
+        # Start WebSocket server; name-keyed JSON deltas deflate well, while
+        # quantized payloads are already compact and not worth compressing
+        compress = config.websocket_compression and not config.quantize_broadcasts
         async with websockets.serve(
             lambda ws, path: websocket_handler(ws, path, animation_system),
             config.websocket_host,
-            config.websocket_port
+            config.websocket_port,
+            compression="deflate" if compress else None
         ):
             print(f"WebSocket server running on {config.websocket_host}:{config.websocket_port}")
             await asyncio.Future()  # Run forever
@@ -3,6 +3,9 @@ Facial Animation Mapper for ARKit to CC4 conversion
 Maps between different facial animation systems
 """
 
+import numpy as np
+
+
 class FacialAnimationMapper:
     def __init__(self):
         # ARKit to CC4 blendshape mapping
@@ -131,6 +134,31 @@ class FacialAnimationMapper:
             'H': 'V_L',
             'X': 'V_None'
         }
+        
+        # Dense layout: every CC4 morph gets a stable slot, ARKit targets first
+        self.arkit_names = list(self.arkit_to_cc4)
+        self.morph_names = list(dict.fromkeys([
+            *self.arkit_to_cc4.values(),
+            *self.phoneme_to_viseme.values(),
+            *self.simple_viseme_map.values()
+        ]))
+        self.morph_index = {name: i for i, name in enumerate(self.morph_names)}
+        self.arkit_perm = np.array([self.morph_index[self.arkit_to_cc4[name]] for name in self.arkit_names],
+                                   dtype=np.int32)
+    
+    def map_arkit_vector(self, arkit_values):
+        """
+        Convert a dense ARKit vector to a dense CC4 vector
+        
+        Args:
+            arkit_values: Array of ARKit values (0-1) ordered like arkit_names
+            
+        Returns:
+            float32 array of CC4 values indexed like morph_names
+        """
+        cc4_values = np.zeros(len(self.morph_names), dtype=np.float32)
+        cc4_values[self.arkit_perm] = arkit_values
+        return cc4_values
     
     def map_arkit_to_cc4(self, arkit_data):
         """
@@ -145,8 +173,8 @@ class FacialAnimationMapper:
         cc4_morphs = {}
         
         for arkit_name, value in arkit_data.items():
-            if arkit_name in self.arkit_to_cc4:
-                cc4_name = self.arkit_to_cc4[arkit_name]
+            cc4_name = self.arkit_to_cc4.get(arkit_name)
+            if cc4_name is not None:
                 cc4_morphs[cc4_name] = float(value)
             # else:
             #     print(f"Warning: Unknown ARKit blendshape: {arkit_name}")
@@ -220,6 +248,23 @@ class FacialAnimationMapper:
                     combined[morph_name] = value
         
         return combined
+    
+    def combine_morphs_vec(self, vecs, out=None):
+        """
+        Dense variant of combine_morphs
+        
+        Args:
+            vecs: Sequence of equal-length morph vectors indexed like morph_names
+            out: Optional preallocated array to write the result into
+        
+        Returns:
+            Elementwise maximum of the vectors
+        """
+        if out is None:
+            out = np.empty_like(vecs[0])
+        if len(vecs) == 2:
+            return np.maximum(vecs[0], vecs[1], out=out)
+        return np.maximum.reduce(vecs, axis=0, out=out)
 
 
 # Example usage
@@ -4,253 +4,292 @@ Includes expression blending, smoothing, micro-expressions, and emotion layers
 """
 
 import numpy as np
-from collections import deque
-from typing import Dict, List, Tuple, Optional
-import math
+from typing import Dict, List, Tuple, Optional, Union
 import time
+from types import MappingProxyType
 
+try:
+    from ._morph_kernels import (
+        smooth_window, blend, blend_clamp, add_saturate, add_saturate_rows, transition_speed, blend_sequence,
+        smoothing_weights
+    )
+except ImportError:
+    # Loaded as a top-level module with backend/core on sys.path
+    from _morph_kernels import (
+        smooth_window, blend, blend_clamp, add_saturate, add_saturate_rows, transition_speed, blend_sequence,
+        smoothing_weights
+    )
 
-class FacialAnimationMapperEnhanced:
-    def __init__(self, smoothing_window: int = 5, blend_speed: float = 0.15):
-        # Original ARKit to CC4 mapping
-        self.arkit_to_cc4 = {
-            # Mouth/Jaw movements
-            'jawForward': 'Jaw_Forward',
-            'jawLeft': 'Jaw_L',
-            'jawRight': 'Jaw_R',
-            'jawOpen': 'V_Open',
-            'mouthClose': 'V_None',
-            'mouthFunnel': 'V_OH',
-            'mouthPucker': 'V_U',
-            'mouthLeft': 'Mouth_L',
-            'mouthRight': 'Mouth_R',
-            'mouthSmileLeft': 'Mouth_Smile_L',
-            'mouthSmileRight': 'Mouth_Smile_R',
-            'mouthFrownLeft': 'Mouth_Frown_L',
-            'mouthFrownRight': 'Mouth_Frown_R',
-            'mouthDimpleLeft': 'Mouth_Dimple_L',
-            'mouthDimpleRight': 'Mouth_Dimple_R',
-            'mouthStretchLeft': 'Mouth_Stretch_L',
-            'mouthStretchRight': 'Mouth_Stretch_R',
-            'mouthRollLower': 'Mouth_Roll_Lower',
-            'mouthRollUpper': 'Mouth_Roll_Upper',
-            'mouthShrugLower': 'Mouth_Shrug_Lower',
-            'mouthShrugUpper': 'Mouth_Shrug_Upper',
-            'mouthPressLeft': 'Mouth_Press_L',
-            'mouthPressRight': 'Mouth_Press_R',
-            'mouthLowerDownLeft': 'Mouth_Lower_Down_L',
-            'mouthLowerDownRight': 'Mouth_Lower_Down_R',
-            'mouthUpperUpLeft': 'Mouth_Upper_Up_L',
-            'mouthUpperUpRight': 'Mouth_Upper_Up_R',
-            
-            # Eye movements
-            'eyeBlinkLeft': 'Eye_Blink_L',
-            'eyeBlinkRight': 'Eye_Blink_R',
-            'eyeLookUpLeft': 'Eye_Look_Up_L',
-            'eyeLookUpRight': 'Eye_Look_Up_R',
-            'eyeLookDownLeft': 'Eye_Look_Down_L',
-            'eyeLookDownRight': 'Eye_Look_Down_R',
-            'eyeLookInLeft': 'Eye_Look_In_L',
-            'eyeLookInRight': 'Eye_Look_In_R',
-            'eyeLookOutLeft': 'Eye_Look_Out_L',
-            'eyeLookOutRight': 'Eye_Look_Out_R',
-            'eyeWideLeft': 'Eye_Wide_L',
-            'eyeWideRight': 'Eye_Wide_R',
-            'eyeSquintLeft': 'Eye_Squint_L',
-            'eyeSquintRight': 'Eye_Squint_R',
-            
-            # Brow movements
-            'browDownLeft': 'Brow_Drop_L',
-            'browDownRight': 'Brow_Drop_R',
-            'browInnerUp': 'Brow_Raise_Inner',
-            'browOuterUpLeft': 'Brow_Raise_L',
-            'browOuterUpRight': 'Brow_Raise_R',
-            
-            # Nose movements
-            'noseSneerLeft': 'Nose_Sneer_L',
-            'noseSneerRight': 'Nose_Sneer_R',
-            
-            # Cheek movements
-            'cheekPuff': 'Cheek_Puff',
-            'cheekSquintLeft': 'Cheek_Squint_L',
-            'cheekSquintRight': 'Cheek_Squint_R',
-            
-            # Tongue (if available)
-            'tongueOut': 'Tongue_Out'
+VISEME_CACHE_SIZE = 4096  # Max (phoneme, intensity, context) entries kept
+PHONEME_ID_CACHE_SIZE = 256  # Max phoneme spellings remembered by _pid
+SPEECH_MICRO_EXPRESSIONS = ('subtle_smile', 'lip_tighten')  # Occasionally triggered while speaking
+WEIGHT_LEVELS = 255  # Quantized weights are uint8 steps over [0, 1]
+
+
+def _frozen(table: dict) -> MappingProxyType:
+    """Read-only view of a constant table, nested tables included"""
+    return MappingProxyType({key: _frozen(value) if isinstance(value, dict) else value
+                             for key, value in table.items()})
+
+
+# Original ARKit to CC4 mapping
+_ARKIT_TO_CC4 = _frozen({
+    # Mouth/Jaw movements
+    'jawForward': 'Jaw_Forward',
+    'jawLeft': 'Jaw_L',
+    'jawRight': 'Jaw_R',
+    'jawOpen': 'V_Open',
+    'mouthClose': 'V_None',
+    'mouthFunnel': 'V_OH',
+    'mouthPucker': 'V_U',
+    'mouthLeft': 'Mouth_L',
+    'mouthRight': 'Mouth_R',
+    'mouthSmileLeft': 'Mouth_Smile_L',
+    'mouthSmileRight': 'Mouth_Smile_R',
+    'mouthFrownLeft': 'Mouth_Frown_L',
+    'mouthFrownRight': 'Mouth_Frown_R',
+    'mouthDimpleLeft': 'Mouth_Dimple_L',
+    'mouthDimpleRight': 'Mouth_Dimple_R',
+    'mouthStretchLeft': 'Mouth_Stretch_L',
+    'mouthStretchRight': 'Mouth_Stretch_R',
+    'mouthRollLower': 'Mouth_Roll_Lower',
+    'mouthRollUpper': 'Mouth_Roll_Upper',
+    'mouthShrugLower': 'Mouth_Shrug_Lower',
+    'mouthShrugUpper': 'Mouth_Shrug_Upper',
+    'mouthPressLeft': 'Mouth_Press_L',
+    'mouthPressRight': 'Mouth_Press_R',
+    'mouthLowerDownLeft': 'Mouth_Lower_Down_L',
+    'mouthLowerDownRight': 'Mouth_Lower_Down_R',
+    'mouthUpperUpLeft': 'Mouth_Upper_Up_L',
+    'mouthUpperUpRight': 'Mouth_Upper_Up_R',
+
+    # Eye movements
+    'eyeBlinkLeft': 'Eye_Blink_L',
+    'eyeBlinkRight': 'Eye_Blink_R',
+    'eyeLookUpLeft': 'Eye_Look_Up_L',
+    'eyeLookUpRight': 'Eye_Look_Up_R',
+    'eyeLookDownLeft': 'Eye_Look_Down_L',
+    'eyeLookDownRight': 'Eye_Look_Down_R',
+    'eyeLookInLeft': 'Eye_Look_In_L',
+    'eyeLookInRight': 'Eye_Look_In_R',
+    'eyeLookOutLeft': 'Eye_Look_Out_L',
+    'eyeLookOutRight': 'Eye_Look_Out_R',
+    'eyeWideLeft': 'Eye_Wide_L',
+    'eyeWideRight': 'Eye_Wide_R',
+    'eyeSquintLeft': 'Eye_Squint_L',
+    'eyeSquintRight': 'Eye_Squint_R',
+
+    # Brow movements
+    'browDownLeft': 'Brow_Drop_L',
+    'browDownRight': 'Brow_Drop_R',
+    'browInnerUp': 'Brow_Raise_Inner',
+    'browOuterUpLeft': 'Brow_Raise_L',
+    'browOuterUpRight': 'Brow_Raise_R',
+
+    # Nose movements
+    'noseSneerLeft': 'Nose_Sneer_L',
+    'noseSneerRight': 'Nose_Sneer_R',
+
+    # Cheek movements
+    'cheekPuff': 'Cheek_Puff',
+    'cheekSquintLeft': 'Cheek_Squint_L',
+    'cheekSquintRight': 'Cheek_Squint_R',
+
+    # Tongue (if available)
+    'tongueOut': 'Tongue_Out'
+})
+
+# Order of ARKit values in dense input vectors (see arkit_vector)
+ARKIT_ORDER: Tuple[str, ...] = tuple(_ARKIT_TO_CC4)
+
+# Enhanced phoneme to CC4 viseme mapping with co-articulation
+_PHONEME_TO_VISEME = _frozen({
+    # Vowels
+    'AA': {'V_AA': 1.0, 'V_Open': 0.3},       # father
+    'AE': {'V_AA': 0.8, 'V_EH': 0.2},         # cat
+    'AH': {'V_AA': 0.7, 'V_Open': 0.2},       # cut
+    'AO': {'V_OH': 1.0, 'V_U': 0.1},          # thought
+    'AW': {'V_OH': 0.8, 'V_U': 0.3},          # house
+    'AY': {'V_AA': 0.6, 'V_EE': 0.4},         # bite
+    'EH': {'V_EH': 1.0},                      # bed
+    'ER': {'V_ER': 1.0, 'V_RR': 0.3},         # bird
+    'EY': {'V_EH': 0.7, 'V_EE': 0.3},         # bait
+    'IH': {'V_IH': 1.0, 'V_EE': 0.2},         # sit
+    'IY': {'V_EE': 1.0, 'V_Wide': 0.3},       # see
+    'OW': {'V_OH': 0.9, 'V_U': 0.3},          # go
+    'OY': {'V_OH': 0.7, 'V_EE': 0.3},         # boy
+    'UH': {'V_U': 0.8, 'V_OH': 0.2},          # book
+    'UW': {'V_U': 1.0, 'V_Narrow': 0.3},      # too
+
+    # Consonants with co-articulation
+    'B': {'V_Explosive': 1.0, 'V_Tight': 0.3},     # boy
+    'CH': {'V_CH': 1.0, 'V_Dental_Lip': 0.2},      # cheese
+    'D': {'V_DD': 1.0, 'V_Dental_Lip': 0.3},       # dog
+    'DH': {'V_TH': 1.0, 'V_Dental_Lip': 0.5},      # this
+    'F': {'V_FF': 1.0, 'V_Dental_Lip': 0.7},       # fox
+    'G': {'V_KK': 1.0, 'V_Open': 0.1},             # go
+    'HH': {'V_AA': 0.3, 'V_Open': 0.2},            # hat
+    'JH': {'V_CH': 0.9, 'V_DD': 0.2},              # jump
+    'K': {'V_KK': 1.0, 'V_Tight': 0.2},            # cat
+    'L': {'V_L': 1.0, 'V_DD': 0.2},                # let
+    'M': {'V_Explosive': 1.0, 'V_Tight': 0.5},     # mom
+    'N': {'V_NN': 1.0, 'V_DD': 0.2},               # net
+    'NG': {'V_NN': 0.8, 'V_KK': 0.3},              # sing
+    'P': {'V_Explosive': 1.0, 'V_Tight': 0.4},     # put
+    'R': {'V_RR': 1.0, 'V_ER': 0.2},               # red
+    'S': {'V_SS': 1.0, 'V_Dental_Lip': 0.2},       # see
+    'SH': {'V_CH': 0.8, 'V_SS': 0.3},              # she
+    'T': {'V_DD': 1.0, 'V_Dental_Lip': 0.4},       # top
+    'TH': {'V_TH': 1.0, 'V_Dental_Lip': 0.6},      # think
+    'V': {'V_FF': 0.9, 'V_Dental_Lip': 0.6},       # voice
+    'W': {'V_U': 0.8, 'V_OH': 0.3},                # we
+    'Y': {'V_EE': 0.8, 'V_IH': 0.2},               # yes
+    'Z': {'V_SS': 0.9, 'V_Dental_Lip': 0.2},       # zoo
+    'ZH': {'V_CH': 0.7, 'V_SS': 0.3},              # measure
+    'SIL': {'V_None': 0.0}                         # silence
+})
+
+# Emotion presets with blendshape combinations
+_EMOTION_PRESETS = _frozen({
+    'happy': {
+        'Mouth_Smile_L': 0.7,
+        'Mouth_Smile_R': 0.7,
+        'Mouth_Dimple_L': 0.3,
+        'Mouth_Dimple_R': 0.3,
+        'Eye_Squint_L': 0.2,
+        'Eye_Squint_R': 0.2,
+        'Cheek_Squint_L': 0.4,
+        'Cheek_Squint_R': 0.4,
+        'Brow_Raise_L': 0.1,
+        'Brow_Raise_R': 0.1
+    },
+    'sad': {
+        'Mouth_Frown_L': 0.6,
+        'Mouth_Frown_R': 0.6,
+        'Mouth_Press_L': 0.3,
+        'Mouth_Press_R': 0.3,
+        'Brow_Drop_L': 0.4,
+        'Brow_Drop_R': 0.4,
+        'Brow_Raise_Inner': 0.5,
+        'Eye_Look_Down_L': 0.2,
+        'Eye_Look_Down_R': 0.2
+    },
+    'angry': {
+        'Brow_Drop_L': 0.8,
+        'Brow_Drop_R': 0.8,
+        'Eye_Squint_L': 0.4,
+        'Eye_Squint_R': 0.4,
+        'Nose_Sneer_L': 0.3,
+        'Nose_Sneer_R': 0.3,
+        'Mouth_Press_L': 0.4,
+        'Mouth_Press_R': 0.4,
+        'Jaw_Forward': 0.2
+    },
+    'surprised': {
+        'Brow_Raise_L': 0.9,
+        'Brow_Raise_R': 0.9,
+        'Eye_Wide_L': 0.8,
+        'Eye_Wide_R': 0.8,
+        'V_Open': 0.4,
+        'V_OH': 0.3
+    },
+    'fear': {
+        'Brow_Raise_Inner': 0.7,
+        'Brow_Raise_L': 0.4,
+        'Brow_Raise_R': 0.4,
+        'Eye_Wide_L': 0.6,
+        'Eye_Wide_R': 0.6,
+        'Mouth_Stretch_L': 0.5,
+        'Mouth_Stretch_R': 0.5,
+        'V_Open': 0.2
+    },
+    'disgust': {
+        'Nose_Sneer_L': 0.7,
+        'Nose_Sneer_R': 0.7,
+        'Mouth_Upper_Up_L': 0.4,
+        'Mouth_Upper_Up_R': 0.4,
+        'Eye_Squint_L': 0.3,
+        'Eye_Squint_R': 0.3,
+        'Brow_Drop_L': 0.2,
+        'Brow_Drop_R': 0.2
+    },
+    'contempt': {
+        'Mouth_Smile_L': 0.0,
+        'Mouth_Smile_R': 0.5,
+        'Mouth_Press_L': 0.3,
+        'Mouth_Press_R': 0.1,
+        'Eye_Squint_L': 0.1,
+        'Eye_Squint_R': 0.2,
+        'Brow_Raise_L': 0.0,
+        'Brow_Raise_R': 0.2
+    },
+    'neutral': {}
+})
+
+# Micro-expression patterns
+_MICRO_EXPRESSIONS = _frozen({
+    'subtle_smile': {
+        'duration': 0.5,
+        'peak': 0.3,
+        'morphs': {
+            'Mouth_Smile_L': 0.2,
+            'Mouth_Smile_R': 0.2,
+            'Eye_Squint_L': 0.1,
+            'Eye_Squint_R': 0.1
         }
-        
-        # Enhanced phoneme to CC4 viseme mapping with co-articulation
-        self.phoneme_to_viseme = {
-            # Vowels
-            'AA': {'V_AA': 1.0, 'V_Open': 0.3},       # father
-            'AE': {'V_AA': 0.8, 'V_EH': 0.2},         # cat
-            'AH': {'V_AA': 0.7, 'V_Open': 0.2},       # cut
-            'AO': {'V_OH': 1.0, 'V_U': 0.1},          # thought
-            'AW': {'V_OH': 0.8, 'V_U': 0.3},          # house
-            'AY': {'V_AA': 0.6, 'V_EE': 0.4},         # bite
-            'EH': {'V_EH': 1.0},                      # bed
-            'ER': {'V_ER': 1.0, 'V_RR': 0.3},         # bird
-            'EY': {'V_EH': 0.7, 'V_EE': 0.3},         # bait
-            'IH': {'V_IH': 1.0, 'V_EE': 0.2},         # sit
-            'IY': {'V_EE': 1.0, 'V_Wide': 0.3},       # see
-            'OW': {'V_OH': 0.9, 'V_U': 0.3},          # go
-            'OY': {'V_OH': 0.7, 'V_EE': 0.3},         # boy
-            'UH': {'V_U': 0.8, 'V_OH': 0.2},          # book
-            'UW': {'V_U': 1.0, 'V_Narrow': 0.3},      # too
-            
-            # Consonants with co-articulation
-            'B': {'V_Explosive': 1.0, 'V_Tight': 0.3},     # boy
-            'CH': {'V_CH': 1.0, 'V_Dental_Lip': 0.2},      # cheese
-            'D': {'V_DD': 1.0, 'V_Dental_Lip': 0.3},       # dog
-            'DH': {'V_TH': 1.0, 'V_Dental_Lip': 0.5},      # this
-            'F': {'V_FF': 1.0, 'V_Dental_Lip': 0.7},       # fox
-            'G': {'V_KK': 1.0, 'V_Open': 0.1},             # go
-            'HH': {'V_AA': 0.3, 'V_Open': 0.2},            # hat
-            'JH': {'V_CH': 0.9, 'V_DD': 0.2},              # jump
-            'K': {'V_KK': 1.0, 'V_Tight': 0.2},            # cat
-            'L': {'V_L': 1.0, 'V_DD': 0.2},                # let
-            'M': {'V_Explosive': 1.0, 'V_Tight': 0.5},     # mom
-            'N': {'V_NN': 1.0, 'V_DD': 0.2},               # net
-            'NG': {'V_NN': 0.8, 'V_KK': 0.3},              # sing
-            'P': {'V_Explosive': 1.0, 'V_Tight': 0.4},     # put
-            'R': {'V_RR': 1.0, 'V_ER': 0.2},               # red
-            'S': {'V_SS': 1.0, 'V_Dental_Lip': 0.2},       # see
-            'SH': {'V_CH': 0.8, 'V_SS': 0.3},              # she
-            'T': {'V_DD': 1.0, 'V_Dental_Lip': 0.4},       # top
-            'TH': {'V_TH': 1.0, 'V_Dental_Lip': 0.6},      # think
-            'V': {'V_FF': 0.9, 'V_Dental_Lip': 0.6},       # voice
-            'W': {'V_U': 0.8, 'V_OH': 0.3},                # we
-            'Y': {'V_EE': 0.8, 'V_IH': 0.2},               # yes
-            'Z': {'V_SS': 0.9, 'V_Dental_Lip': 0.2},       # zoo
-            'ZH': {'V_CH': 0.7, 'V_SS': 0.3},              # measure
-            'SIL': {'V_None': 0.0}                         # silence
+    },
+    'eye_flash': {
+        'duration': 0.2,
+        'peak': 0.15,
+        'morphs': {
+            'Eye_Wide_L': 0.3,
+            'Eye_Wide_R': 0.3,
+            'Brow_Raise_L': 0.2,
+            'Brow_Raise_R': 0.2
         }
-        
-        # Emotion presets with blendshape combinations
-        self.emotion_presets = {
-            'happy': {
-                'Mouth_Smile_L': 0.7,
-                'Mouth_Smile_R': 0.7,
-                'Mouth_Dimple_L': 0.3,
-                'Mouth_Dimple_R': 0.3,
-                'Eye_Squint_L': 0.2,
-                'Eye_Squint_R': 0.2,
-                'Cheek_Squint_L': 0.4,
-                'Cheek_Squint_R': 0.4,
-                'Brow_Raise_L': 0.1,
-                'Brow_Raise_R': 0.1
-            },
-            'sad': {
-                'Mouth_Frown_L': 0.6,
-                'Mouth_Frown_R': 0.6,
-                'Mouth_Press_L': 0.3,
-                'Mouth_Press_R': 0.3,
-                'Brow_Drop_L': 0.4,
-                'Brow_Drop_R': 0.4,
-                'Brow_Raise_Inner': 0.5,
-                'Eye_Look_Down_L': 0.2,
-                'Eye_Look_Down_R': 0.2
-            },
-            'angry': {
-                'Brow_Drop_L': 0.8,
-                'Brow_Drop_R': 0.8,
-                'Eye_Squint_L': 0.4,
-                'Eye_Squint_R': 0.4,
-                'Nose_Sneer_L': 0.3,
-                'Nose_Sneer_R': 0.3,
-                'Mouth_Press_L': 0.4,
-                'Mouth_Press_R': 0.4,
-                'Jaw_Forward': 0.2
-            },
-            'surprised': {
-                'Brow_Raise_L': 0.9,
-                'Brow_Raise_R': 0.9,
-                'Eye_Wide_L': 0.8,
-                'Eye_Wide_R': 0.8,
-                'V_Open': 0.4,
-                'V_OH': 0.3
-            },
-            'fear': {
-                'Brow_Raise_Inner': 0.7,
-                'Brow_Raise_L': 0.4,
-                'Brow_Raise_R': 0.4,
-                'Eye_Wide_L': 0.6,
-                'Eye_Wide_R': 0.6,
-                'Mouth_Stretch_L': 0.5,
-                'Mouth_Stretch_R': 0.5,
-                'V_Open': 0.2
-            },
-            'disgust': {
-                'Nose_Sneer_L': 0.7,
-                'Nose_Sneer_R': 0.7,
-                'Mouth_Upper_Up_L': 0.4,
-                'Mouth_Upper_Up_R': 0.4,
-                'Eye_Squint_L': 0.3,
-                'Eye_Squint_R': 0.3,
-                'Brow_Drop_L': 0.2,
-                'Brow_Drop_R': 0.2
-            },
-            'contempt': {
-                'Mouth_Smile_L': 0.0,
-                'Mouth_Smile_R': 0.5,
-                'Mouth_Press_L': 0.3,
-                'Mouth_Press_R': 0.1,
-                'Eye_Squint_L': 0.1,
-                'Eye_Squint_R': 0.2,
-                'Brow_Raise_L': 0.0,
-                'Brow_Raise_R': 0.2
-            },
-            'neutral': {}
+    },
+    'lip_tighten': {
+        'duration': 0.3,
+        'peak': 0.2,
+        'morphs': {
+            'Mouth_Press_L': 0.4,
+            'Mouth_Press_R': 0.4
         }
-        
-        # Micro-expression patterns
-        self.micro_expressions = {
-            'subtle_smile': {
-                'duration': 0.5,
-                'peak': 0.3,
-                'morphs': {
-                    'Mouth_Smile_L': 0.2,
-                    'Mouth_Smile_R': 0.2,
-                    'Eye_Squint_L': 0.1,
-                    'Eye_Squint_R': 0.1
-                }
-            },
-            'eye_flash': {
-                'duration': 0.2,
-                'peak': 0.15,
-                'morphs': {
-                    'Eye_Wide_L': 0.3,
-                    'Eye_Wide_R': 0.3,
-                    'Brow_Raise_L': 0.2,
-                    'Brow_Raise_R': 0.2
-                }
-            },
-            'lip_tighten': {
-                'duration': 0.3,
-                'peak': 0.2,
-                'morphs': {
-                    'Mouth_Press_L': 0.4,
-                    'Mouth_Press_R': 0.4
-                }
-            },
-            'nose_wrinkle': {
-                'duration': 0.25,
-                'peak': 0.15,
-                'morphs': {
-                    'Nose_Sneer_L': 0.3,
-                    'Nose_Sneer_R': 0.3
-                }
-            }
+    },
+    'nose_wrinkle': {
+        'duration': 0.25,
+        'peak': 0.15,
+        'morphs': {
+            'Nose_Sneer_L': 0.3,
+            'Nose_Sneer_R': 0.3
         }
+    }
+})
+
+
+class FacialAnimationMapperEnhanced:
+    """
+    ARKit/phoneme to CC4 mapper with per-avatar blend state
+    
+    An instance is not thread-safe: its blend state, smoothing history and
+    scratch vectors belong to one avatar and must be driven by one thread
+    at a time. The mapping tables are shared read-only between instances,
+    and the Numba kernels release the GIL, so separate instances can be
+    ticked from separate threads in parallel.
+    """
+    
+    def __init__(self, smoothing_window: int = 5, blend_speed: float = 0.15):
+        # Mapping tables are shared, read-only module constants
+        self.arkit_to_cc4 = _ARKIT_TO_CC4
+        self.phoneme_to_viseme = _PHONEME_TO_VISEME
+        self.emotion_presets = _EMOTION_PRESETS
+        self.micro_expressions = _MICRO_EXPRESSIONS
         
         # Smoothing and blending parameters
         self.smoothing_window = smoothing_window
         self.blend_speed = blend_speed
-        self.morph_history = {}
-        self.current_values = {}
-        self.target_values = {}
+        self._viseme_cache: Dict[tuple, Tuple[Dict[str, float], str]] = {}
         self.emotion_weights = {'neutral': 1.0}
-        self.active_micro_expressions = []
         
         # Viseme transition rules for smoother speech
         self.viseme_transitions = {
@@ -277,227 +316,633 @@ class FacialAnimationMapperEnhanced:
             }
         }
         
-        self.last_blink_time = time.time()
+        self.last_blink_time = time.monotonic()
+        blink_data = self.eye_patterns['natural_blink']
+        self._blink_duration = blink_data['duration']
+        self._blink_times = np.array([t for t, _ in blink_data['pattern']], dtype=np.float64)
+        self._blink_values = np.array([v for _, v in blink_data['pattern']], dtype=np.float64)
         self.next_blink_interval = np.random.uniform(*self.eye_patterns['natural_blink']['interval'])
+        
+        # Dense per-frame state: every CC4 morph gets a stable slot
+        self._build_morph_table()
     
-    def smooth_values(self, morph_name: str, value: float) -> float:
-        """Apply exponential moving average smoothing"""
-        if morph_name not in self.morph_history:
-            self.morph_history[morph_name] = deque(maxlen=self.smoothing_window)
+    def _build_morph_table(self):
+        """Assign each CC4 morph a slot in the dense float32 frame vectors"""
+        names = list(self.arkit_to_cc4.values())
+        for visemes in self.phoneme_to_viseme.values():
+            names.extend(visemes)
+        for preset in self.emotion_presets.values():
+            names.extend(preset)
+        for micro_exp in self.micro_expressions.values():
+            names.extend(micro_exp['morphs'])
+        for step in self.eye_patterns['thinking']['pattern']:
+            names.extend(k for k in step if k != 'duration')
+        
+        self.morph_names: List[str] = list(dict.fromkeys(names))
+        self.morph_index: Dict[str, int] = {name: i for i, name in enumerate(self.morph_names)}
         
-        self.morph_history[morph_name].append(value)
+        # ARKit input position -> CC4 slot
+        self.arkit_names: List[str] = list(ARKIT_ORDER)
+        self.arkit_perm = np.array([self.morph_index[self.arkit_to_cc4[name]] for name in self.arkit_names],
+                                   dtype=np.int32)
+        self._arkit_slot = {name: int(slot) for name, slot in zip(self.arkit_names, self.arkit_perm)}
+        self._arkit_slots = self.arkit_perm.astype(np.intp)
+        self._arkit_pos = {name: i for i, name in enumerate(ARKIT_ORDER)}
+        self._blink_slots = np.array([self.morph_index['Eye_Blink_L'], self.morph_index['Eye_Blink_R']],
+                                     dtype=np.intp)
         
-        # Weighted average with more weight on recent values
-        if len(self.morph_history[morph_name]) > 0:
-            weights = np.exp(np.linspace(-1, 0, len(self.morph_history[morph_name])))
-            weights /= weights.sum()
-            smoothed = np.average(list(self.morph_history[morph_name]), weights=weights)
-            return float(smoothed)
+        self._build_transition_rules()
         
-        return value
+        n = len(self.morph_names)
+        self._current = np.zeros(n, dtype=np.float32)
+        self._seen = np.zeros(n, dtype=bool)  # Morphs the blend state has tracked so far
+        
+        # Per-morph smoothing history: ring buffer rows with write position and fill count
+        self._window = np.zeros((n, self.smoothing_window), dtype=np.float32)
+        self._window_pos = np.zeros(n, dtype=np.intp)
+        self._window_count = np.zeros(n, dtype=np.intp)
+        self._window_weights = smoothing_weights(self.smoothing_window)
+        self._one_value = np.zeros(1, dtype=np.float32)  # smooth_values arguments
+        self._one_slot = np.zeros(1, dtype=np.intp)
+        
+        # Per-frame scratch vectors, reused so mapping doesn't allocate at frame rate
+        self._frame_buf = np.zeros(n, dtype=np.float32)
+        self._touched_buf = np.zeros(n, dtype=bool)
+        self._speed_buf = np.zeros(n, dtype=np.float32)
+        self._out_buf = np.zeros(n, dtype=np.float32)
+        self._smooth_buf = np.zeros(n, dtype=np.float32)
+        
+        # Emotion presets and micro-expressions as sparse (slots, values) pairs
+        self.emotion_sparse: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            emotion: self._sparse(preset) for emotion, preset in self.emotion_presets.items()
+        }
+        
+        # Active micro-expressions as parallel arrays: start time, duration, peak and
+        # row of micro_matrix; the bell curves are evaluated in one pass per frame
+        self._micro_kinds: Dict[str, int] = {name: i for i, name in enumerate(self.micro_expressions)}
+        self._micro_matrix = np.zeros((len(self._micro_kinds), n), dtype=np.float32)
+        self._micro_present = np.zeros((len(self._micro_kinds), n), dtype=bool)
+        for i, micro_exp in enumerate(self.micro_expressions.values()):
+            slots, values = self._sparse(micro_exp['morphs'])
+            self._micro_matrix[i, slots] = values
+            self._micro_present[i, slots] = True
+        self._micro_start = np.zeros(0, dtype=np.float64)
+        self._micro_duration = np.zeros(0, dtype=np.float64)
+        self._micro_peak = np.zeros(0, dtype=np.float64)
+        self._micro_kind = np.zeros(0, dtype=np.intp)
+        
+        # Phoneme visemes as matrix rows, with masks of the visemes each phoneme sets
+        self.phoneme_idx: Dict[str, int] = {phoneme: i for i, phoneme in enumerate(self.phoneme_to_viseme)}
+        self.phoneme_matrix = np.zeros((len(self.phoneme_idx), n), dtype=np.float32)
+        self._phoneme_present = np.zeros((len(self.phoneme_idx), n), dtype=bool)
+        self._phoneme_slots: List[np.ndarray] = []
+        for i, visemes in enumerate(self.phoneme_to_viseme.values()):
+            slots, values = self._sparse(visemes)
+            self.phoneme_matrix[i, slots] = values
+            self._phoneme_present[i, slots] = True
+            self._phoneme_slots.append(slots)
+        # Phoneme spelling -> row, so lookups don't upper-case the same strings every frame
+        self._pid_cache: Dict[Optional[str], int] = dict(self.phoneme_idx)
+    
+    def _build_transition_rules(self):
+        """Pack viseme_transitions as target slot, speed, and (CSR) the slots whose names contain the source viseme"""
+        rules = [
+            (self.morph_index[to_viseme],
+             [i for i, name in enumerate(self.morph_names) if from_viseme in name],
+             speed)
+            for (from_viseme, to_viseme), speed in self.viseme_transitions.items()
+            if to_viseme in self.morph_index
+        ]
+        self._rule_to = np.array([to_slot for to_slot, _, _ in rules], dtype=np.intp)
+        self._rule_offsets = np.cumsum([0] + [len(from_slots) for _, from_slots, _ in rules]).astype(np.intp)
+        self._rule_from = np.array([i for _, from_slots, _ in rules for i in from_slots], dtype=np.intp)
+        self._rule_speed = np.array([speed for _, _, speed in rules], dtype=np.float32)
+    
+    def _register_morph(self, name: str) -> int:
+        """Give a morph outside the built-in table a slot, growing the state vectors"""
+        slot = self.morph_index.get(name)
+        if slot is None:
+            slot = len(self.morph_names)
+            self.morph_names.append(name)
+            self.morph_index[name] = slot
+            self._current = np.append(self._current, np.float32(0.0))
+            self._seen = np.append(self._seen, False)
+            self._window = np.vstack((self._window, np.zeros((1, self.smoothing_window), dtype=np.float32)))
+            self._window_pos = np.append(self._window_pos, 0)
+            self._window_count = np.append(self._window_count, 0)
+            self._frame_buf = np.append(self._frame_buf, np.float32(0.0))
+            self._touched_buf = np.append(self._touched_buf, False)
+            self._speed_buf = np.append(self._speed_buf, np.float32(0.0))
+            self._out_buf = np.append(self._out_buf, np.float32(0.0))
+            self._smooth_buf = np.append(self._smooth_buf, np.float32(0.0))
+            self._micro_matrix = np.hstack((self._micro_matrix, np.zeros((len(self._micro_kinds), 1), dtype=np.float32)))
+            self._micro_present = np.hstack((self._micro_present, np.zeros((len(self._micro_kinds), 1), dtype=bool)))
+            if any(from_viseme in name for from_viseme, _ in self.viseme_transitions):
+                self._build_transition_rules()
+            self.phoneme_matrix = np.hstack((self.phoneme_matrix, np.zeros((len(self.phoneme_idx), 1), dtype=np.float32)))
+            self._phoneme_present = np.hstack((self._phoneme_present, np.zeros((len(self.phoneme_idx), 1), dtype=bool)))
+        return slot
+    
+    def _pid(self, phoneme: Optional[str]) -> int:
+        """Row of phoneme_matrix for any spelling of phoneme, or -1 if unknown"""
+        pid = self._pid_cache.get(phoneme)
+        if pid is None:
+            pid = self.phoneme_idx.get(phoneme.upper(), -1) if phoneme else -1
+            if len(self._pid_cache) < PHONEME_ID_CACHE_SIZE:
+                self._pid_cache[phoneme] = pid
+        return pid
+    
+    def _sparse(self, morphs: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots and float32 values of a constant morph table"""
+        return (np.array([self.morph_index[morph] for morph in morphs], dtype=np.intp),
+                np.array(list(morphs.values()), dtype=np.float32))
+    
+    @property
+    def current_values(self) -> Dict[str, float]:
+        """Blended morph values of the last frame, by name"""
+        idxs = np.flatnonzero(self._seen)
+        names = self.morph_names
+        return dict(zip([names[i] for i in idxs.tolist()], self._current[idxs].tolist()))
+    
+    @current_values.setter
+    def current_values(self, values: Dict[str, float]):
+        slots = [self._register_morph(name) for name in values]
+        self._current.fill(0.0)
+        self._seen.fill(False)
+        self._current[slots] = list(values.values())
+        self._seen[slots] = True
+    
+    def to_vector(self, morphs: Dict[str, float], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Convert a morph dict to a dense float32 vector indexed like morph_names
+        
+        Args:
+            morphs: Dict of morph names to values
+            out: Buffer to reuse; ignored if it no longer matches the table size
+            
+        Returns:
+            The vector written, out itself when it was reused
+        """
+        slots = [self._register_morph(name) for name in morphs]
+        if out is None or out.shape[0] != len(self.morph_names):
+            out = np.zeros(len(self.morph_names), dtype=np.float32)
+        else:
+            out.fill(0.0)
+        out[slots] = list(morphs.values())
+        return out
+    
+    def to_dict(self, vec: np.ndarray) -> Dict[str, float]:
+        """Convert a dense morph vector to a dict of its non-zero morphs"""
+        idxs = np.flatnonzero(vec)
+        names = self.morph_names
+        return dict(zip([names[i] for i in idxs.tolist()], vec[idxs].tolist()))
+    
+    def smooth_values(self, morph_name: str, value: float) -> float:
+        """Apply exponential moving average smoothing"""
+        slot = self._register_morph(morph_name)
+        self._one_value[0] = value
+        self._one_slot[0] = slot
+        smooth_window(self._one_value, self._one_slot, self._window, self._window_pos,
+                      self._window_count, self._window_weights, self._smooth_buf)
+        return float(self._smooth_buf[slot])
     
     def blend_morphs(self, current: Dict[str, float], target: Dict[str, float], 
                      blend_factor: float = None) -> Dict[str, float]:
         """Smoothly blend between current and target morph values"""
-        if blend_factor is None:
-            blend_factor = self.blend_speed
+        current_slots = [self._register_morph(morph) for morph in current]
+        target_slots = [self._register_morph(morph) for morph in target]
+        current_vec = self.to_vector(current, out=self._frame_buf)
+        target_vec = self.to_vector(target, out=self._out_buf)
         
-        blended = {}
-        all_morphs = set(current.keys()) | set(target.keys())
+        # Transition rules apply to a target once any current morph contains its source viseme
+        seen = self._touched_buf
+        seen.fill(False)
+        seen[current_slots] = True
+        self.blend_morph_vectors(current_vec, target_vec, seen, blend_factor)
         
-        for morph in all_morphs:
-            current_val = current.get(morph, 0.0)
-            target_val = target.get(morph, 0.0)
-            
-            # Check for specific transition rules
-            transition_speed = blend_factor
-            for (from_viseme, to_viseme), speed in self.viseme_transitions.items():
-                if morph == to_viseme and any(from_viseme in m for m in current.keys()):
-                    transition_speed *= speed
-                    break
+        names = self.morph_names
+        slots = list(dict.fromkeys(current_slots + target_slots))
+        return dict(zip([names[i] for i in slots], current_vec[slots].tolist()))
+    
+    def blend_morph_vectors(self, current: np.ndarray, target: np.ndarray, seen: np.ndarray,
+                            blend_factor: float = None) -> np.ndarray:
+        """
+        Dense blend_morphs: move current toward target in place, one pass over every morph
+        
+        Args:
+            current: float32 vector indexed like morph_names; absent morphs are 0
+            target: float32 vector indexed like morph_names
+            seen: bool vector of the morphs current holds, for the transition rules
+            blend_factor: Base blend speed; defaults to blend_speed
             
-            # Exponential interpolation for smoother transitions
-            if abs(target_val - current_val) > 0.001:
-                blended[morph] = current_val + (target_val - current_val) * transition_speed
-            else:
-                blended[morph] = target_val
+        Returns:
+            current
+        """
+        if blend_factor is None:
+            blend_factor = self.blend_speed
+        transition_speed(seen, blend_factor, self._rule_to, self._rule_offsets,
+                         self._rule_from, self._rule_speed, self._speed_buf)
         
-        return blended
+        # Exponential interpolation for smoother transitions
+        blend(current, target, self._speed_buf)
+        return current
     
     def apply_emotion_layer(self, base_morphs: Dict[str, float], 
                           emotion_weights: Dict[str, float]) -> Dict[str, float]:
         """Apply emotion overlays to base morphs"""
         result = base_morphs.copy()
+        touched = np.zeros(len(self.morph_names), dtype=bool)
+        frame = self.apply_emotion_layer_vector(self.to_vector(base_morphs), emotion_weights, touched)
         
-        for emotion, weight in emotion_weights.items():
-            if weight > 0 and emotion in self.emotion_presets:
-                for morph, value in self.emotion_presets[emotion].items():
-                    # Additive blending with saturation
-                    current = result.get(morph, 0.0)
-                    result[morph] = min(1.0, current + value * weight * 0.5)
-        
+        slots = np.flatnonzero(touched)
+        names = self.morph_names
+        result.update(zip([names[i] for i in slots.tolist()], frame[slots].tolist()))
         return result
     
-    def process_micro_expression(self, expression_type: str, time_offset: float = 0):
-        """Add a micro-expression to the animation queue"""
-        if expression_type in self.micro_expressions:
-            micro_exp = self.micro_expressions[expression_type].copy()
-            micro_exp['start_time'] = time.time() + time_offset
-            micro_exp['type'] = expression_type
-            self.active_micro_expressions.append(micro_exp)
-    
-    def update_micro_expressions(self) -> Dict[str, float]:
-        """Process active micro-expressions and return their contribution"""
-        current_time = time.time()
-        micro_morphs = {}
-        
-        # Process each active micro-expression
-        self.active_micro_expressions = [
-            exp for exp in self.active_micro_expressions
-            if current_time - exp['start_time'] < exp['duration']
-        ]
+    def apply_emotion_layer_vector(self, frame: np.ndarray, emotion_weights: Dict[str, float],
+                                   touched: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dense apply_emotion_layer, overlaying emotions onto a caller-owned frame in place
         
-        for exp in self.active_micro_expressions:
-            elapsed = current_time - exp['start_time']
-            progress = elapsed / exp['duration']
+        Args:
+            frame: float32 morph vector indexed like morph_names
+            emotion_weights: Dict of emotion names to overlay strengths
+            touched: Optional bool vector; slots the overlays set are marked True
             
-            # Bell curve for micro-expression intensity
-            intensity = math.exp(-((progress - 0.5) ** 2) / 0.1) * exp['peak']
+        Returns:
+            frame
+        """
+        for emotion, weight in emotion_weights.items():
+            sparse = self.emotion_sparse.get(emotion)
+            if weight > 0 and sparse is not None:
+                idx, values = sparse
+                # Additive blending with saturation
+                add_saturate(frame, idx, values, weight * 0.5)
+                if touched is not None:
+                    touched[idx] = True
+        return frame
+    
+    def apply_emotion_to_frames(self, frames: List[Dict[str, float]], emotion: str,
+                                intensity: float) -> List[Dict[str, float]]:
+        """
+        Apply one emotion overlay to a sequence of frames in a single vectorized pass
+        
+        Args:
+            frames: Morph dictionaries, e.g. from the viseme transition engine
+            emotion: Emotion preset to apply
+            intensity: Strength of the emotion overlay
             
-            for morph, value in exp['morphs'].items():
-                micro_morphs[morph] = micro_morphs.get(morph, 0) + value * intensity
+        Returns:
+            Frames with the overlay applied, as from apply_emotion_layer
+        """
+        if intensity <= 0 or emotion not in self.emotion_sparse or not frames:
+            return frames
+        
+        for frame in frames:
+            for morph in frame:
+                self._register_morph(morph)
+        
+        n = len(self.morph_names)
+        stack = np.zeros((len(frames), n), dtype=np.float32)
+        present = np.zeros((len(frames), n), dtype=bool)
+        for row, frame in enumerate(frames):
+            slots = [self.morph_index[morph] for morph in frame]
+            stack[row, slots] = list(frame.values())
+            present[row, slots] = True
         
-        return micro_morphs
+        # Additive blending with saturation over the preset's columns only
+        idx, values = self.emotion_sparse[emotion]
+        add_saturate_rows(stack, idx, values, intensity * 0.5)
+        present[:, idx] = True
+        
+        return self.frames_to_dicts(stack, present)
     
-    def add_natural_blink(self) -> Dict[str, float]:
-        """Add natural eye blinks based on time"""
-        current_time = time.time()
-        blink_morphs = {}
+    def frames_to_dicts(self, frames: np.ndarray, present: np.ndarray) -> List[Dict[str, float]]:
+        """
+        Convert rows of dense frames to morph dicts, for callers of the dict API
         
-        if current_time - self.last_blink_time > self.next_blink_interval:
-            # Calculate blink progress
-            elapsed = current_time - self.last_blink_time - self.next_blink_interval
-            blink_data = self.eye_patterns['natural_blink']
+        Args:
+            frames: [frames, morphs] values indexed like morph_names
+            present: Matching bool matrix of the morphs each dict should hold
             
-            if elapsed < blink_data['duration']:
-                # Find current position in blink pattern
-                for i in range(len(blink_data['pattern']) - 1):
-                    t1, v1 = blink_data['pattern'][i]
-                    t2, v2 = blink_data['pattern'][i + 1]
-                    
-                    if t1 <= elapsed <= t2:
-                        # Linear interpolation
-                        progress = (elapsed - t1) / (t2 - t1)
-                        value = v1 + (v2 - v1) * progress
-                        blink_morphs['Eye_Blink_L'] = value
-                        blink_morphs['Eye_Blink_R'] = value
-                        break
-            else:
-                # Reset blink timer
-                self.last_blink_time = current_time
-                self.next_blink_interval = np.random.uniform(
-                    *self.eye_patterns['natural_blink']['interval']
-                )
+        Returns:
+            One dict per row
+        """
+        names = self.morph_names
+        result = []
+        for values, row in zip(frames, present):
+            idxs = np.flatnonzero(row)
+            result.append(dict(zip([names[i] for i in idxs.tolist()], values[idxs].tolist())))
+        return result
+    
+    def process_micro_expression(self, expression_type: str, time_offset: float = 0,
+                                 t: Optional[float] = None):
+        """
+        Add a micro-expression to the animation queue
         
-        return blink_morphs
+        Args:
+            expression_type: Name of a micro_expressions pattern
+            time_offset: Seconds from t until the expression starts
+            t: Current frame time from time.monotonic(); read from the clock if None
+        """
+        if expression_type in self.micro_expressions:
+            micro_exp = self.micro_expressions[expression_type]
+            if t is None:
+                t = time.monotonic()
+            self._micro_start = np.append(self._micro_start, t + time_offset)
+            self._micro_duration = np.append(self._micro_duration, micro_exp['duration'])
+            self._micro_peak = np.append(self._micro_peak, micro_exp['peak'])
+            self._micro_kind = np.append(self._micro_kind, self._micro_kinds[expression_type])
+    
+    @property
+    def active_micro_expressions(self) -> List[dict]:
+        """Queued micro-expressions, including finished ones not yet dropped by an update"""
+        kinds = list(self.micro_expressions)
+        active = []
+        for start, kind in zip(self._micro_start.tolist(), self._micro_kind.tolist()):
+            micro_exp = self.micro_expressions[kinds[kind]].copy()
+            micro_exp['start_time'] = start
+            micro_exp['type'] = kinds[kind]
+            active.append(micro_exp)
+        return active
+    
+    def _micro_expression_intensities(self, t: float) -> np.ndarray:
+        """Drop micro-expressions finished by time t and return the intensity of each remaining one"""
+        elapsed = t - self._micro_start
+        live = elapsed < self._micro_duration
+        if not live.all():
+            self._micro_start = self._micro_start[live]
+            self._micro_duration = self._micro_duration[live]
+            self._micro_peak = self._micro_peak[live]
+            self._micro_kind = self._micro_kind[live]
+            elapsed = elapsed[live]
+        
+        # Bell curve for micro-expression intensity
+        progress = elapsed / self._micro_duration
+        return np.exp(-((progress - 0.5) ** 2) / 0.1) * self._micro_peak
+    
+    def _micro_expression_vector(self, t: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Summed contribution of micro-expressions active at time t and the slots they set, or None"""
+        if not self._micro_start.size:
+            return None
+        intensities = self._micro_expression_intensities(t)
+        if not intensities.size:
+            return None
+        values = intensities.astype(np.float32) @ self._micro_matrix[self._micro_kind]
+        slots = np.flatnonzero(self._micro_present[self._micro_kind].any(axis=0))
+        return values, slots
+    
+    def update_micro_expressions(self, t: Optional[float] = None) -> Dict[str, float]:
+        """Process active micro-expressions at frame time t (default: now) and return their contribution"""
+        micro = self._micro_expression_vector(time.monotonic() if t is None else t)
+        if micro is None:
+            return {}
+        values, slots = micro
+        names = self.morph_names
+        return dict(zip([names[i] for i in slots.tolist()], values[slots].tolist()))
+    
+    def _add_micro_expressions(self, frame: np.ndarray, touched: np.ndarray, t: float):
+        """Dense update_micro_expressions: add active micro-expressions into frame, saturating at 1"""
+        micro = self._micro_expression_vector(t)
+        if micro is None:
+            return
+        values, slots = micro
+        add_saturate(frame, slots, values[slots], 1.0)
+        touched[slots] = True
+    
+    def _add_emotion(self, frame: np.ndarray, touched: np.ndarray, emotion: str, intensity: float):
+        """Dense apply_emotion_layer for a single emotion"""
+        sparse = self.emotion_sparse.get(emotion)
+        if sparse is None or intensity <= 0:
+            return
+        idx, values = sparse
+        add_saturate(frame, idx, values, intensity * 0.5)
+        touched[idx] = True
+    
+    def add_natural_blink(self, t: Optional[float] = None) -> Dict[str, float]:
+        """Add natural eye blinks based on frame time t (default: now)"""
+        value = self._blink_value(time.monotonic() if t is None else t)
+        if value is None:
+            return {}
+        return {'Eye_Blink_L': value, 'Eye_Blink_R': value}
+    
+    def _blink_value(self, t: float) -> Optional[float]:
+        """Eye_Blink value of the natural blink in progress at time t, or None between blinks"""
+        elapsed = t - self.last_blink_time - self.next_blink_interval
+        if elapsed <= 0:
+            return None
+        
+        if elapsed < self._blink_duration:
+            # Linear interpolation along the blink pattern
+            return float(np.interp(elapsed, self._blink_times, self._blink_values))
+        
+        # Reset blink timer
+        self.last_blink_time = t
+        self.next_blink_interval = np.random.uniform(
+            *self.eye_patterns['natural_blink']['interval']
+        )
+        return None
     
     def map_phoneme_to_viseme_enhanced(self, phoneme: str, 
                                       intensity: float = 1.0,
                                       context: Optional[Tuple[str, str]] = None) -> Dict[str, float]:
         """Enhanced phoneme to viseme mapping with co-articulation"""
-        phoneme_upper = phoneme.upper()
+        return self.map_phoneme_with_primary(phoneme, intensity, context)[0]
+    
+    def map_phoneme_with_primary(self, phoneme: str,
+                                 intensity: float = 1.0,
+                                 context: Optional[Tuple[str, str]] = None) -> Tuple[Dict[str, float], str]:
+        """
+        map_phoneme_to_viseme_enhanced plus the strongest viseme in the result
         
-        if phoneme_upper in self.phoneme_to_viseme:
-            viseme_data = self.phoneme_to_viseme[phoneme_upper]
-            
-            # Apply intensity scaling
-            result = {k: v * intensity for k, v in viseme_data.items()}
-            
-            # Co-articulation adjustments based on context
-            if context:
-                prev_phoneme, next_phoneme = context
-                
-                # Adjust based on surrounding phonemes
-                if prev_phoneme and prev_phoneme.upper() in self.phoneme_to_viseme:
-                    prev_visemes = self.phoneme_to_viseme[prev_phoneme.upper()]
-                    for viseme, value in prev_visemes.items():
-                        if viseme in result:
-                            # Blend with previous phoneme (25% influence)
-                            result[viseme] = result[viseme] * 0.75 + value * 0.25
-                
-                if next_phoneme and next_phoneme.upper() in self.phoneme_to_viseme:
-                    next_visemes = self.phoneme_to_viseme[next_phoneme.upper()]
-                    for viseme, value in next_visemes.items():
-                        if viseme in result:
-                            # Pre-shape for next phoneme (15% influence)
-                            result[viseme] = result[viseme] * 0.85 + value * 0.15
-            
-            return result
+        Returns:
+            Tuple of (viseme morphs, primary viseme name)
+        """
+        # Natural speech repeats the same phoneme trigrams, so results are cached
+        key = (phoneme, intensity, context)
+        cached = self._viseme_cache.get(key)
+        if cached is None:
+            morphs = self._map_phoneme_in_context(phoneme, intensity, context)
+            names = list(morphs)
+            primary = names[int(np.argmax(list(morphs.values())))] if names else 'V_None'
+            cached = (morphs, primary)
+            if len(self._viseme_cache) >= VISEME_CACHE_SIZE:
+                del self._viseme_cache[next(iter(self._viseme_cache))]
+            self._viseme_cache[key] = cached
+        return cached[0].copy(), cached[1]
+    
+    def _map_phoneme_in_context(self, phoneme: str, intensity: float,
+                                context: Optional[Tuple[str, str]]) -> Dict[str, float]:
+        """Uncached body of map_phoneme_to_viseme_enhanced"""
+        pid = self._pid(phoneme)
+        if pid < 0:
+            return {'V_None': 0.0}
+        
+        row = self._coarticulated_row(pid, intensity, context)
+        slots = self._phoneme_slots[pid]
+        return dict(zip([self.morph_names[i] for i in slots], row[slots].tolist()))
+    
+    def map_phoneme_to_viseme_vector(self, phoneme: str,
+                                     intensity: float = 1.0,
+                                     context: Optional[Tuple[str, str]] = None) -> np.ndarray:
+        """
+        Dense variant of map_phoneme_to_viseme_enhanced
+        
+        Returns:
+            float32 vector indexed like morph_names; all zero for unknown phonemes
+        """
+        pid = self._pid(phoneme)
+        if pid < 0:
+            return np.zeros(len(self.morph_names), dtype=np.float32)
+        return self._coarticulated_row(pid, intensity, context)
+    
+    def _coarticulated_row(self, pid: int, intensity: float,
+                           context: Optional[Tuple[str, str]]) -> np.ndarray:
+        """Phoneme row scaled by intensity and blended toward its neighbours' shared visemes"""
+        row = self.phoneme_matrix[pid] * np.float32(intensity)
+        
+        # Co-articulation adjustments based on context: blend with the previous
+        # phoneme (25% influence), then pre-shape for the next one (15%)
+        if context:
+            present = self._phoneme_present[pid]
+            for neighbour, keep, influence in zip(context, (0.75, 0.85), (0.25, 0.15)):
+                nid = self._pid(neighbour)
+                if nid >= 0:
+                    shared = present & self._phoneme_present[nid]
+                    row[shared] = row[shared] * keep + self.phoneme_matrix[nid, shared] * influence
         
-        return {'V_None': 0.0}
+        return row
+    
+    def arkit_vector(self, arkit_data: Dict[str, float], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pack ARKit values into the ARKIT_ORDER vector map_arkit_to_cc4_vector accepts
+        
+        Names missing from arkit_data read as 0, so the packed frame updates
+        every morph; keep passing the dict to touch only the names it holds.
+        
+        Args:
+            arkit_data: Dict of ARKit blendshape names to values (0-1)
+            out: Optional preallocated float32 vector of len(ARKIT_ORDER)
+            
+        Returns:
+            float32 vector ordered like ARKIT_ORDER
+        """
+        if out is None:
+            out = np.zeros(len(ARKIT_ORDER), dtype=np.float32)
+        else:
+            out.fill(0.0)
+        slots = self._arkit_pos
+        for name, value in arkit_data.items():
+            pos = slots.get(name)
+            if pos is not None:
+                out[pos] = value
+        return out
     
-    def map_arkit_to_cc4_enhanced(self, arkit_data: Dict[str, float],
+    def map_arkit_to_cc4_enhanced(self, arkit_data: Union[Dict[str, float], np.ndarray],
                                  emotion: Optional[str] = None,
                                  emotion_intensity: float = 0.5,
                                  add_micro_expressions: bool = True,
-                                 add_natural_movements: bool = True) -> Dict[str, float]:
+                                 add_natural_movements: bool = True,
+                                 t: Optional[float] = None) -> Dict[str, float]:
         """
         Enhanced ARKit to CC4 mapping with all features
         
         Args:
-            arkit_data: Dict of ARKit blendshape names to values (0-1)
+            arkit_data: Dict of ARKit blendshape names to values (0-1), or an
+                array of values ordered like arkit_names
             emotion: Optional emotion preset to apply
             emotion_intensity: Strength of emotion overlay (0-1)
             add_micro_expressions: Whether to add micro-expressions
             add_natural_movements: Whether to add natural movements like blinking
+            t: Frame time from time.monotonic(), e.g. the capture time; read from the clock if None
             
         Returns:
             Dict of CC4 morph names to smoothed and blended values (0-1)
         """
-        # Step 1: Basic ARKit to CC4 mapping
-        cc4_morphs = {}
-        for arkit_name, value in arkit_data.items():
-            if arkit_name in self.arkit_to_cc4:
-                cc4_name = self.arkit_to_cc4[arkit_name]
-                # Apply smoothing to individual values
-                smoothed_value = self.smooth_values(cc4_name, float(value))
-                cc4_morphs[cc4_name] = smoothed_value
+        return self.to_dict(self.map_arkit_to_cc4_vector(
+            arkit_data, emotion, emotion_intensity, add_micro_expressions, add_natural_movements,
+            out=self._out_buf, t=t
+        ))
+    
+    def map_arkit_to_cc4_vector(self, arkit_data: Union[Dict[str, float], np.ndarray],
+                                emotion: Optional[str] = None,
+                                emotion_intensity: float = 0.5,
+                                add_micro_expressions: bool = True,
+                                add_natural_movements: bool = True,
+                                out: Optional[np.ndarray] = None,
+                                t: Optional[float] = None) -> np.ndarray:
+        """
+        Dense variant of map_arkit_to_cc4_enhanced
+        
+        arkit_data may also be an array of every ARKit value ordered like
+        arkit_names, which skips the per-name lookups. Pass out to write the
+        result into a preallocated vector of the table's length.
+        
+        Returns:
+            float32 vector indexed like morph_names; morphs at or below 0.01 are zero
+        """
+        if t is None:
+            t = time.monotonic()
+        frame = self._frame_buf
+        touched = self._touched_buf
+        frame.fill(0.0)
+        touched.fill(False)
+        
+        # Step 1: Basic ARKit to CC4 mapping, smoothing individual values
+        if isinstance(arkit_data, np.ndarray):
+            if arkit_data.shape != (len(self.arkit_names),):
+                raise ValueError(f"Expected {len(self.arkit_names)} ARKit values, got shape {arkit_data.shape}")
+            values = arkit_data.astype(np.float32)
+            slots = self._arkit_slots
+        else:
+            slots = [self._arkit_slot.get(name) for name in arkit_data]
+            known = [i for i, slot in enumerate(slots) if slot is not None]
+            values = np.fromiter(arkit_data.values(), dtype=np.float32, count=len(slots))[known]
+            slots = np.array([slots[i] for i in known], dtype=np.intp)
+        if slots.size:
+            smooth_window(values, slots, self._window, self._window_pos, self._window_count,
+                          self._window_weights, frame)
+            touched[slots] = True
         
         # Step 2: Apply emotion layer if specified
         if emotion and emotion != 'neutral':
-            emotion_weights = {emotion: emotion_intensity}
-            cc4_morphs = self.apply_emotion_layer(cc4_morphs, emotion_weights)
+            self._add_emotion(frame, touched, emotion, emotion_intensity)
         
         # Step 3: Add natural movements
         if add_natural_movements:
-            blink_morphs = self.add_natural_blink()
-            for morph, value in blink_morphs.items():
-                cc4_morphs[morph] = max(cc4_morphs.get(morph, 0), value)
+            value = self._blink_value(t)
+            if value is not None:
+                slots = self._blink_slots
+                frame[slots] = np.maximum(frame[slots], value)
+                touched[slots] = True
         
         # Step 4: Add micro-expressions
         if add_micro_expressions:
-            micro_morphs = self.update_micro_expressions()
-            for morph, value in micro_morphs.items():
-                cc4_morphs[morph] = min(1.0, cc4_morphs.get(morph, 0) + value)
-        
-        # Step 5: Blend with previous frame for temporal smoothness
-        self.target_values = cc4_morphs
-        self.current_values = self.blend_morphs(self.current_values, self.target_values)
-        
-        # Step 6: Apply final constraints and cleanup
-        final_morphs = {}
-        for morph, value in self.current_values.items():
-            # Clamp values
-            clamped = max(0.0, min(1.0, value))
-            # Remove very small values to reduce noise
-            if clamped > 0.01:
-                final_morphs[morph] = clamped
+            self._add_micro_expressions(frame, touched, t)
         
-        return final_morphs
+        # Step 5: Blend with previous frame for temporal smoothness, and
+        # Step 6: Clamp and remove very small values to reduce noise, in one pass
+        if out is None:
+            out = np.empty_like(self._current)
+        blend_clamp(self._current, frame, self._transition_speed(), out)
+        self._seen |= touched
+        return out
+    
+    def _transition_speed(self) -> np.ndarray:
+        """Per-morph blend speed, slowed by viseme transition rules that apply"""
+        transition_speed(self._seen, self.blend_speed, self._rule_to, self._rule_offsets,
+                         self._rule_from, self._rule_speed, self._speed_buf)
+        return self._speed_buf
+    
+    def _blend_into_current(self, target: np.ndarray, touched: np.ndarray):
+        """Vectorized blend_morphs of the dense blend state toward target"""
+        blend(self._current, target, self._transition_speed())
+        self._seen |= touched
     
     def process_speech_with_emotion(self, phoneme_sequence: List[Dict],
                                   base_emotion: str = 'neutral',
-                                  emotion_intensity: float = 0.3) -> List[Dict[str, float]]:
+                                  emotion_intensity: float = 0.3,
+                                  t: Optional[float] = None) -> List[Dict[str, float]]:
         """
         Process a sequence of phonemes with emotion overlay
         
@@ -505,57 +950,158 @@ class FacialAnimationMapperEnhanced:
             phoneme_sequence: List of dicts with 'phoneme', 'duration', and optional 'intensity'
             base_emotion: Base emotion to apply
             emotion_intensity: Strength of emotion
+            t: Time from time.monotonic() the sequence is generated at; read from the clock if None
             
         Returns:
             List of morph dictionaries for each frame
         """
-        frames = []
+        frames, seen = self.process_speech_vectors(phoneme_sequence, base_emotion, emotion_intensity, t)
+        return self.frames_to_dicts(frames, seen)
+    
+    def process_speech_quantized(self, phoneme_sequence: List[Dict],
+                                 base_emotion: str = 'neutral',
+                                 emotion_intensity: float = 0.3,
+                                 t: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compact variant of process_speech_with_emotion for streaming or storing frames
         
-        for i, phoneme_data in enumerate(phoneme_sequence):
-            phoneme = phoneme_data['phoneme']
-            intensity = phoneme_data.get('intensity', 1.0)
-            
-            # Get context for co-articulation
-            prev_phoneme = phoneme_sequence[i-1]['phoneme'] if i > 0 else None
-            next_phoneme = phoneme_sequence[i+1]['phoneme'] if i < len(phoneme_sequence)-1 else None
-            
-            # Get viseme morphs
-            viseme_morphs = self.map_phoneme_to_viseme_enhanced(
-                phoneme, intensity, (prev_phoneme, next_phoneme)
-            )
-            
-            # Apply emotion
-            if base_emotion != 'neutral':
-                viseme_morphs = self.apply_emotion_layer(
-                    viseme_morphs, {base_emotion: emotion_intensity}
-                )
-            
-            # Add occasional micro-expressions during speech
-            if np.random.random() < 0.05:  # 5% chance per phoneme
-                self.process_micro_expression(
-                    np.random.choice(['subtle_smile', 'lip_tighten'])
-                )
-            
-            # Update micro-expressions
-            micro_morphs = self.update_micro_expressions()
-            for morph, value in micro_morphs.items():
-                viseme_morphs[morph] = min(1.0, viseme_morphs.get(morph, 0) + value)
-            
-            # Smooth and blend
-            self.target_values = viseme_morphs
-            self.current_values = self.blend_morphs(self.current_values, self.target_values)
-            
-            frames.append(self.current_values.copy())
+        Returns:
+            int32 slots (indexed like morph_names) of the morphs tracked in any
+            frame, and a uint8 [frames, slots] matrix of their quantized values
+        """
+        frames, seen = self.process_speech_vectors(phoneme_sequence, base_emotion, emotion_intensity, t)
+        slots = np.flatnonzero(seen.any(axis=0)).astype(np.int32)
+        return slots, self.quantize_weights(frames[:, slots])
+    
+    @staticmethod
+    def quantize_weights(values: np.ndarray) -> np.ndarray:
+        """Round weights in [0, 1] to uint8 steps of 1/WEIGHT_LEVELS"""
+        return np.clip(values * WEIGHT_LEVELS + 0.5, 0, WEIGHT_LEVELS).astype(np.uint8)
+    
+    @staticmethod
+    def dequantize_weights(quantized: np.ndarray) -> np.ndarray:
+        """Inverse of quantize_weights, as float32"""
+        return quantized * np.float32(1.0 / WEIGHT_LEVELS)
+    
+    def process_speech_vectors(self, phoneme_sequence: List[Dict],
+                               base_emotion: str = 'neutral',
+                               emotion_intensity: float = 0.3,
+                               t: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dense variant of process_speech_with_emotion
+        
+        Returns:
+            float32 [frames, morphs] blended values and a bool matrix of the
+            morphs each frame has tracked so far, both indexed like morph_names
+        """
+        count = len(phoneme_sequence)
+        if not count:
+            return (np.zeros((0, len(self.morph_names)), dtype=np.float32),
+                    np.zeros((0, len(self.morph_names)), dtype=bool))
+        
+        ids = np.array([self._pid(p['phoneme']) for p in phoneme_sequence], dtype=np.intp)
+        intensities = np.array([p.get('intensity', 1.0) for p in phoneme_sequence], dtype=np.float32)
+        known = ids >= 0
+        rows = np.where(known, ids, 0)
+        
+        # Viseme rows for the whole sequence; unknown phonemes are silent V_None frames
+        targets = self.phoneme_matrix[rows] * intensities[:, None]
+        targets[~known] = 0.0
+        touched = self._phoneme_present[rows] & known[:, None]
+        touched[~known, self.morph_index['V_None']] = True
+        
+        # Co-articulation: blend with the previous phoneme (25% influence), then
+        # pre-shape for the next one (15%), on visemes both phonemes set
+        for shift, keep, influence in ((1, 0.75, 0.25), (-1, 0.85, 0.15)):
+            neighbours = np.full(count, -1, dtype=np.intp)
+            if shift > 0:
+                neighbours[1:] = ids[:-1]
+            else:
+                neighbours[:-1] = ids[1:]
+            has_neighbour = (neighbours >= 0) & known
+            neighbour_rows = np.where(has_neighbour, neighbours, 0)
+            shared = touched & self._phoneme_present[neighbour_rows] & has_neighbour[:, None]
+            targets = np.where(shared, targets * keep + self.phoneme_matrix[neighbour_rows] * influence, targets)
         
-        return frames
+        # Apply emotion to every frame at once
+        sparse = self.emotion_sparse.get(base_emotion)
+        if base_emotion != 'neutral' and sparse is not None and emotion_intensity > 0:
+            idx, values = sparse
+            add_saturate_rows(targets, idx, values, emotion_intensity * 0.5)
+            touched[:, idx] = True
+        
+        # Add occasional micro-expressions during speech (5% chance per phoneme),
+        # drawn for the whole sequence up front. The whole sequence shares one
+        # timestamp, so the overlay only changes where a new one fires
+        if t is None:
+            t = time.monotonic()
+        fire = np.random.random(count) < 0.05
+        kinds = np.random.randint(0, 2, count)
+        bounds = [0, *np.flatnonzero(fire[1:]) + 1, count]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if fire[start]:
+                self.process_micro_expression(SPEECH_MICRO_EXPRESSIONS[kinds[start]], t=t)
+            micro = self._micro_expression_vector(t)
+            if micro is not None:
+                values, slots = micro
+                add_saturate_rows(targets[start:end], slots, values[slots], 1.0)
+                touched[start:end, slots] = True
+        
+        # Blend frame by frame; each step depends on the last
+        frames = np.empty_like(targets)
+        seen = np.empty_like(touched)
+        blend_sequence(self._current, self._seen, targets, touched, self.blend_speed,
+                       self._rule_to, self._rule_offsets, self._rule_from, self._rule_speed,
+                       self._speed_buf, frames, seen)
+        return frames, seen
     
     def set_emotion(self, emotion: str, intensity: float = 1.0, transition_time: float = 1.0):
         """Set the current emotion state with transition"""
         self.emotion_weights = {emotion: intensity}
     
-    def trigger_micro_expression(self, expression_type: str):
-        """Manually trigger a micro-expression"""
-        self.process_micro_expression(expression_type)
+    def trigger_micro_expression(self, expression_type: str, t: Optional[float] = None):
+        """Manually trigger a micro-expression, starting at frame time t (default: now)"""
+        self.process_micro_expression(expression_type, t=t)
+
+
+class ArkitIngressBuffer:
+    """
+    Lock-free handoff of packed ARKit frames from one producer thread to one consumer
+    
+    The producer writes alternate rows of a ping-pong buffer and then
+    publishes the frame's sequence number; the consumer copies the last
+    published row and retries if the producer may have reused it while it
+    was copying. Only the newest frame is kept, like a latest-value mailbox.
+    """
+    
+    def __init__(self, size: int = len(ARKIT_ORDER)):
+        self.size = size
+        self._rows = np.zeros((2, size), dtype=np.float32)
+        self._seq = 0  # Frames published so far; single writer
+    
+    def push(self, values: np.ndarray):
+        """Publish a frame ordered like ARKIT_ORDER (producer thread only)"""
+        seq = self._seq
+        self._rows[seq & 1] = values
+        self._seq = seq + 1
+    
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copy the newest frame into out (consumer thread only)
+        
+        Returns:
+            Sequence number of the frame copied, 0 if nothing was pushed yet
+        """
+        while True:
+            seq = self._seq
+            if seq == 0:
+                return 0
+            np.copyto(out, self._rows[(seq - 1) & 1])
+            # The row read is only rewritten by the push after next, which can
+            # only start once the next push has bumped _seq; if _seq is
+            # unchanged, the copy is a whole frame
+            if self._seq == seq:
+                return seq
 
 
 # Example usage and testing
@@ -4,29 +4,129 @@ Ensures real-time performance with LOD system, frame skipping, and optimized cal
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Set
-from collections import deque
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures import Executor
 import time
+import logging
 import threading
 from dataclasses import dataclass, field
 
+try:
+    from ._morph_kernels import delta_update, select_morphs
+except ImportError:
+    # Loaded as a top-level module with backend/core on sys.path
+    from _morph_kernels import delta_update, select_morphs
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """
+    Fixed-size window of the most recent samples, backed by a preallocated NumPy array
+    
+    Keeps a running total so sum() and mean() are O(1); use an integer dtype
+    for samples that are summed forever, as float totals accumulate rounding drift.
+    """
+    
+    def __init__(self, size: int, dtype=np.int64):
+        self.data = np.zeros(size, dtype=dtype)
+        self.pos = 0
+        self.count = 0
+        self.total = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, value):
+        # Unwritten slots are zero, so subtracting the evicted slot is safe before the window fills
+        self.total += value - self.data[self.pos].item()
+        self.data[self.pos] = value
+        self.pos += 1
+        if self.pos == self.data.shape[0]:
+            self.pos = 0
+        if self.count < self.data.shape[0]:
+            self.count += 1
+    
+    def sum(self):
+        return self.total
+    
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
 
 @dataclass
 class PerformanceMetrics:
-    """Track performance metrics for optimization decisions"""
-    frame_times: deque = field(default_factory=lambda: deque(maxlen=60))
-    morph_update_times: deque = field(default_factory=lambda: deque(maxlen=60))
-    active_morph_count: deque = field(default_factory=lambda: deque(maxlen=30))
+    """Track performance metrics for optimization decisions; times are recorded in integer ns"""
+    frame_times: RingBuffer = field(default_factory=lambda: RingBuffer(60, np.int64))
+    morph_update_times: RingBuffer = field(default_factory=lambda: RingBuffer(60, np.int64))
+    active_morph_count: RingBuffer = field(default_factory=lambda: RingBuffer(30, np.int32))
     fps: float = 60.0
     avg_frame_time: float = 0.0
     avg_morph_time: float = 0.0
     
     def update_fps(self):
         if len(self.frame_times) > 1:
-            self.fps = len(self.frame_times) / sum(self.frame_times)
-            self.avg_frame_time = sum(self.frame_times) / len(self.frame_times)
+            total_ns = self.frame_times.sum()
+            if total_ns > 0:
+                self.fps = len(self.frame_times) * 1e9 / total_ns
+            self.avg_frame_time = total_ns / len(self.frame_times) / 1e9
         if self.morph_update_times:
-            self.avg_morph_time = sum(self.morph_update_times) / len(self.morph_update_times)
+            self.avg_morph_time = self.morph_update_times.mean() / 1e9
+
+
+class MorphSlots:
+    """Stable dense slots for morph names; unknown morphs get a new slot when first seen"""
+    
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        for name in names:
+            self.slot(name)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def slot(self, name: str) -> int:
+        """Slot of a morph, assigning the next free one to a new name"""
+        slot = self.index.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self.names.append(name)
+            self.index[name] = slot
+        return slot
+    
+    def to_vector(self, morphs: Dict[str, float], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dense float32 vector of a morph dict; absent morphs are 0
+        
+        Args:
+            morphs: Morph names to values
+            out: Optional scratch buffer to fill; a new array is returned instead
+                 when new names have outgrown it
+        """
+        slots = [self.slot(name) for name in morphs]
+        n = len(self.names)
+        if out is not None and out.shape[0] >= n:
+            vec = out[:n]
+            vec.fill(0.0)
+        else:
+            vec = np.zeros(n, dtype=np.float32)
+        vec[slots] = list(morphs.values())
+        return vec
+    
+    def to_dict(self, vec: np.ndarray, idxs: np.ndarray) -> Dict[str, float]:
+        """Morph dict of the given slots of a dense vector"""
+        names = self.names
+        return dict(zip([names[i] for i in idxs.tolist()], vec[idxs].tolist()))
+
+
+def _fit(arr: np.ndarray, size: int, fill=0) -> np.ndarray:
+    """arr grown to size with fill, for per-slot arrays that trail a growing MorphSlots"""
+    if arr.shape[0] >= size:
+        return arr
+    return np.concatenate((arr, np.full(size - arr.shape[0], fill, dtype=arr.dtype)))
 
 
 class MorphLODSystem:
@@ -68,45 +168,104 @@ class MorphLODSystem:
             'low': 30,       # Priority 1-2
             'minimal': 20    # Priority 1 only
         }
+        
+        # Level lookup: each FPS break at or below the current FPS moves one level up
+        self._lod_levels = ['minimal', 'low', 'medium', 'high']
+        self._level_priority = {'minimal': 1, 'low': 2, 'medium': 3, 'high': 4}
+        self._fps_breaks = [self.lod_thresholds[level] for level in self._lod_levels[1:]]
+        
+        # Dense morph layout shared with the optimizer; slots past the priority list are custom morphs
+        self.slots = MorphSlots(self.morph_priorities)
+        self._build_lod_sets()
     
-    def get_allowed_morphs(self, current_fps: float) -> Set[str]:
-        """Get set of allowed morphs based on current performance"""
-        if current_fps >= self.lod_thresholds['high']:
-            max_priority = 4
-        elif current_fps >= self.lod_thresholds['medium']:
-            max_priority = 3
-        elif current_fps >= self.lod_thresholds['low']:
-            max_priority = 2
-        else:
-            max_priority = 1
+    def _build_lod_sets(self):
+        """Precompute allowed and excluded morphs per max priority; rerun after editing morph_priorities"""
+        self._allowed_by_priority: Dict[int, FrozenSet[str]] = {}
+        self._excluded_by_priority: Dict[int, FrozenSet[str]] = {}
+        self._lod_masks: Dict[int, np.ndarray] = {}
+        self._allowed_idx: Dict[int, np.ndarray] = {}  # flatnonzero of each mask, built on demand
+        for name in self.morph_priorities:
+            self.slots.slot(name)
+        priority_arr = np.array([self.morph_priorities.get(name, 0) for name in self.slots.names], dtype=np.int8)
+        for max_priority in (1, 2, 3, 4):
+            self._lod_masks[max_priority] = priority_arr <= max_priority
+            self._allowed_by_priority[max_priority] = frozenset(
+                morph for morph, priority in self.morph_priorities.items() if priority <= max_priority
+            )
+            self._excluded_by_priority[max_priority] = frozenset(
+                morph for morph, priority in self.morph_priorities.items() if priority > max_priority
+            )
+    
+    def lod_level(self, current_fps: float) -> str:
+        """LOD level name for this FPS"""
+        return self._lod_levels[bisect_right(self._fps_breaks, current_fps)]
+    
+    def max_priority(self, current_fps: float) -> int:
+        """Lowest morph priority (highest number) rendered at this FPS"""
+        return self._level_priority[self.lod_level(current_fps)]
+    
+    def lod_mask(self, max_priority: int) -> np.ndarray:
+        """Boolean mask over self.slots of the morphs rendered at max_priority; custom morphs are always True"""
+        mask = self._lod_masks[max_priority]
+        if mask.shape[0] < len(self.slots):
+            mask = self._lod_masks[max_priority] = _fit(mask, len(self.slots), True)
+            self._allowed_idx.pop(max_priority, None)
+        return mask
+    
+    def allowed_indices(self, max_priority: int) -> np.ndarray:
+        """Ascending slots of the morphs rendered at max_priority, custom morphs included"""
+        mask = self.lod_mask(max_priority)
+        idx = self._allowed_idx.get(max_priority)
+        if idx is None:
+            idx = self._allowed_idx[max_priority] = np.flatnonzero(mask).astype(np.int32)
+            idx.setflags(write=False)
+        return idx
+    
+    def gather_vector(self, vec: np.ndarray, current_fps: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Dense filter_morphs as a single gather
         
-        return {
-            morph for morph, priority in self.morph_priorities.items()
-            if priority <= max_priority
-        }
+        Returns:
+            Tuple of (allowed slots, their values from vec)
+        """
+        idx = self.allowed_indices(self.max_priority(current_fps))
+        if idx.shape[0] and idx[-1] >= vec.shape[0]:
+            idx = idx[:np.searchsorted(idx, vec.shape[0])]
+        return idx, vec.take(idx)
+    
+    def filter_vector(self, vec: np.ndarray, current_fps: float) -> np.ndarray:
+        """Dense filter_morphs: vec indexed like self.slots with filtered-out morphs zeroed"""
+        return vec * self.lod_mask(self.max_priority(current_fps))[:vec.shape[0]]
+    
+    def get_allowed_morphs(self, current_fps: float) -> FrozenSet[str]:
+        """Get set of allowed morphs based on current performance"""
+        return self._allowed_by_priority[self.max_priority(current_fps)]
     
     def filter_morphs(self, morphs: Dict[str, float], current_fps: float) -> Dict[str, float]:
         """Filter morphs based on LOD level"""
-        allowed = self.get_allowed_morphs(current_fps)
-        
-        # Always include morphs not in our priority list (custom morphs)
-        filtered = {}
-        for morph, value in morphs.items():
-            if morph in allowed or morph not in self.morph_priorities:
-                filtered[morph] = value
-        
-        return filtered
+        # Morphs not in our priority list (custom morphs) are never excluded
+        excluded = self._excluded_by_priority[self.max_priority(current_fps)]
+        return {morph: value for morph, value in morphs.items() if morph not in excluded}
 
 
 class MorphDeltaCompression:
     """Compress morph updates by only sending deltas"""
     
-    def __init__(self, threshold: float = 0.01):
-        self.previous_state = {}
+    def __init__(self, threshold: float = 0.01, slots: Optional[MorphSlots] = None):
+        self.slots = slots if slots is not None else MorphSlots()
+        self.previous = np.zeros(len(self.slots), dtype=np.float32)  # Last sent value per slot
+        self.previous_q = np.zeros(len(self.slots), dtype=np.int8)  # Last sent quantized value per slot
+        self._idx = np.empty(len(self.slots), dtype=np.intp)
+        self._cur = np.zeros(len(self.slots), dtype=np.float32)  # Scratch for get_delta
         self.threshold = threshold
         self.force_update_counter = 0
         self.force_update_interval = 60  # Force full update every 60 frames
     
+    @property
+    def previous_state(self) -> Dict[str, float]:
+        """Last sent non-zero morph values, by name"""
+        return self.slots.to_dict(self.previous, np.flatnonzero(self.previous))
+    
     def get_delta(self, current_morphs: Dict[str, float], 
                   force_update: bool = False) -> Tuple[Dict[str, float], bool]:
         """
@@ -115,33 +274,94 @@ class MorphDeltaCompression:
         Returns:
             Tuple of (delta_morphs, is_full_update)
         """
+        cur = self.slots.to_vector(current_morphs, self._cur)
+        if cur.shape[0] > self._cur.shape[0]:
+            self._cur = cur
+        idxs, is_full_update = self._delta(cur, force_update)
+        if is_full_update:
+            return current_morphs, True
+        return self.slots.to_dict(cur, idxs), False
+    
+    def get_delta_vector(self, cur: np.ndarray, force_update: bool = False) -> Tuple[np.ndarray, bool]:
+        """
+        Dense get_delta
+        
+        Args:
+            cur: float32 morph values indexed like self.slots; absent morphs are 0
+            force_update: Send the full state regardless of the update interval
+            
+        Returns:
+            Tuple of (slots to send with their values from cur, is_full_update)
+        """
+        idxs, is_full_update = self._delta(cur, force_update)
+        return idxs.copy(), is_full_update
+    
+    def _delta(self, cur: np.ndarray, force_update: bool) -> Tuple[np.ndarray, bool]:
+        """get_delta_vector returning a view of the reused index buffer"""
         self.force_update_counter += 1
+        n = cur.shape[0]
+        self.previous = _fit(self.previous, n)
+        previous = self.previous[:n]
         
-        # Force periodic full updates to prevent drift
+        # Force periodic full updates to prevent drift, unless the sent state already matches exactly
         if force_update or self.force_update_counter >= self.force_update_interval:
             self.force_update_counter = 0
-            self.previous_state = current_morphs.copy()
-            return current_morphs, True
-        
-        delta = {}
+            if not force_update and np.array_equal(cur, previous):
+                return np.empty(0, dtype=np.intp), False
+            previous[:] = cur
+            self.previous[n:] = 0.0
+            return np.arange(n), True
+        
+        # Only include significant changes, and always send zero values to clear morphs
+        self._idx = _fit(self._idx, n)
+        count = delta_update(cur, previous, np.float32(self.threshold), self._idx)
+        return self._idx[:count], False
+    
+    @staticmethod
+    def quantize(vec: np.ndarray) -> np.ndarray:
+        """Morph values in [0, 1] as int8 fixed point (value * 127)"""
+        return np.rint(np.clip(vec, 0.0, 1.0) * 127).astype(np.int8)
+    
+    @staticmethod
+    def dequantize(q: np.ndarray) -> np.ndarray:
+        """Inverse of quantize, as float32"""
+        return q.astype(np.float32) / 127
+    
+    def get_delta_quantized(self, cur: np.ndarray,
+                            force_update: bool = False) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """
+        get_delta_vector on the int8 wire format, one byte per morph value
         
-        # Find changed morphs
-        all_morphs = set(current_morphs.keys()) | set(self.previous_state.keys())
+        Keeps its own quantized state, so use either this or get_delta/get_delta_vector
+        on one instance. The threshold is applied in quantization steps of 1/127.
         
-        for morph in all_morphs:
-            current_val = current_morphs.get(morph, 0.0)
-            previous_val = self.previous_state.get(morph, 0.0)
+        Args:
+            cur: float32 morph values indexed like self.slots; absent morphs are 0
+            force_update: Send the full state regardless of the update interval
             
-            # Only include if change is significant
-            if abs(current_val - previous_val) > self.threshold:
-                delta[morph] = current_val
-                self.previous_state[morph] = current_val
-            elif current_val == 0.0 and previous_val != 0.0:
-                # Always send zero values to clear morphs
-                delta[morph] = 0.0
-                self.previous_state[morph] = 0.0
-        
-        return delta, False
+        Returns:
+            Tuple of (slots to send, their int8 values, is_full_update)
+        """
+        self.force_update_counter += 1
+        n = cur.shape[0]
+        q = self.quantize(cur)
+        self.previous_q = _fit(self.previous_q, n)
+        previous = self.previous_q[:n]
+        
+        if force_update or self.force_update_counter >= self.force_update_interval:
+            self.force_update_counter = 0
+            if not force_update and np.array_equal(q, previous):
+                return np.empty(0, dtype=np.intp), q[:0], False
+            previous[:] = q
+            self.previous_q[n:] = 0
+            return np.arange(n), q, True
+        
+        # int8 steps differ by at most 127, so the difference can't overflow
+        changed = np.abs(q - previous) > int(self.threshold * 127)
+        changed |= (q == 0) & (previous != 0)
+        idxs = np.flatnonzero(changed)
+        previous[idxs] = q[idxs]
+        return idxs, q[idxs], False
 
 
 class FrameRateController:
@@ -150,70 +370,92 @@ class FrameRateController:
     def __init__(self, target_fps: float = 60.0):
         self.target_fps = target_fps
         self.target_frame_time = 1.0 / target_fps
-        self.last_frame_time = time.time()
+        self.target_frame_time_ns = int(1e9 / target_fps)
+        self.last_frame_time_ns = time.perf_counter_ns()
         self.frame_skip_threshold = 1.5  # Skip if behind by 1.5 frames
         self.adaptive_quality = True
+        
+        # Processing time owed beyond the frame budget, capped at +-2 frames so a stall can't snowball
+        self.budget_ns = 0
+        self.threshold_ns = int((self.frame_skip_threshold - 1.0) * self.target_frame_time_ns)
+        self.max_budget_ns = 2 * self.target_frame_time_ns
     
-    def should_update(self) -> Tuple[bool, float]:
+    def should_update(self, current_time_ns: Optional[int] = None) -> Tuple[bool, float]:
         """
         Determine if we should update this frame
         
+        Args:
+            current_time_ns: perf_counter_ns() reading the caller already took, if any
+            
         Returns:
             Tuple of (should_update, time_delta)
         """
-        current_time = time.time()
-        time_delta = current_time - self.last_frame_time
+        if current_time_ns is None:
+            current_time_ns = time.perf_counter_ns()
+        time_delta_ns = current_time_ns - self.last_frame_time_ns
         
         # Always update if enough time has passed
-        if time_delta >= self.target_frame_time:
-            self.last_frame_time = current_time
-            return True, time_delta
+        if time_delta_ns >= self.target_frame_time_ns:
+            self.last_frame_time_ns = current_time_ns
+            return True, time_delta_ns / 1e9
         
-        return False, time_delta
+        return False, time_delta_ns / 1e9
     
-    def should_skip_frame(self, processing_time: float) -> bool:
-        """Determine if we should skip the next frame to catch up"""
-        return processing_time > self.target_frame_time * self.frame_skip_threshold
+    def should_skip_frame(self, processing_time_ns: int) -> bool:
+        """
+        Determine if we should skip the next frame to catch up
+        
+        Args:
+            processing_time_ns: Time spent on the frame just processed
+        """
+        budget_ns = self.budget_ns + processing_time_ns - self.target_frame_time_ns
+        skip = budget_ns > self.threshold_ns
+        if skip:
+            # The skipped frame pays back one frame of time
+            budget_ns -= self.target_frame_time_ns
+        self.budget_ns = min(max(budget_ns, -self.max_budget_ns), self.max_budget_ns)
+        return skip
 
 
 class OptimizedMorphCache:
-    """Cache frequently used morph combinations"""
+    """Cache frequently used morph combinations (LRU) as read-only dense vectors"""
     
     def __init__(self, cache_size: int = 100):
-        self.cache = {}
+        self.cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
         self.cache_hits = 0
         self.cache_misses = 0
         self.max_size = cache_size
-        self.access_count = {}
     
-    def get_cache_key(self, morphs: Dict[str, float]) -> str:
-        """Generate cache key from morph combination"""
-        # Round values to reduce key variations
-        rounded = {k: round(v, 2) for k, v in sorted(morphs.items())}
-        return str(hash(tuple(rounded.items())))
+    def get_cache_key(self, vec: np.ndarray) -> bytes:
+        """Generate cache key from a dense morph vector"""
+        # Quantize to 2 decimals to reduce key variations. The rounded float32 bytes
+        # key directly: skipping an integer cast saves an allocation per frame, and a
+        # -0.0 only costs a cache miss
+        return np.rint(vec * 100).tobytes()
     
-    def get(self, key: str) -> Optional[Dict[str, float]]:
-        """Get cached morph combination"""
-        if key in self.cache:
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Get cached morph combination; the array is shared and read-only"""
+        vec = self.cache.get(key)
+        if vec is not None:
             self.cache_hits += 1
-            self.access_count[key] = self.access_count.get(key, 0) + 1
-            return self.cache[key].copy()
+            self.cache.move_to_end(key)
+            return vec
         
         self.cache_misses += 1
         return None
     
-    def put(self, key: str, morphs: Dict[str, float]):
-        """Cache morph combination"""
-        if len(self.cache) >= self.max_size:
-            # Remove least accessed item
-            if self.access_count:
-                least_used = min(self.access_count.items(), key=lambda x: x[1])[0]
-                if least_used in self.cache:
-                    del self.cache[least_used]
-                    del self.access_count[least_used]
-        
-        self.cache[key] = morphs.copy()
-        self.access_count[key] = 1
+    def clear(self):
+        """Drop all cached combinations"""
+        self.cache.clear()
+    
+    def put(self, key: bytes, vec: np.ndarray):
+        """Cache morph combination, taking ownership of vec and marking it read-only"""
+        if key not in self.cache and len(self.cache) >= self.max_size:
+            # Remove least recently used item
+            self.cache.popitem(last=False)
+        
+        vec.setflags(write=False)
+        self.cache[key] = vec
     
     @property
     def hit_rate(self) -> float:
@@ -222,14 +464,26 @@ class OptimizedMorphCache:
 
 
 class FacialAnimationPerformanceOptimizer:
-    """Main performance optimization controller"""
+    """
+    Main performance optimization controller
+    
+    Use one optimizer per avatar. Its slots, cache, delta state and scratch
+    buffers are not shared, so different optimizers can run on different
+    threads (see process_frames_parallel), but one optimizer must only be
+    called from one thread at a time.
+    """
     
     def __init__(self, target_fps: float = 60.0):
         self.metrics = PerformanceMetrics()
         self.lod_system = MorphLODSystem()
-        self.delta_compression = MorphDeltaCompression()
+        self.slots = self.lod_system.slots
+        self._keep_idx = np.empty(len(self.slots), dtype=np.intp)
+        self._cur = np.zeros(len(self.slots), dtype=np.float32)  # Scratch for optimize_morphs
+        
+        self.delta_compression = MorphDeltaCompression(slots=self.slots)
         self.frame_controller = FrameRateController(target_fps)
         self.morph_cache = OptimizedMorphCache()
+        self._cache_max_priority = None  # LOD level the cached results were filtered at
         
         # Optimization settings
         self.enable_lod = True
@@ -241,48 +495,87 @@ class FacialAnimationPerformanceOptimizer:
         self.critical_fps = 20.0
         self.warning_fps = 45.0
         
+        # Low-FPS messages are rate limited so logging doesn't add to the slowdown
+        self.log_interval_ns = 1_000_000_000
+        self._last_log_ns: Optional[int] = None
+        
         # Morph batching
         self.morph_batch = []
         self.batch_size = 5
-        self.batch_timeout = 0.016  # 16ms
-        self.last_batch_time = time.time()
+        self.batch_timeout_ns = 16_000_000  # 16ms
+        self.last_batch_time_ns = time.perf_counter_ns()
+        # Dense batching: one row per frame, columns indexed like self.slots
+        self.batch_buf = np.zeros((self.batch_size, len(self.slots)), dtype=np.float32)
+        self.batch_len = 0
     
     def optimize_morphs(self, raw_morphs: Dict[str, float]) -> Dict[str, float]:
         """Apply all optimizations to morph data"""
-        start_time = time.time()
-        
-        # Step 1: Check cache
-        if self.enable_caching:
-            cache_key = self.morph_cache.get_cache_key(raw_morphs)
+        start_time_ns = time.perf_counter_ns()
+        
+        vec = self.slots.to_vector(raw_morphs, self._cur)
+        if vec.shape[0] > self._cur.shape[0]:
+            self._cur = vec
+        
+        # Step 1: Check cache, only under load; at healthy FPS building the key costs more than it saves
+        use_cache = self.enable_caching and self.metrics.fps < self.warning_fps
+        if use_cache:
+            max_priority = self._max_priority()
+            if max_priority != self._cache_max_priority:
+                # Cached results were filtered for another LOD level
+                self.morph_cache.clear()
+                self._cache_max_priority = max_priority
+            cache_key = self.morph_cache.get_cache_key(vec)
             cached = self.morph_cache.get(cache_key)
             if cached is not None:
-                return cached
+                return self.slots.to_dict(cached, np.flatnonzero(cached))
         
-        # Step 2: Apply LOD filtering
-        if self.enable_lod:
-            morphs = self.lod_system.filter_morphs(raw_morphs, self.metrics.fps)
-        else:
-            morphs = raw_morphs.copy()
-        
-        # Step 3: Remove very small values
-        morphs = {k: v for k, v in morphs.items() if abs(v) > 0.005}
+        # Step 2 and 3: Apply LOD filtering and remove very small values
+        idxs = self._select(vec)
+        morphs = self.slots.to_dict(vec, idxs)
         
-        # Step 4: Cache result
-        if self.enable_caching and cache_key:
-            self.morph_cache.put(cache_key, morphs)
+        # Step 4: Cache result as the dense vector of kept morphs
+        if use_cache:
+            kept = np.zeros_like(vec)
+            kept[idxs] = vec[idxs]
+            self.morph_cache.put(cache_key, kept)
         
         # Track performance
-        self.metrics.morph_update_times.append(time.time() - start_time)
+        self.metrics.morph_update_times.append(time.perf_counter_ns() - start_time_ns)
         self.metrics.active_morph_count.append(len(morphs))
         
         return morphs
     
+    def _max_priority(self) -> int:
+        """Lowest morph priority rendered now"""
+        # Without LOD every morph is kept, as at unbounded FPS
+        return self.lod_system.max_priority(self.metrics.fps if self.enable_lod else float('inf'))
+    
+    def optimize_vector(self, vec: np.ndarray) -> np.ndarray:
+        """
+        Dense LOD filtering and small-value pruning
+        
+        Args:
+            vec: float32 morph values indexed like self.slots
+            
+        Returns:
+            Slots of the morphs to keep
+        """
+        return self._select(vec).copy()
+    
+    def _select(self, vec: np.ndarray) -> np.ndarray:
+        """optimize_vector returning a view of the reused index buffer"""
+        n = vec.shape[0]
+        self._keep_idx = _fit(self._keep_idx, n)
+        allowed = self.lod_system.lod_mask(self._max_priority())[:n]
+        count = select_morphs(vec, allowed, np.float32(0.005), self._keep_idx)
+        return self._keep_idx[:count]
+    
     def process_frame(self, morphs: Dict[str, float]) -> Optional[Dict[str, float]]:
         """Process a single animation frame with all optimizations"""
-        frame_start = time.time()
+        frame_start_ns = time.perf_counter_ns()
         
-        # Check if we should update this frame
-        should_update, time_delta = self.frame_controller.should_update()
+        # Check if we should update this frame, reusing the frame's clock reading
+        should_update, time_delta = self.frame_controller.should_update(frame_start_ns)
         if not should_update and self.enable_frame_skipping:
             return None
         
@@ -297,8 +590,7 @@ class FacialAnimationPerformanceOptimizer:
             result = optimized
         
         # Track frame time
-        frame_time = time.time() - frame_start
-        self.metrics.frame_times.append(frame_time)
+        self.metrics.frame_times.append(time.perf_counter_ns() - frame_start_ns)
         
         # Update metrics
         self.metrics.update_fps()
@@ -315,14 +607,47 @@ class FacialAnimationPerformanceOptimizer:
         """Batch multiple morph updates for network efficiency"""
         self.morph_batch.append(morphs)
         
-        current_time = time.time()
-        time_since_last = current_time - self.last_batch_time
+        current_time_ns = time.perf_counter_ns()
         
         # Send batch if size limit reached or timeout
-        if len(self.morph_batch) >= self.batch_size or time_since_last > self.batch_timeout:
+        if (len(self.morph_batch) >= self.batch_size
+                or current_time_ns - self.last_batch_time_ns > self.batch_timeout_ns):
             batch = self.morph_batch
             self.morph_batch = []
-            self.last_batch_time = current_time
+            self.last_batch_time_ns = current_time_ns
+            return batch
+        
+        return None
+    
+    def batch_vector(self, vec: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Dense batch_morphs that writes frames into a preallocated buffer
+        
+        Args:
+            vec: float32 morph values indexed like self.slots
+            
+        Returns:
+            (frames, slots) float32 array ready to serialize with tobytes(), or None while batching
+        """
+        rows, cols = self.batch_buf.shape
+        if rows < self.batch_size or cols < vec.shape[0]:
+            grown = np.zeros((max(rows, self.batch_size), max(cols, vec.shape[0])), dtype=np.float32)
+            grown[:rows, :cols] = self.batch_buf
+            self.batch_buf = grown
+        
+        row = self.batch_buf[self.batch_len]
+        row[:vec.shape[0]] = vec
+        row[vec.shape[0]:] = 0.0
+        self.batch_len += 1
+        
+        current_time_ns = time.perf_counter_ns()
+        
+        # Send batch if size limit reached or timeout
+        if (self.batch_len >= self.batch_size
+                or current_time_ns - self.last_batch_time_ns > self.batch_timeout_ns):
+            batch = self.batch_buf[:self.batch_len].copy()
+            self.batch_len = 0
+            self.last_batch_time_ns = current_time_ns
             return batch
         
         return None
@@ -337,7 +662,7 @@ class FacialAnimationPerformanceOptimizer:
         # Reduce quality further
         self.delta_compression.threshold = 0.02  # Increase threshold
         
-        print(f"CRITICAL: FPS dropped to {self.metrics.fps:.1f}")
+        self._log_fps(logging.ERROR, "FPS dropped to %.1f")
     
     def _handle_performance_warning(self):
         """Handle performance warnings"""
@@ -345,7 +670,17 @@ class FacialAnimationPerformanceOptimizer:
         self.enable_lod = True
         self.enable_compression = True
         
-        print(f"WARNING: FPS at {self.metrics.fps:.1f}")
+        self._log_fps(logging.WARNING, "FPS at %.1f")
+    
+    def _log_fps(self, level: int, msg: str):
+        """Log msg % fps at most once per log_interval_ns"""
+        if not logger.isEnabledFor(level):
+            return
+        now_ns = time.perf_counter_ns()
+        if self._last_log_ns is not None and now_ns - self._last_log_ns < self.log_interval_ns:
+            return
+        self._last_log_ns = now_ns
+        logger.log(level, msg, self.metrics.fps)
     
     def get_performance_report(self) -> Dict:
         """Get detailed performance report"""
@@ -353,7 +688,7 @@ class FacialAnimationPerformanceOptimizer:
             'fps': self.metrics.fps,
             'avg_frame_time_ms': self.metrics.avg_frame_time * 1000,
             'avg_morph_time_ms': self.metrics.avg_morph_time * 1000,
-            'avg_active_morphs': np.mean(list(self.metrics.active_morph_count)) if self.metrics.active_morph_count else 0,
+            'avg_active_morphs': self.metrics.active_morph_count.mean(),
             'cache_hit_rate': self.morph_cache.hit_rate,
             'lod_enabled': self.enable_lod,
             'compression_enabled': self.enable_compression,
@@ -362,15 +697,27 @@ class FacialAnimationPerformanceOptimizer:
     
     def _get_current_lod_level(self) -> str:
         """Get current LOD level based on FPS"""
-        fps = self.metrics.fps
-        if fps >= 60:
-            return 'high'
-        elif fps >= 45:
-            return 'medium'
-        elif fps >= 30:
-            return 'low'
-        else:
-            return 'minimal'
+        return self.lod_system.lod_level(self.metrics.fps)
+
+
+def process_frames_parallel(optimizers: List[FacialAnimationPerformanceOptimizer],
+                            frames: List[Dict[str, float]],
+                            executor: Executor) -> List[Optional[Dict[str, float]]]:
+    """
+    Run process_frame for several avatars on a thread pool
+    
+    The select/delta kernels release the GIL, so their part of each frame
+    runs in parallel; the dict conversion around them still takes turns.
+    
+    Args:
+        optimizers: One optimizer per avatar
+        frames: Morph frame for each optimizer
+        executor: Pool to run on, e.g. a shared ThreadPoolExecutor
+        
+    Returns:
+        process_frame result for each avatar, in order
+    """
+    return list(executor.map(lambda opt, morphs: opt.process_frame(morphs), optimizers, frames))
 
 
 # Example usage
@@ -8,15 +8,16 @@ import logging
 from typing import Dict, Optional, List, Any, Tuple
 from dataclasses import dataclass, field
 import time
-import json
-from collections import deque
+
+import numpy as np
 
 from .enhanced_facial_animation_system import EnhancedFacialAnimationSystem
-from .facial_animation_performance_optimizer import FacialAnimationOptimizer
+from .facial_animation_mapper_enhanced import ARKIT_ORDER
+from .facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer, MorphSlots
 from .viseme_transition_engine import VisemeTransitionEngine
 from .websocket_protocol import (
     AnimationData, AudioData, VisemeData, MetricsData,
-    QualityLevel, parse_message, create_error_message
+    QualityLevel, parse_message, create_error_message, dumps_message
 )
 from ..compression.delta_compressor import DeltaCompressor
 from ..compression.performance_monitor import PerformanceMonitor
@@ -24,6 +25,67 @@ from ..compression.performance_monitor import PerformanceMonitor
 
 logger = logging.getLogger(__name__)
 
+# Compressed weights are snapped to this many steps over [0, 1] (8-bit fixed point)
+WEIGHT_LEVELS = 255
+
+# Estimated JSON size of one uncompressed morph entry, e.g. '"Mouth_Smile_L": 0.4375, '
+MORPH_ENTRY_BYTES = 24
+
+# Messages buffered per session for its writer task before frames start dropping
+OUT_QUEUE_SIZE = 256
+
+# Most queued messages a writer drains into one round of sends
+WRITE_BATCH_MAX = 64
+
+
+def _payload_size(payload: Any) -> int:
+    """Wire size of a frame payload without serializing it"""
+    if payload is None:
+        return 0  # Held back by the compressor (idle or batching)
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return len(payload)
+    return len(payload) * MORPH_ENTRY_BYTES
+
+
+class FrameHistory:
+    """
+    Timestamp, latency and size of a session's recent frames in preallocated ring arrays
+    
+    Also keeps fps, an exponential moving average of the frame rate updated on append.
+    """
+    
+    def __init__(self, size: int = 60, fps_decay: float = 0.9):
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.latencies = np.zeros(size, dtype=np.float32)
+        self.sizes = np.zeros(size, dtype=np.int32)
+        self.head = 0
+        self.count = 0
+        self.fps_decay = fps_decay
+        self.fps = 0.0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, timestamp: float, latency: float, size: int):
+        if self.count:
+            interval = timestamp - self.timestamps[self.head - 1]
+            if interval > 0:
+                rate = 1.0 / interval
+                self.fps = rate if self.fps == 0.0 else self.fps_decay * self.fps + (1 - self.fps_decay) * rate
+        
+        i = self.head
+        self.timestamps[i] = timestamp
+        self.latencies[i] = latency
+        self.sizes[i] = size
+        self.head = (i + 1) % self.timestamps.shape[0]
+        if self.count < self.timestamps.shape[0]:
+            self.count += 1
+    
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.fps = 0.0
+
 
 @dataclass
 class AvatarSession:
@@ -33,14 +95,24 @@ class AvatarSession:
     quality: QualityLevel = QualityLevel.HIGH
     compression_enabled: bool = True
     active: bool = True
-    created_at: float = field(default_factory=time.time)
-    last_frame_time: float = field(default_factory=time.time)
+    created_at: float = field(default_factory=time.time)  # Wall clock, for reporting
+    last_frame_time: float = field(default_factory=time.perf_counter)  # Frame timing uses perf_counter
     frame_count: int = 0
     metrics: MetricsData = field(default_factory=lambda: MetricsData(
         fps=0.0, latency_ms=0.0, bandwidth_kbps=0.0,
         draw_calls=0, triangles=0, compression_ratio=1.0
     ))
-    frame_history: deque = field(default_factory=lambda: deque(maxlen=60))
+    frame_history: FrameHistory = field(default_factory=FrameHistory)
+    # Temporal smoothing state over the system's morph slots
+    weights_prev: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    weights_present: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+    compressor_slots: int = 0  # Morph slots registered with this session's compressor
+    # Outgoing messages, drained in order by the session's writer task
+    out_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=OUT_QUEUE_SIZE))
+    writer_task: Optional[asyncio.Task] = None
+    # Frame skipping limits, recomputed when the session's quality changes
+    skip_modulus: int = 1  # Process every skip_modulus-th frame
+    max_frame_delta: float = float("inf")  # Skip frames arriving later than this (seconds)
 
 
 class UnifiedFacialAnimationSystem:
@@ -51,10 +123,13 @@ class UnifiedFacialAnimationSystem:
     def __init__(self):
         # Core components
         self.animation_system = EnhancedFacialAnimationSystem()
-        self.optimizer = FacialAnimationOptimizer()
+        self.optimizer = FacialAnimationPerformanceOptimizer()
         self.viseme_engine = VisemeTransitionEngine()
         self.performance_monitor = PerformanceMonitor()
         
+        # Dense blendshape layout shared by all sessions: ARKit names first, others as they appear
+        self.morph_slots = MorphSlots(ARKIT_ORDER)
+        
         # Session management
         self.sessions: Dict[str, AvatarSession] = {}
         self.compressors: Dict[str, DeltaCompressor] = {}
@@ -128,6 +203,8 @@ class UnifiedFacialAnimationSystem:
         
         # Create session
         session = AvatarSession(id=avatar_id, websocket=websocket)
+        self._apply_quality(session)
+        session.writer_task = asyncio.create_task(self._writer(session))
         self.sessions[avatar_id] = session
         
         # Create compressor for this session
@@ -145,6 +222,8 @@ class UnifiedFacialAnimationSystem:
         if avatar_id in self.sessions:
             session = self.sessions[avatar_id]
             session.active = False
+            if session.writer_task:
+                session.writer_task.cancel()
             
             # Clean up
             del self.sessions[avatar_id]
@@ -160,11 +239,11 @@ class UnifiedFacialAnimationSystem:
         if not session.active:
             raise ValueError(f"Avatar {avatar_id} is not active")
         
-        start_time = time.time()
+        # One clock read times the frame interval and the processing latency
+        current_time = time.perf_counter()
         
         try:
             # Frame timing
-            current_time = time.time()
             frame_delta = current_time - session.last_frame_time
             session.last_frame_time = current_time
             
@@ -175,48 +254,33 @@ class UnifiedFacialAnimationSystem:
             
             # Get quality settings
             quality = self.quality_settings[session.quality]
+            compress = session.compression_enabled and session.quality != QualityLevel.ULTRA
             
-            # Optimize animation data
-            optimized_data = await self.optimizer.optimize_animation_data(
-                animation_data.blendshapes,
-                avatar_id,
-                morph_limit=quality["morph_limit"]
-            )
-            
-            # Apply temporal smoothing
-            smoothed_data = self._apply_temporal_smoothing(
-                session, optimized_data, frame_delta
+            # Limit, smooth and compress in one pass over the frame's blendshape vector
+            compressed, morphs_active = self._fused_frame_kernel(
+                session, animation_data.blendshapes, quality["morph_limit"], frame_delta, compress
             )
-            
-            # Compress if enabled
-            if session.compression_enabled and session.quality != QualityLevel.ULTRA:
-                compressor = self.compressors[avatar_id]
-                compressed = compressor.compress_frame(smoothed_data)
-                compression_ratio = compressor.get_compression_ratio()
+            if compress:
+                compression_ratio = self.compressors[avatar_id].get_stats().compression_ratio
             else:
-                compressed = smoothed_data
                 compression_ratio = 1.0
             
             # Update metrics
-            latency = (time.time() - start_time) * 1000
+            latency = (time.perf_counter() - current_time) * 1000.0
             session.frame_count += 1
-            session.frame_history.append({
-                "timestamp": current_time,
-                "latency": latency,
-                "size": len(json.dumps(compressed))
-            })
+            session.frame_history.append(current_time, latency, _payload_size(compressed))
             
             # Update session metrics
             session.metrics.latency_ms = latency
             session.metrics.compression_ratio = compression_ratio
-            session.metrics.fps = self._calculate_fps(session)
+            session.metrics.fps = session.frame_history.fps
             
             return {
                 "data": compressed,
                 "metrics": {
                     "latency_ms": latency,
                     "compression_ratio": compression_ratio,
-                    "morphs_active": len(smoothed_data),
+                    "morphs_active": morphs_active,
                     "frame_number": session.frame_count
                 }
             }
@@ -259,6 +323,7 @@ class UnifiedFacialAnimationSystem:
             new_quality = params.get("level", QualityLevel.HIGH)
             if new_quality in QualityLevel:
                 session.quality = new_quality
+                self._apply_quality(session)
                 logger.info(f"Avatar {avatar_id} quality changed to {new_quality}")
                 await self._send_state_update(session)
                 
@@ -274,67 +339,118 @@ class UnifiedFacialAnimationSystem:
             
         elif action == "resume":
             session.active = True
-            session.last_frame_time = time.time()
+            session.last_frame_time = time.perf_counter()
             
         elif action == "keyframe":
             # Force keyframe
             if avatar_id in self.compressors:
                 self.compressors[avatar_id].force_keyframe()
     
+    def _apply_quality(self, session: AvatarSession):
+        """Precompute a session's frame skipping limits for its quality setting"""
+        update_rate = self.quality_settings[session.quality]["update_rate"]
+        # Rates at or above target_fps process every frame
+        session.skip_modulus = max(1, self.target_fps // update_rate)
+        session.max_frame_delta = self.frame_skip_threshold / self.target_fps
+    
     def _should_skip_frame(self, session: AvatarSession, frame_delta: float) -> bool:
         """Determine if frame should be skipped based on performance"""
-        target_frame_time = 1.0 / self.target_fps
+        # Skip if we're running too far behind, or to hold the quality's update rate
+        return frame_delta > session.max_frame_delta or session.frame_count % session.skip_modulus != 0
+    
+    def _fused_frame_kernel(self, session: AvatarSession,
+                            blendshapes: Dict[str, float],
+                            morph_limit: int,
+                            frame_delta: float,
+                            compress: bool) -> Tuple[Any, int]:
+        """
+        Limit, smooth and compress a frame in one pass over its blendshape vector
         
-        # Skip if we're running too far behind
-        if frame_delta > target_frame_time * self.frame_skip_threshold:
-            return True
-            
-        # Skip based on quality setting
-        quality = self.quality_settings[session.quality]
-        target_fps = quality["update_rate"]
-        if session.frame_count % (self.target_fps // target_fps) != 0:
-            return True
+        Args:
+            session: Avatar session holding the smoothing state
+            blendshapes: Blendshape names to values
+            morph_limit: Keep at most this many blendshapes, largest first
+            frame_delta: Seconds since the previous frame
+            compress: Delta-compress with the session's compressor
             
-        return False
+        Returns:
+            Tuple of (payload, active morph count). The payload is the compressor's
+            bytes (None while it batches) or a dict of smoothed values.
+        """
+        idx, cur = self._frame_vector(blendshapes)
+        
+        # Morph limit: keep the largest magnitudes, in input order
+        excess = cur.shape[0] - morph_limit
+        if excess > 0:
+            keep = np.sort(np.argpartition(np.abs(cur), excess)[excess:])
+            idx, cur = idx[keep], cur[keep]
+        
+        smoothed = self._smooth_vector(session, idx, cur, frame_delta)
+        
+        if not compress:
+            names = self.morph_slots.names
+            return dict(zip([names[i] for i in idx.tolist()], smoothed.tolist())), idx.shape[0]
+        
+        # Each session's compressor sees new slots in slot order, so its indices are slot indices
+        compressor = self.compressors[session.id]
+        n = len(self.morph_slots)
+        if session.compressor_slots < n:
+            compressor.register_morphs(self.morph_slots.names[session.compressor_slots:])
+            session.compressor_slots = n
+        frame = np.zeros(n, dtype=np.float32)
+        frame[idx] = self._quantize(smoothed)
+        return compressor.compress_frame_array(frame), idx.shape[0]
     
-    def _apply_temporal_smoothing(self, session: AvatarSession, 
-                                 data: Dict[str, float], 
-                                 frame_delta: float) -> Dict[str, float]:
-        """Apply temporal smoothing to reduce jitter"""
+    @staticmethod
+    def _quantize(weights: np.ndarray) -> np.ndarray:
+        """Snap weights to the 8-bit grid, so changes below one step don't produce deltas"""
+        q = (np.clip(weights, 0.0, 1.0) * WEIGHT_LEVELS + 0.5).astype(np.uint8)
+        return q.astype(np.float32) / np.float32(WEIGHT_LEVELS)
+    
+    def _frame_vector(self, data: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots and float32 values of a blendshape dict, registering new names"""
+        idx = np.fromiter((self.morph_slots.slot(key) for key in data), dtype=np.intp, count=len(data))
+        cur = np.fromiter(data.values(), dtype=np.float32, count=len(data))
+        return idx, cur
+    
+    def _smooth_vector(self, session: AvatarSession, idx: np.ndarray,
+                       cur: np.ndarray, frame_delta: float) -> np.ndarray:
+        """Apply temporal smoothing to cur at slots idx to reduce jitter"""
         # Simple exponential smoothing
-        alpha = min(1.0, frame_delta * 10)  # Smoothing factor
-        
-        if hasattr(session, '_last_frame_data'):
-            smoothed = {}
-            for key, value in data.items():
-                if key in session._last_frame_data:
-                    # Smooth between frames
-                    smoothed[key] = (alpha * value + 
-                                   (1 - alpha) * session._last_frame_data[key])
-                else:
-                    smoothed[key] = value
-            session._last_frame_data = smoothed
-            return smoothed
-        else:
-            session._last_frame_data = data.copy()
-            return data
+        alpha = np.float32(min(1.0, frame_delta * 10))  # Smoothing factor
+        
+        n = len(self.morph_slots)
+        if session.weights_prev.shape[0] < n:
+            grow = n - session.weights_prev.shape[0]
+            session.weights_prev = np.concatenate((session.weights_prev, np.zeros(grow, dtype=np.float32)))
+            session.weights_present = np.concatenate((session.weights_present, np.zeros(grow, dtype=bool)))
+        
+        # Smooth morphs that were in the last frame; new ones pass through
+        smoothed = np.where(session.weights_present[idx],
+                            alpha * cur + (1 - alpha) * session.weights_prev[idx], cur)
+        session.weights_present[:] = False
+        session.weights_present[idx] = True
+        session.weights_prev[idx] = smoothed
+        
+        return smoothed
     
     def _calculate_fps(self, session: AvatarSession) -> float:
-        """Calculate current FPS from frame history"""
-        if len(session.frame_history) < 2:
+        """Calculate current FPS exactly from the last second of frame history (for debugging; frames use the EMA)"""
+        history = session.frame_history
+        if len(history) < 2:
             return 0.0
             
         # Get timestamps from last second
-        current_time = time.time()
-        recent_frames = [f for f in session.frame_history 
-                        if current_time - f["timestamp"] <= 1.0]
+        current_time = time.perf_counter()
+        timestamps = history.timestamps[:history.count]
+        recent = timestamps[current_time - timestamps <= 1.0]
         
-        if len(recent_frames) < 2:
+        if recent.shape[0] < 2:
             return 0.0
             
-        time_span = recent_frames[-1]["timestamp"] - recent_frames[0]["timestamp"]
+        time_span = recent.max() - recent.min()
         if time_span > 0:
-            return len(recent_frames) / time_span
+            return float(recent.shape[0] / time_span)
         return 0.0
     
     async def _send_state_update(self, session: AvatarSession):
@@ -345,11 +461,106 @@ class UnifiedFacialAnimationSystem:
             "state": "active" if session.active else "paused",
             "quality": session.quality,
             "compression_enabled": session.compression_enabled,
-            "metrics": session.metrics.dict() if session.metrics else None
+            "metrics": dict(session.metrics.__dict__) if session.metrics else None
         }
         
-        if session.websocket:
-            await session.websocket.send_json(state_msg)
+        self._enqueue(session, state_msg)
+    
+    def send_message(self, avatar_id: str, message: Any):
+        """
+        Queue a message for an avatar's websocket
+        
+        Args:
+            avatar_id: Avatar session to send to
+            message: JSON-serializable dict, or bytes sent as a binary message
+        """
+        session = self.sessions.get(avatar_id)
+        if session:
+            self._enqueue(session, message)
+    
+    def send_frame(self, avatar_id: str, data: Any):
+        """Queue an animation frame, dropping the oldest queued frame if the client falls behind"""
+        session = self.sessions.get(avatar_id)
+        if session and data is not None:
+            self._enqueue(session, data, drop_oldest=True)
+    
+    def _enqueue(self, session: AvatarSession, message: Any, drop_oldest: bool = False):
+        """Put a message on a session's outgoing queue without waiting"""
+        queue = session.out_queue
+        if queue.full():
+            if not drop_oldest:
+                logger.warning(f"Outgoing queue full for {session.id}, dropping message")
+                self._resync_after_drop(session, message)
+                return
+            self._resync_after_drop(session, queue.get_nowait())
+        queue.put_nowait(message)
+    
+    def _resync_after_drop(self, session: AvatarSession, dropped: Any):
+        """Force a keyframe once a binary frame is dropped, as later deltas build on it"""
+        if isinstance(dropped, (bytes, bytearray)) and session.id in self.compressors:
+            self.compressors[session.id].force_keyframe()
+    
+    @staticmethod
+    def _coalesce(messages: List[Any]) -> List[Any]:
+        """
+        Merge runs of JSON messages into single batch messages
+        
+        Args:
+            messages: Queued messages in send order
+            
+        Returns:
+            Messages to send in order; binary frames are kept as they are
+        """
+        out = []
+        run = []
+        for message in messages:
+            if isinstance(message, (bytes, bytearray)):
+                if run:
+                    out.append(run[0] if len(run) == 1 else {"type": "batch", "messages": run})
+                    run = []
+                out.append(message)
+            else:
+                run.append(message)
+        if run:
+            out.append(run[0] if len(run) == 1 else {"type": "batch", "messages": run})
+        return out
+    
+    async def _writer(self, session: AvatarSession):
+        """Send a session's queued messages to its websocket in order"""
+        queue = session.out_queue
+        while True:
+            # Wait for one message, then take whatever else is already queued
+            pending = [await queue.get()]
+            while len(pending) < WRITE_BATCH_MAX:
+                try:
+                    pending.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if not session.websocket:
+                continue
+            try:
+                for message in self._coalesce(pending):
+                    if isinstance(message, (bytes, bytearray)):
+                        await session.websocket.send_bytes(message)
+                    else:
+                        await session.websocket.send_text(dumps_message(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to send to {session.id}: {e}")
+                await self._drop_session(session)
+                return
+    
+    async def _drop_session(self, session: AvatarSession):
+        """Stop a session whose websocket failed, so frames aren't queued for a dead socket"""
+        session.active = False
+        session.writer_task = None  # Called from the writer itself; don't cancel it
+        if self.sessions.get(session.id) is session:
+            await self.disconnect_avatar(session.id)
+        try:
+            await session.websocket.close()
+        except Exception:
+            pass  # Already closed
     
     async def _monitor_performance(self):
         """Background task to monitor system performance"""
@@ -360,23 +571,16 @@ class UnifiedFacialAnimationSystem:
                 # Get system metrics
                 system_metrics = await self.performance_monitor.get_current_metrics()
                 
-                # Update each session
+                # Queue a metrics update for each session; writer tasks send them concurrently
                 for session in self.sessions.values():
                     if session.active and session.metrics:
-                        # Send metrics update
-                        metrics_msg = {
+                        self._enqueue(session, {
                             "type": "metrics",
                             "data": {
-                                **session.metrics.dict(),
+                                **session.metrics.__dict__,
                                 "system": system_metrics
                             }
-                        }
-                        
-                        if session.websocket:
-                            try:
-                                await session.websocket.send_json(metrics_msg)
-                            except Exception as e:
-                                logger.error(f"Failed to send metrics to {session.id}: {e}")
+                        })
                                 
             except asyncio.CancelledError:
                 break
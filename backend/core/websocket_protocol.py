@@ -3,11 +3,18 @@ WebSocket Protocol Definition for Avatar Engine
 Defines message types and structures for real-time communication
 """
 
+import json
 from enum import Enum
 from typing import Dict, Any, Optional, Union, List
 from pydantic import BaseModel, Field, validator
 import time
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class MessageType(str, Enum):
     """WebSocket message types"""
@@ -210,4 +217,11 @@ def create_error_message(code: str, message: str, details: Optional[Dict[str, An
             message=message,
             details=details or {}
         )
-    )
\ No newline at end of file
+    )
+
+
+def dumps_message(obj: Any) -> str:
+    """Serialize a message to JSON text, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj)
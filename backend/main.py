@@ -14,7 +14,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from core.enhanced_facial_animation_system import EnhancedFacialAnimationSystem
-from core.facial_animation_performance_optimizer import FacialAnimationOptimizer
+from core.facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer
 from core.viseme_transition_engine import VisemeTransitionEngine
 from core.facial_animation_unified_system import UnifiedFacialAnimationSystem
 from core.websocket_protocol import (
@@ -157,7 +157,7 @@ async def avatar_websocket(websocket: WebSocket, avatar_id: str):
                     
                     # Send compressed data back
                     if not result.get("skipped"):
-                        await websocket.send_bytes(result["data"])
+                        unified_system.send_frame(avatar_id, result["data"])
                 
                 elif message.type == MessageType.AUDIO:
                     # Process audio to visemes
@@ -168,7 +168,7 @@ async def avatar_websocket(websocket: WebSocket, avatar_id: str):
                     
                     # Send visemes
                     response = VisemeMessage(data=visemes)
-                    await websocket.send_json(response.dict())
+                    unified_system.send_message(avatar_id, response.dict())
                 
                 elif message.type == MessageType.CONTROL:
                     # Handle control command
@@ -183,11 +183,11 @@ async def avatar_websocket(websocket: WebSocket, avatar_id: str):
                         ack_id=message.id or "control",
                         status="ok"
                     )
-                    await websocket.send_json(ack.dict())
+                    unified_system.send_message(avatar_id, ack.dict())
                 
                 elif message.type == MessageType.PING:
                     # Respond to ping
-                    await websocket.send_json({"type": "pong"})
+                    unified_system.send_message(avatar_id, {"type": "pong"})
                     
             except ValueError as e:
                 # Send error message
@@ -195,7 +195,7 @@ async def avatar_websocket(websocket: WebSocket, avatar_id: str):
                     code="INVALID_MESSAGE",
                     message=str(e)
                 )
-                await websocket.send_json(error_msg.dict())
+                unified_system.send_message(avatar_id, error_msg.dict())
                 
     except WebSocketDisconnect:
         logger.info(f"Avatar {avatar_id} disconnected")
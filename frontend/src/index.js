@@ -100,6 +100,10 @@ export class AvatarEngine {
 
     handleJsonMessage(message) {
         switch (message.type) {
+            case 'batch':
+                // Several messages coalesced by the server into one frame
+                message.messages.forEach(m => this.handleJsonMessage(m));
+                break;
             case 'visemes':
                 this.morphSystem.applyVisemes(message.data);
                 break;
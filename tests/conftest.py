@@ -10,6 +10,8 @@ import os
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# The core modules also import their siblings by module name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'core'))
 
 from backend.core.facial_animation_unified_system import UnifiedFacialAnimationSystem
 from backend.core.websocket_protocol import AnimationData, AudioData, ControlData
@@ -4,7 +4,8 @@ Unit tests for compression module
 
 import pytest
 import json
-from backend.compression.delta_compressor import DeltaCompressor
+import numpy as np
+from backend.compression.delta_compressor import DeltaCompressor, DeltaDecompressor
 
 
 class TestDeltaCompressor:
@@ -188,4 +189,219 @@ class TestDeltaCompressor:
         # Very small values
         small_values = {"morph1": 0.0001, "morph2": 0.0}
         compressed_small = delta_compressor.compress_frame(small_values)
-        assert compressed_small["type"] == "delta"
\ No newline at end of file
+        assert compressed_small["type"] == "delta"
+
+class TestDeltaCompressorArrays:
+    """Test the struct-of-arrays compression path"""
+    
+    def test_register_morphs_assigns_stable_indices(self):
+        """Known names keep their index, new names are appended"""
+        compressor = DeltaCompressor()
+        
+        first = compressor.register_morphs(["Jaw_Open", "Mouth_Smile_L"])
+        second = compressor.register_morphs(["Mouth_Smile_L", "Eye_L_Blink"])
+        
+        assert first.tolist() == [0, 1]
+        assert second.tolist() == [1, 2]
+    
+    def test_array_and_dict_paths_match(self):
+        """compress_frame_array produces the same batch as compress_frame"""
+        frames = [
+            {"Jaw_Open": 0.1 * i, "Mouth_Smile_L": 0.5, "Eye_L_Blink": 0.0}
+            for i in range(6)
+        ]
+        
+        dict_compressor = DeltaCompressor(batch_size=6)
+        array_compressor = DeltaCompressor(batch_size=6)
+        indices = array_compressor.register_morphs(frames[0].keys())
+        
+        for frame in frames:
+            timestamp = float(frame["Jaw_Open"])
+            dict_result = dict_compressor.compress_frame(frame, timestamp)
+            
+            values = np.zeros(len(indices), dtype=np.float32)
+            values[indices] = list(frame.values())
+            array_result = array_compressor.compress_frame_array(values, timestamp)
+        
+        assert dict_result is not None
+        assert dict_result == array_result
+    
+    def test_array_length_mismatch_raises(self):
+        """Arrays must cover every registered morph"""
+        compressor = DeltaCompressor()
+        compressor.register_morphs(["Jaw_Open", "Mouth_Smile_L"])
+        
+        with pytest.raises(ValueError):
+            compressor.compress_frame_array(np.zeros(3, dtype=np.float32))
+
+    def test_idle_frame_skips_small_changes_but_not_priority(self):
+        """Sub-threshold jitter is dropped unless it touches a priority morph"""
+        compressor = DeltaCompressor(change_threshold=0.01)
+        compressor.compress_frame({"Jaw_Open": 0.5, "Mouth_Smile_L": 0.5})
+
+        assert compressor._is_idle(np.array([0.5, 0.504], dtype=np.float32))
+        assert not compressor._is_idle(np.array([0.501, 0.5], dtype=np.float32))
+
+
+class TestDeltaRoundTrip:
+    """Test compressor output against the decompressor"""
+    
+    def test_batch_round_trip(self):
+        """Decompressed batches reproduce the compressed frames"""
+        compressor = DeltaCompressor(batch_size=4, force_keyframe_interval=30)
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+        
+        frames = [
+            {"Jaw_Open": 0.25 * i, "Mouth_Smile_L": 0.5}
+            for i in range(4)
+        ]
+        
+        for i, frame in enumerate(frames):
+            data = compressor.compress_frame(frame, timestamp=float(i))
+        
+        decoded = decompressor.decompress_batch(data)
+        
+        assert [f["frame"] for f in decoded] == [1, 2, 3, 4]
+        assert [f["timestamp"] for f in decoded] == [0.0, 1.0, 2.0, 3.0]
+        for frame, result in zip(frames, decoded):
+            # Morphs that never left zero are not sent
+            received = {k: result["morphs"].get(k, 0.0) for k in frame}
+            assert received == pytest.approx(frame)
+
+    def test_compressed_keyframe_round_trip(self):
+        """Blosc-packed keyframe values decode to the original frame"""
+        compressor = DeltaCompressor(batch_size=1, force_keyframe_interval=1)
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+        frame = {f"Morph_{i}": 0.2 + 0.001 * i for i in range(120)}
+
+        decoded = decompressor.decompress_batch(compressor.compress_frame(frame))
+
+        assert decoded[0]["morphs"] == pytest.approx(frame)
+
+    def test_dense_keyframe_omits_zero_morphs(self):
+        """Dense keyframes decode to the same morph set as sparse ones"""
+        compressor = DeltaCompressor(batch_size=1, force_keyframe_interval=1,
+                                     compress_keyframes=False)
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+        frame = {f"Morph_{i}": 0.0 if i % 5 == 0 else 0.5 for i in range(20)}
+
+        decoded = decompressor.decompress_batch(compressor.compress_frame(frame))
+
+        assert decoded[0]["morphs"] == {k: v for k, v in frame.items() if v}
+
+    def test_fresh_decoder_drops_deltas_before_names(self):
+        """A decoder joining mid-stream ignores frames until the name table arrives"""
+        compressor = DeltaCompressor(batch_size=1, force_keyframe_interval=30)
+        batches = [
+            compressor.compress_frame({"Jaw_Open": 0.1 * i, "Mouth_Smile_L": 0.5}, timestamp=float(i))
+            for i in range(1, 6)
+        ]
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+
+        decoded = decompressor.decompress_batch(batches[-1])
+
+        assert decoded[0]["frame"] == 5
+        assert decoded[0]["morphs"] == {}
+        assert decompressor.current_frame == {}
+
+    def test_indices_past_name_table_are_dropped(self):
+        """Deltas for morphs missing from the decoder's name table are skipped"""
+        compressor = DeltaCompressor(batch_size=1, force_keyframe_interval=30)
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+        decompressor.decompress_batch(compressor.compress_frame({"Jaw_Open": 0.5}, timestamp=0.0))
+        # The frame that grows the name table is lost in transit
+        compressor.compress_frame({"Jaw_Open": 0.5, "Mouth_Smile_L": 0.5}, timestamp=1.0)
+
+        decoded = decompressor.decompress_batch(
+            compressor.compress_frame({"Jaw_Open": 0.25, "Mouth_Smile_L": 0.75}, timestamp=2.0)
+        )
+
+        assert decoded[0]["morphs"] == pytest.approx({"Jaw_Open": 0.25})
+
+    def test_forced_keyframe_resyncs_fresh_decoder(self):
+        """force_keyframe makes the next frame a keyframe carrying the name table"""
+        compressor = DeltaCompressor(batch_size=1, force_keyframe_interval=30)
+        for i in range(1, 5):
+            compressor.compress_frame({"Jaw_Open": 0.1 * i, "Mouth_Smile_L": 0.5}, timestamp=float(i))
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+
+        compressor.force_keyframe()
+        decoded = decompressor.decompress_batch(
+            compressor.compress_frame({"Jaw_Open": 0.75, "Mouth_Smile_L": 0.5}, timestamp=5.0)
+        )
+
+        assert decoded[0]["morphs"] == pytest.approx({"Jaw_Open": 0.75, "Mouth_Smile_L": 0.5})
+
+
+class TestDeltaKernels:
+    """Test the compiled delta kernels against their NumPy fallbacks"""
+    
+    def test_delta_select_matches_numpy_fallback(self):
+        """Compiled and fallback kernels select the same morphs and motion state"""
+        from backend.compression._delta_kernels import delta_select, _delta_select_numpy
+        
+        rng = np.random.default_rng(0)
+        n = 64
+        curr = rng.random(n, dtype=np.float32)
+        prev = (curr + rng.normal(0, 0.01, n)).astype(np.float32)
+        present = rng.random(n) > 0.1
+        thr = np.where(rng.random(n) > 0.8, 0.0001, 0.01).astype(np.float32)
+        state = (
+            rng.random(n, dtype=np.float32),
+            rng.random(n, dtype=np.float32),
+            rng.random(n) > 0.5
+        )
+        
+        results = []
+        for kernel in (delta_select, _delta_select_numpy):
+            vel, accel, has_vel = (a.copy() for a in state)
+            out_idx = np.zeros(n, dtype=np.intp)
+            count = kernel(curr, prev, present, thr, vel, accel, has_vel,
+                           True, out_idx)
+            results.append((out_idx[:count], vel, accel, has_vel))
+        
+        compiled, fallback = results
+        assert compiled[0].tolist() == fallback[0].tolist()
+        for a, b in zip(compiled[1:], fallback[1:]):
+            np.testing.assert_allclose(a, b)
+    
+    def test_interp_fused_matches_numpy_fallback(self):
+        """Compiled and fallback interpolation kernels agree"""
+        from backend.compression._delta_kernels import interp_fused, _interp_fused_numpy
+        
+        rng = np.random.default_rng(1)
+        n = 64
+        curr, vel, accel = (rng.random(n, dtype=np.float32) for _ in range(3))
+        pred_mask = rng.random(n) > 0.5
+        compiled = np.zeros(n, dtype=np.float32)
+        fallback = np.zeros(n, dtype=np.float32)
+        
+        interp_fused(curr, vel, accel, pred_mask, 0.4, compiled)
+        _interp_fused_numpy(curr, vel, accel, pred_mask, 0.4, fallback)
+        
+        np.testing.assert_allclose(compiled, fallback, rtol=1e-6)
+        np.testing.assert_array_equal(compiled[~pred_mask], curr[~pred_mask])
+    
+    def test_interpolate_frame_uses_prediction_hints(self):
+        """Morphs with hints are extrapolated, others hold their value"""
+        compressor = DeltaCompressor(batch_size=1)
+        decompressor = DeltaDecompressor()
+        
+        for i in range(3):
+            data = compressor.compress_frame(
+                {"Jaw_Open": 0.2 * i, "Mouth_Smile_L": 0.5}, timestamp=float(i)
+            )
+            frame = decompressor.decompress_batch(data)[-1]
+        
+        t = 0.5
+        interpolated = decompressor.interpolate_frame(2.0 + t / 30.0, target_fps=30.0)
+        
+        velocity = frame["predictions"]["Jaw_Open"]["v"]
+        acceleration = frame["predictions"]["Jaw_Open"]["a"]
+        current = frame["morphs"]["Jaw_Open"]
+        predicted = current + velocity * t + 0.5 * acceleration * t * t
+        weight = (1.0 - t) * 0.5
+        
+        assert "Mouth_Smile_L" not in frame["predictions"]
+        assert interpolated["Mouth_Smile_L"] == pytest.approx(0.5)
+        assert interpolated["Jaw_Open"] == pytest.approx(current * (1 - weight) + predicted * weight)
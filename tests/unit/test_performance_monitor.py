@@ -0,0 +1,82 @@
+"""
+Unit tests for the performance monitor
+"""
+
+import asyncio
+import json
+
+import pytest
+import numpy as np
+from backend.compression.performance_monitor import PerformanceMonitor, LatencyMetrics
+
+
+def _expected_trend(totals, window=10):
+    """Trend sums and label recomputed from the full sequence of recorded totals"""
+    recent = totals[-window:]
+    older = totals[-2 * window:-window] if len(totals) > window else []
+    if len(totals) <= window:
+        return sum(recent), 0.0, 'insufficient_data'
+    
+    recent_avg = sum(recent) / window
+    older_avg = sum(older) / len(older)
+    if recent_avg > older_avg * 1.1:
+        trend = 'increasing'
+    elif recent_avg < older_avg * 0.9:
+        trend = 'decreasing'
+    else:
+        trend = 'stable'
+    return sum(recent), sum(older), trend
+
+
+class TestLatencyTrend:
+    """Test the incremental recent/older latency windows"""
+    
+    @pytest.mark.parametrize("history_size", [19, 20, 21, 50, 300])
+    def test_trend_matches_recompute(self, history_size):
+        """Running trend sums match a recompute at every step"""
+        rng = np.random.default_rng(history_size)
+        monitor = PerformanceMonitor(history_size=history_size)
+        totals = []
+        
+        for _ in range(200):
+            latency = LatencyMetrics(processing=float(rng.uniform(1.0, 50.0)))
+            monitor.record_frame(latency)
+            totals.append(latency.total)
+            
+            # Frames older than the ring are gone from both windows
+            kept = totals[-history_size:]
+            recent_sum, older_sum, trend = _expected_trend(kept)
+            assert monitor._recent_sum == pytest.approx(recent_sum)
+            assert monitor._older_sum == pytest.approx(older_sum)
+            assert monitor.get_latency_report()['trend'] == trend
+    
+    @pytest.mark.parametrize("history_size", [19, 20, 50])
+    def test_trend_after_batch(self, history_size):
+        """Batched frames resync the trend sums"""
+        rng = np.random.default_rng(0)
+        monitor = PerformanceMonitor(history_size=history_size)
+        rows = np.zeros((45, 7))
+        rows[:, 2] = rng.uniform(1.0, 50.0, 45)
+        monitor.record_frames_batch(rows)
+        
+        recent_sum, older_sum, trend = _expected_trend(rows[-history_size:, 2].tolist())
+        assert monitor._recent_sum == pytest.approx(recent_sum)
+        assert monitor._older_sum == pytest.approx(older_sum)
+        assert monitor.get_latency_report()['trend'] == trend
+
+
+class TestMetricsExport:
+    """Test JSON export of the metrics snapshot"""
+    
+    def test_async_export_matches_sync(self):
+        """The async export encodes the same snapshot as the sync one"""
+        monitor = PerformanceMonitor()
+        for k in range(30):
+            monitor.record_frame(LatencyMetrics(processing=float(k)))
+        
+        sync = json.loads(monitor.export_metrics_json())
+        exported = json.loads(asyncio.run(monitor.export_metrics_json_async()))
+        
+        assert exported['latency_history'] == sync['latency_history']
+        assert len(exported['latency_history']['rows']) == 30
+        assert len(exported['alerts']) == len(sync['alerts'])
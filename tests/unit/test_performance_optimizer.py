@@ -0,0 +1,153 @@
+"""
+Unit tests for the facial animation performance optimizer
+"""
+
+import pytest
+import numpy as np
+
+from facial_animation_performance_optimizer import FacialAnimationPerformanceOptimizer, MorphDeltaCompression
+
+
+class TestDeltaQuantized:
+    """Test int8 delta compression of morph vectors"""
+    
+    def test_quantize_round_trip_error(self):
+        """Dequantized values are within half a step of the clipped input"""
+        values = np.linspace(-0.2, 1.2, 1001, dtype=np.float32)
+        q = MorphDeltaCompression.quantize(values)
+        
+        assert q.dtype == np.int8
+        assert q.min() == 0 and q.max() == 127
+        restored = MorphDeltaCompression.dequantize(q)
+        assert restored.dtype == np.float32
+        assert np.abs(restored - np.clip(values, 0.0, 1.0)).max() <= 0.5 / 127 + 1e-7
+    
+    def test_threshold_in_quantization_steps(self):
+        """Changes are sent only beyond threshold * 127 steps"""
+        compression = MorphDeltaCompression(threshold=0.01)  # One step
+        compression.get_delta_quantized(np.full(3, 50 / 127, dtype=np.float32))
+        
+        cur = np.array([51, 52, 48], dtype=np.float32) / 127
+        idxs, q, full = compression.get_delta_quantized(cur)
+        
+        assert not full
+        assert idxs.tolist() == [1, 2]
+        assert q.tolist() == [52, 48]
+        # The unsent one-step change stays pending against the old value
+        assert compression.previous_q.tolist() == [50, 52, 48]
+    
+    def test_clearing_to_zero_is_always_sent(self):
+        """A morph dropping to zero is sent even within the threshold"""
+        compression = MorphDeltaCompression(threshold=0.01)
+        compression.get_delta_quantized(np.array([1 / 127, 0.5], dtype=np.float32), force_update=True)
+        
+        idxs, q, full = compression.get_delta_quantized(np.array([0.0, 0.5], dtype=np.float32))
+        
+        assert idxs.tolist() == [0]
+        assert q.tolist() == [0]
+    
+    def test_forced_update_sends_everything(self):
+        """force_update sends every slot even when nothing changed"""
+        compression = MorphDeltaCompression()
+        cur = np.array([0.25, 0.0, 0.75], dtype=np.float32)
+        compression.get_delta_quantized(cur)
+        
+        idxs, q, full = compression.get_delta_quantized(cur, force_update=True)
+        
+        assert full
+        assert idxs.tolist() == [0, 1, 2]
+        assert q.tolist() == MorphDeltaCompression.quantize(cur).tolist()
+    
+    def test_interval_refresh_short_circuits_unchanged_state(self):
+        """The periodic refresh is skipped when the sent state already matches"""
+        compression = MorphDeltaCompression()
+        compression.force_update_interval = 3
+        cur = np.array([0.25, 0.5], dtype=np.float32)
+        compression.get_delta_quantized(cur)
+        compression.get_delta_quantized(cur)
+        
+        idxs, q, full = compression.get_delta_quantized(cur)
+        assert not full
+        assert idxs.size == 0 and q.size == 0
+        assert compression.force_update_counter == 0
+        
+        # A changed state at the next refresh is sent in full
+        compression.get_delta_quantized(cur)
+        compression.get_delta_quantized(cur)
+        idxs, q, full = compression.get_delta_quantized(np.array([0.25, 0.9], dtype=np.float32))
+        assert full
+        assert idxs.tolist() == [0, 1]
+    
+    def test_new_slots_grow_state(self):
+        """Longer vectors grow the quantized state, comparing new slots against zero"""
+        compression = MorphDeltaCompression(threshold=0.01)
+        compression.get_delta_quantized(np.array([0.5], dtype=np.float32))
+        
+        cur = np.array([0.5, 0.0, 0.5], dtype=np.float32)
+        idxs, q, full = compression.get_delta_quantized(cur)
+        
+        assert not full
+        assert idxs.tolist() == [2]
+        assert q.tolist() == [64]
+        assert compression.previous_q.shape[0] >= 3
+        assert compression.previous_q[:3].tolist() == [64, 0, 64]
+
+
+class TestBatchVector:
+    """Test dense frame batching into the preallocated buffer"""
+    
+    @pytest.fixture
+    def optimizer(self):
+        optimizer = FacialAnimationPerformanceOptimizer()
+        optimizer.batch_timeout_ns = 10 ** 12  # Flush on size only
+        return optimizer
+    
+    def test_flushes_at_batch_size(self, optimizer):
+        """Frames are held until batch_size of them are queued"""
+        n = len(optimizer.slots)
+        frames = [np.full(n, k / 10, dtype=np.float32) for k in range(optimizer.batch_size)]
+        
+        for frame in frames[:-1]:
+            assert optimizer.batch_vector(frame) is None
+        batch = optimizer.batch_vector(frames[-1])
+        
+        assert batch.dtype == np.float32
+        assert batch.shape == (optimizer.batch_size, n)
+        np.testing.assert_array_equal(batch, np.stack(frames))
+        assert optimizer.batch_len == 0
+    
+    def test_flushed_batch_is_a_copy(self, optimizer):
+        """Later frames don't overwrite a batch already returned"""
+        optimizer.batch_size = 1
+        first = optimizer.batch_vector(np.full(3, 0.25, dtype=np.float32))
+        optimizer.batch_vector(np.full(3, 0.75, dtype=np.float32))
+        
+        assert np.all(first[0, :3] == 0.25)
+    
+    def test_new_slots_grow_buffer(self, optimizer):
+        """Longer frames mid-batch widen the buffer; earlier rows read 0 in new slots"""
+        n = optimizer.batch_buf.shape[1]
+        optimizer.batch_size = 2
+        optimizer.batch_vector(np.full(n, 0.5, dtype=np.float32))
+        batch = optimizer.batch_vector(np.full(n + 2, 0.25, dtype=np.float32))
+        
+        assert batch.shape == (2, n + 2)
+        assert np.all(batch[0, :n] == 0.5)
+        assert np.all(batch[0, n:] == 0.0)
+        assert np.all(batch[1] == 0.25)
+    
+    def test_shorter_frames_are_zero_padded(self, optimizer):
+        """Slots past a short frame's length are 0, not left over from earlier batches"""
+        optimizer.batch_size = 1
+        optimizer.batch_vector(np.ones(4, dtype=np.float32))
+        batch = optimizer.batch_vector(np.full(2, 0.5, dtype=np.float32))
+        
+        assert batch[0, :2].tolist() == [0.5, 0.5]
+        assert np.all(batch[0, 2:] == 0.0)
+    
+    def test_flushes_on_timeout(self, optimizer):
+        """A partial batch is sent once batch_timeout_ns has passed"""
+        optimizer.batch_timeout_ns = -1
+        batch = optimizer.batch_vector(np.full(3, 0.5, dtype=np.float32))
+        
+        assert batch.shape[0] == 1
@@ -0,0 +1,55 @@
+"""
+Unit tests for quantized speech frames from the enhanced mapper
+"""
+
+import pytest
+import numpy as np
+
+from facial_animation_mapper_enhanced import FacialAnimationMapperEnhanced, WEIGHT_LEVELS
+
+
+PHONEMES = [{'phoneme': p, 'duration': 0.1} for p in 'HH EH L OW W ER L D'.split()]
+
+
+class TestSpeechQuantization:
+    """Test uint8 transport of speech frames"""
+    
+    def test_weights_round_to_nearest_step(self):
+        """quantize_weights clips to [0, 1] and rounds to the nearest 1/255 step"""
+        values = np.array([-0.5, 0.0, 0.5 / 255, 0.6 / 255, 0.5, 1.0, 2.0], dtype=np.float32)
+        q = FacialAnimationMapperEnhanced.quantize_weights(values)
+        
+        assert q.dtype == np.uint8
+        assert q.tolist() == [0, 0, 1, 1, 128, 255, 255]
+    
+    def test_round_trip_error(self):
+        """Dequantized weights are within half a step of the originals"""
+        values = np.linspace(0.0, 1.0, 1001, dtype=np.float32)
+        restored = FacialAnimationMapperEnhanced.dequantize_weights(
+            FacialAnimationMapperEnhanced.quantize_weights(values)
+        )
+        
+        assert restored.dtype == np.float32
+        assert np.abs(restored - values).max() <= 0.5 / WEIGHT_LEVELS + 1e-6
+    
+    def test_matches_dense_frames(self):
+        """Quantized frames hold the tracked columns of process_speech_vectors"""
+        np.random.seed(0)
+        slots, q = FacialAnimationMapperEnhanced().process_speech_quantized(PHONEMES, 'happy', 0.5, t=0.0)
+        np.random.seed(0)
+        frames, seen = FacialAnimationMapperEnhanced().process_speech_vectors(PHONEMES, 'happy', 0.5, t=0.0)
+        
+        assert slots.dtype == np.int32
+        assert slots.tolist() == np.flatnonzero(seen.any(axis=0)).tolist()
+        assert q.dtype == np.uint8
+        assert q.shape == (len(PHONEMES), slots.shape[0])
+        restored = FacialAnimationMapperEnhanced.dequantize_weights(q)
+        assert np.abs(restored - np.clip(frames[:, slots], 0.0, 1.0)).max() <= 0.5 / WEIGHT_LEVELS + 1e-6
+    
+    def test_empty_sequence(self):
+        """An empty sequence gives no slots and no frames"""
+        slots, q = FacialAnimationMapperEnhanced().process_speech_quantized([])
+        
+        assert slots.shape == (0,)
+        assert q.shape == (0, 0)
+        assert q.dtype == np.uint8
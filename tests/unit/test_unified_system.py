@@ -0,0 +1,221 @@
+"""
+Unit tests for the unified facial animation system's per-session helpers
+"""
+
+import asyncio
+
+import pytest
+from backend.core.facial_animation_unified_system import (
+    UnifiedFacialAnimationSystem, AvatarSession, FrameHistory, WEIGHT_LEVELS
+)
+from backend.core.websocket_protocol import QualityLevel
+from backend.compression.delta_compressor import DeltaCompressor, DeltaDecompressor
+
+
+class FakeWebSocket:
+    """Records sent messages; fails every send once broken"""
+    
+    def __init__(self, broken: bool = False):
+        self.broken = broken
+        self.sent = []
+        self.closed = False
+    
+    async def send_bytes(self, data):
+        if self.broken:
+            raise ConnectionError("socket closed")
+        self.sent.append(data)
+    
+    async def send_text(self, data):
+        if self.broken:
+            raise ConnectionError("socket closed")
+        self.sent.append(data)
+    
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def system():
+    return UnifiedFacialAnimationSystem()
+
+
+class TestFrameHistory:
+    """Test the per-session frame ring and its fps average"""
+    
+    def test_ring_wraps(self):
+        """Appends past the size overwrite the oldest entries"""
+        history = FrameHistory(size=4)
+        for k in range(6):
+            history.append(float(k), float(k), k)
+        
+        assert len(history) == 4
+        assert history.head == 2
+        assert sorted(history.timestamps.tolist()) == [2.0, 3.0, 4.0, 5.0]
+    
+    def test_fps_moving_average(self):
+        """The first interval sets fps; later ones are blended in with fps_decay"""
+        history = FrameHistory(fps_decay=0.5)
+        history.append(0.0, 1.0, 10)
+        assert history.fps == 0.0
+        
+        history.append(0.1, 1.0, 10)
+        assert history.fps == pytest.approx(10.0)
+        
+        history.append(0.15, 1.0, 10)
+        assert history.fps == pytest.approx(0.5 * 10.0 + 0.5 * 20.0)
+    
+    def test_clear(self):
+        """clear empties the ring and resets fps"""
+        history = FrameHistory()
+        history.append(0.0, 1.0, 10)
+        history.append(0.1, 1.0, 10)
+        history.clear()
+        
+        assert len(history) == 0
+        assert history.fps == 0.0
+
+
+class TestApplyQuality:
+    """Test the precomputed frame skipping limits"""
+    
+    @pytest.mark.parametrize("quality, modulus", [
+        (QualityLevel.LOW, 2),
+        (QualityLevel.MEDIUM, 1),
+        (QualityLevel.HIGH, 1),
+        (QualityLevel.ULTRA, 1),
+    ])
+    def test_skip_modulus(self, system, quality, modulus):
+        """Update rates below target_fps process every n-th frame"""
+        session = AvatarSession(id="a", websocket=None, quality=quality)
+        system._apply_quality(session)
+        
+        assert session.skip_modulus == modulus
+        assert session.max_frame_delta == pytest.approx(system.frame_skip_threshold / system.target_fps)
+    
+    def test_late_frames_are_skipped(self, system):
+        """Frames arriving later than max_frame_delta are skipped"""
+        session = AvatarSession(id="a", websocket=None)
+        system._apply_quality(session)
+        
+        assert not system._should_skip_frame(session, 1 / system.target_fps)
+        assert system._should_skip_frame(session, 1.0)
+
+
+class TestFusedFrameKernel:
+    """Test limiting, smoothing and compressing a frame in one pass"""
+    
+    def test_morph_limit_keeps_largest_in_input_order(self, system):
+        """Only the largest magnitudes survive the limit, in input order"""
+        session = AvatarSession(id="a", websocket=None)
+        blendshapes = {"jawOpen": 0.2, "eyeBlinkLeft": 0.9, "mouthSmileLeft": 0.1, "browInnerUp": 0.5}
+        
+        payload, active = system._fused_frame_kernel(session, blendshapes, 2, 1.0, False)
+        
+        assert active == 2
+        assert list(payload) == ["eyeBlinkLeft", "browInnerUp"]
+        assert payload == pytest.approx({"eyeBlinkLeft": 0.9, "browInnerUp": 0.5})
+    
+    def test_smoothing_blends_with_previous_frame(self, system):
+        """Morphs present in the last frame are blended by alpha = 10 * frame_delta"""
+        session = AvatarSession(id="a", websocket=None)
+        system._fused_frame_kernel(session, {"jawOpen": 0.0}, 52, 1.0, False)
+        
+        payload, _ = system._fused_frame_kernel(session, {"jawOpen": 1.0, "eyeBlinkLeft": 0.5}, 52, 0.05, False)
+        
+        # New morphs pass through unsmoothed
+        assert payload == pytest.approx({"jawOpen": 0.5, "eyeBlinkLeft": 0.5})
+    
+    def test_compressed_frame_round_trip(self, system):
+        """Compressed payloads decode to the weights snapped to the 8-bit grid"""
+        session = AvatarSession(id="a", websocket=None)
+        system.compressors["a"] = DeltaCompressor(batch_size=1)
+        decompressor = DeltaDecompressor(interpolation_enabled=False)
+        blendshapes = {"jawOpen": 0.3, "customMorph": 0.7}
+        
+        payload, active = system._fused_frame_kernel(session, blendshapes, 52, 1.0, True)
+        
+        assert active == 2
+        assert isinstance(payload, bytes)
+        morphs = decompressor.decompress_batch(payload)[-1]["morphs"]
+        expected = {k: int(v * WEIGHT_LEVELS + 0.5) / WEIGHT_LEVELS for k, v in blendshapes.items()}
+        assert morphs == pytest.approx(expected)
+        assert session.compressor_slots == len(system.morph_slots)
+
+
+class TestCoalesce:
+    """Test merging queued JSON messages into batches"""
+    
+    def test_json_runs_are_batched_around_binary_frames(self):
+        """Binary frames split JSON runs and keep their place in the order"""
+        messages = [{"n": 0}, {"n": 1}, b"frame", {"n": 2}]
+        
+        out = UnifiedFacialAnimationSystem._coalesce(messages)
+        
+        assert out == [
+            {"type": "batch", "messages": [{"n": 0}, {"n": 1}]},
+            b"frame",
+            {"n": 2}
+        ]
+    
+    def test_single_messages_are_not_wrapped(self):
+        """A lone JSON message is sent as it is"""
+        assert UnifiedFacialAnimationSystem._coalesce([{"n": 0}]) == [{"n": 0}]
+        assert UnifiedFacialAnimationSystem._coalesce([b"a", b"b"]) == [b"a", b"b"]
+
+
+class TestWriter:
+    """Test the per-session writer task"""
+    
+    def test_sends_queued_messages_in_order(self, system):
+        """Messages queued before the writer runs are sent in one coalesced round"""
+        async def run():
+            websocket = FakeWebSocket()
+            await system.connect_avatar("a", websocket)
+            system.send_message("a", {"type": "pong"})
+            system.send_frame("a", b"frame")
+            await asyncio.sleep(0.01)
+            await system.disconnect_avatar("a")
+            return websocket.sent
+        
+        sent = asyncio.run(run())
+        
+        # The initial state message and the pong go out as one batch
+        assert len(sent) == 2
+        assert '"batch"' in sent[0] and '"pong"' in sent[0]
+        assert sent[1] == b"frame"
+    
+    def test_send_failure_drops_session(self, system):
+        """A failed send deactivates and disconnects the session and closes its socket"""
+        async def run():
+            websocket = FakeWebSocket(broken=True)
+            session = await system.connect_avatar("a", websocket)
+            writer = session.writer_task
+            await asyncio.sleep(0.01)
+            return session, websocket, writer
+        
+        session, websocket, writer = asyncio.run(run())
+        
+        assert writer.done() and not writer.cancelled()
+        assert not session.active
+        assert websocket.closed
+        assert "a" not in system.sessions
+        assert "a" not in system.compressors
+    
+    def test_dropped_frame_forces_keyframe(self, system):
+        """Dropping a queued binary frame makes the next compressed frame a keyframe"""
+        async def run():
+            session = await system.connect_avatar("a", None)
+            session.writer_task.cancel()
+            session.out_queue.get_nowait()  # The initial state message
+            while not session.out_queue.full():
+                system.send_frame("a", b"frame")
+            
+            compressor = system.compressors["a"]
+            compressor.force_keyframe_interval = 1000
+            assert not compressor._keyframe_pending
+            system.send_frame("a", b"frame")
+            return compressor
+        
+        compressor = asyncio.run(run())
+        
+        assert compressor._keyframe_pending